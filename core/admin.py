@@ -1,7 +1,7 @@
 """Admin configuration for core models."""
 
 from django.contrib import admin
-from .models import Alert, FuelFill, OdometerReading, Zone
+from .models import Alert, BackgroundJob, FuelFill, OdometerReading, Zone
 
 # --- HEMOS ELIMINADO LA ACCIÓN DE AQUÍ ---
 
@@ -17,8 +17,8 @@ class ZoneAdmin(admin.ModelAdmin):
 class AlertAdmin(admin.ModelAdmin):
     """Admin interface for :class:`~core.models.Alert`."""
 
-    list_display = ("alert_type", "severity", "message", "seen", "created_at")
-    list_filter = ("alert_type", "severity", "seen")
+    list_display = ("alert_type", "subject", "severity", "message", "seen", "created_at")
+    list_filter = ("alert_type", "subject", "severity", "seen")
     # La lista de 'actions' ahora está vacía
 
 
@@ -38,3 +38,16 @@ class OdometerReadingAdmin(admin.ModelAdmin):
     list_display = ("vehicle", "reading_date", "reading_km", "source", "is_anomaly")
     list_filter = ("source", "is_anomaly", "reading_date")
     search_fields = ("vehicle__plate",)
+
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    """Admin interface for :class:`~core.models.BackgroundJob`."""
+
+    list_display = ("id", "kind", "status", "progress", "original_filename", "created_at", "finished_at")
+    list_filter = ("kind", "status")
+    readonly_fields = ("started_at", "finished_at", "created_at", "worker", "output", "error")
+
+    def get_queryset(self, request):
+        # El contenido del archivo no se muestra; no se lee en el listado
+        return super().get_queryset(request).defer("file_content")
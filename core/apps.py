@@ -12,7 +12,11 @@ class CoreConfig(AppConfig):
     name = "core"
 
     def ready(self):
-        """Seed default maintenance manuals after migrations."""
+        """Connect dashboard invalidation and seed default manuals after migrations."""
+
+        from .dashboard import connect_signals
+
+        connect_signals()
 
         def seed_manuals(sender, **kwargs):
             # Fallback seeding in case command isn't run manually
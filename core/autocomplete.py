@@ -0,0 +1,223 @@
+"""API liviana de autocompletado para los widgets select2 y los selects dependientes.
+
+``GET /api/autocomplete/<fuente>/?q=<texto>&fields=id,text&limit=20``
+
+- Una consulta ``values_list`` por petición (sin instanciar modelos).
+- Búsqueda por prefijo sobre columnas indexadas; las coincidencias exactas
+  quedan primero. Los prefijos sin distinguir mayúsculas (``istartswith``)
+  compilan en PostgreSQL a ``UPPER(col::text) LIKE UPPER(%s)``; los sirve un
+  índice funcional ``UPPER(col) text_pattern_ops`` creado en la migración de
+  cada modelo.
+- ``?fields=`` elige las claves de cada resultado (por defecto ``id,text``).
+- Las respuestas se guardan unos segundos en la caché por (fuente, filtros,
+  texto, campos, límite), así teclear/borrar no vuelve a la base de datos.
+  Las vistas del admin que deben ver un ítem recién creado la omiten
+  (``use_cache=False``).
+
+Respuesta: ``{"results": [{"id": ..., "text": ...}, ...]}`` (formato select2).
+"""
+
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Tuple
+
+from django.core.cache import cache
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.http import JsonResponse
+from django.urls import path
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 500
+CACHE_SECONDS = 30
+
+
+@dataclass(frozen=True)
+class Source:
+    """Fuente de autocompletado.
+
+    Attributes:
+        queryset: Callable que retorna el queryset base.
+        columns: Campo público -> columna de la BD (``values_list``).
+        text: Construye el texto visible a partir de la fila (dict de columnas).
+        text_columns: Campos que usa ``text``.
+        search: Construye ``(filtro, coincidencia exacta)`` para el texto.
+        order_by: Orden después del ranking.
+        filters: Parámetro del querystring -> lookup (p. ej. ``category``).
+        normalize: Normalización del texto buscado.
+    """
+
+    queryset: Callable
+    columns: Dict[str, str]
+    text: Callable[[dict], str]
+    text_columns: Tuple[str, ...]
+    search: Callable[[str], Tuple[Q, Q]]
+    order_by: Tuple[str, ...]
+    filters: Dict[str, str] = field(default_factory=dict)
+    normalize: Callable[[str], str] = str.strip
+
+
+def _vehicles():
+    from fleet.models import Vehicle
+
+    return Vehicle.objects.all()
+
+
+def _drivers():
+    from users.models import Driver
+
+    return Driver.objects.filter(is_active=True)
+
+
+def _spare_items():
+    from inventory.models import SpareItem
+
+    # Incluye los inactivos: el selector del admin siempre los listó
+    return SpareItem.objects.all()
+
+
+def _subcategories():
+    from workorders.models import MaintenanceSubcategory
+
+    return MaintenanceSubcategory.objects.all()
+
+
+def _plate_key(term):
+    from fleet.plates import plate_key
+
+    return plate_key(term)
+
+
+SOURCES: Dict[str, Source] = {
+    "vehicles": Source(
+        queryset=_vehicles,
+        columns={"id": "id", "plate": "plate", "vin": "vin", "brand": "brand", "linea": "linea"},
+        text=lambda row: row["plate"],
+        text_columns=("plate",),
+        search=lambda q: (
+            Q(plate_normalized__startswith=q) | Q(vin__startswith=q),
+            Q(plate_normalized=q),
+        ),
+        order_by=("plate",),
+        normalize=_plate_key,
+    ),
+    "drivers": Source(
+        queryset=_drivers,
+        columns={"id": "id", "full_name": "full_name", "document_number": "document_number"},
+        text=lambda row: f"{row['full_name']} ({row['document_number']})",
+        text_columns=("full_name", "document_number"),
+        search=lambda q: (
+            Q(full_name__istartswith=q) | Q(document_number__startswith=q),
+            Q(document_number=q),
+        ),
+        order_by=("full_name", "id"),
+    ),
+    "spare-items": Source(
+        queryset=_spare_items,
+        columns={"id": "id", "name": "name", "unit": "unit", "category": "category_id"},
+        text=lambda row: row["name"],
+        text_columns=("name",),
+        search=lambda q: (Q(name__istartswith=q), Q(name__iexact=q)),
+        order_by=("name", "id"),
+        filters={"category": "category_id"},
+    ),
+    "subcategories": Source(
+        queryset=_subcategories,
+        columns={"id": "id", "name": "name", "category": "category_id"},
+        text=lambda row: row["name"],
+        text_columns=("name",),
+        search=lambda q: (Q(name__istartswith=q), Q(name__iexact=q)),
+        order_by=("name", "id"),
+        filters={"category": "category_id"},
+    ),
+}
+
+
+def search(
+    source_name, term="", filters=None, fields=("id", "text"), limit=DEFAULT_LIMIT, use_cache=True
+):
+    """Resultados de autocompletado (lista de dicts) para una fuente.
+
+    Con ``use_cache=False`` se consulta siempre la base de datos (y no se
+    guarda el resultado).
+
+    Raises:
+        KeyError: Si la fuente no existe.
+        ValueError: Si algún campo o filtro no es válido.
+    """
+    source = SOURCES[source_name]
+    unknown = [f for f in fields if f != "text" and f not in source.columns]
+    if unknown:
+        raise ValueError(f"Campos no disponibles: {', '.join(unknown)}")
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    filters = {k: v for k, v in (filters or {}).items() if v not in (None, "")}
+    for key, value in filters.items():
+        if key not in source.filters:
+            raise ValueError(f"Filtro no disponible: {key}")
+        if not str(value).isdigit():
+            raise ValueError(f"Valor inválido para {key}: {value}")
+
+    term = source.normalize(term or "")
+    cache_key = "autocomplete:%s:%s:%s:%s:%d" % (
+        source_name,
+        ",".join(f"{k}={filters[k]}" for k in sorted(filters)),
+        term,
+        ",".join(fields),
+        limit,
+    )
+    cached = cache.get(cache_key) if use_cache else None
+    if cached is not None:
+        return cached
+
+    qs = source.queryset().filter(
+        **{source.filters[k]: int(v) for k, v in filters.items()}
+    )
+    order_by = source.order_by
+    if term:
+        match, exact = source.search(term)
+        qs = qs.filter(match).annotate(
+            _rank=Case(When(exact, then=Value(0)), default=Value(1), output_field=IntegerField())
+        )
+        order_by = ("_rank",) + order_by
+
+    # Solo las columnas pedidas (y las necesarias para ``text``)
+    needed = [
+        c for c in source.columns
+        if c in fields or ("text" in fields and c in source.text_columns)
+    ]
+    rows = qs.order_by(*order_by).values_list(*[source.columns[c] for c in needed])[:limit]
+    results = []
+    for values in rows:
+        row = dict(zip(needed, values))
+        results.append({f: (source.text(row) if f == "text" else row[f]) for f in fields})
+
+    if use_cache:
+        cache.set(cache_key, results, CACHE_SECONDS)
+    return results
+
+
+def autocomplete_view(request, source):
+    """Vista JSON de autocompletado (solo personal del admin)."""
+    if not (request.user.is_authenticated and request.user.is_staff):
+        return JsonResponse({"detail": "No autorizado."}, status=403)
+    if source not in SOURCES:
+        return JsonResponse({"detail": f"Fuente desconocida: {source}"}, status=404)
+
+    fields = tuple(
+        f.strip() for f in request.GET.get("fields", "id,text").split(",") if f.strip()
+    ) or ("id", "text")
+    filters = {k: request.GET.get(k) for k in SOURCES[source].filters}
+    try:
+        results = search(
+            source,
+            term=request.GET.get("q") or request.GET.get("search") or "",
+            filters=filters,
+            fields=fields,
+            limit=request.GET.get("limit") or DEFAULT_LIMIT,
+        )
+    except ValueError as e:
+        return JsonResponse({"detail": str(e)}, status=400)
+    return JsonResponse({"results": results})
+
+
+urlpatterns = [
+    path("<str:source>/", autocomplete_view, name="autocomplete"),
+]
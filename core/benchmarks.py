@@ -0,0 +1,258 @@
+"""Benchmarks de punta a punta sobre una flota sintética.
+
+:func:`run_scale` genera una flota con :func:`core.synthetic.generate_fleet`
+dentro de una transacción, mide cada caso de ``BENCHMARKS`` (tiempo y número
+de consultas, contadas con ``connection.execute_wrapper``) y revierte todo al
+terminar. Cada caso corre en su propio punto de guardado, que también se
+revierte: todos ven la misma flota recién generada.
+
+El comando ``run_benchmarks`` escribe los resultados en JSON y los compara
+con una corrida anterior (:func:`compare`).
+"""
+
+import os
+import platform
+import statistics
+import tempfile
+import time
+import uuid
+from io import StringIO
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+
+from .middleware import QueryCounter
+from .synthetic import generate_fleet
+
+
+BENCHMARK_HOST = "benchmark.invalid"
+
+
+class BenchmarkContext:
+    """Lo que necesitan los casos: la flota generada y un superusuario."""
+
+    def __init__(self, fleet, user):
+        self.fleet = fleet
+        self.user = user
+        self.factory = RequestFactory(SERVER_NAME=BENCHMARK_HOST)
+
+    def get(self, view, path, **kwargs):
+        """Ejecuta una vista con un GET autenticado y consume la respuesta."""
+        request = self.factory.get(path)
+        request.user = self.user
+        response = view(request, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        if response.streaming:
+            return sum(len(chunk) for chunk in response.streaming_content)
+        return len(response.content)
+
+    def api_list(self, viewset, path):
+        from rest_framework.test import APIRequestFactory, force_authenticate
+
+        request = APIRequestFactory(SERVER_NAME=BENCHMARK_HOST).get(path)
+        force_authenticate(request, user=self.user)
+        response = viewset.as_view({"get": "list"})(request)
+        response.render()
+        return len(response.content)
+
+
+def _import_odometer(ctx):
+    from .fuel_import import import_odometer_file
+
+    import_odometer_file(ctx.fleet.workbook_path, original_filename="benchmark.xlsx", full=True)
+
+
+def _process_fuel_file(ctx):
+    from .services import process_fuel_file
+
+    process_fuel_file(ctx.fleet.workbook_path, source_filename="benchmark.xlsx")
+
+
+def _run_periodic_checks(ctx):
+    call_command("run_periodic_checks", stdout=StringIO())
+
+
+def _report_vehicle_costs(ctx):
+    from reports.views import vehicle_costs_report
+
+    ctx.get(vehicle_costs_report, "/reports/vehicle-costs/")
+
+
+def _report_preventive_compliance(ctx):
+    from reports.views import preventive_compliance_report
+
+    ctx.get(preventive_compliance_report, "/reports/preventive-compliance/")
+
+
+def _schedule_view(ctx):
+    from workorders.views import schedule_view
+
+    ctx.get(schedule_view, "/api/workorders/schedule/")
+
+
+def _api_vehicles(ctx):
+    from fleet.views import VehicleViewSet
+
+    ctx.api_list(VehicleViewSet, "/api/fleet/vehicles/")
+
+
+def _api_workorders(ctx):
+    from workorders.views import WorkOrderViewSet
+
+    ctx.api_list(WorkOrderViewSet, "/api/workorders/workorders/")
+
+
+def _api_plans(ctx):
+    from workorders.views import MaintenancePlanViewSet
+
+    ctx.api_list(MaintenancePlanViewSet, "/api/workorders/plans/")
+
+
+# Nombre -> función ``(contexto)``; el orden es el de ejecución
+BENCHMARKS = {
+    "import_odometer": _import_odometer,
+    "process_fuel_file": _process_fuel_file,
+    "run_periodic_checks": _run_periodic_checks,
+    "report_vehicle_costs": _report_vehicle_costs,
+    "report_preventive_compliance": _report_preventive_compliance,
+    "schedule_view": _schedule_view,
+    "api_vehicles": _api_vehicles,
+    "api_workorders": _api_workorders,
+    "api_plans": _api_plans,
+}
+
+
+def measure(func, *args):
+    """Ejecuta ``func`` y retorna ``(segundos, consultas)``."""
+    counter = QueryCounter()
+    start = time.perf_counter()
+    with connection.execute_wrapper(counter):
+        func(*args)
+    return time.perf_counter() - start, counter.count
+
+
+def run_scale(vehicles, names=None, repeat=1, seed=42, progress=None, **fleet_options):
+    """Genera una flota de ``vehicles`` vehículos y mide los casos pedidos.
+
+    Returns:
+        dict: ``{"fleet": conteos, "generate": medición, "results": {caso: medición}}``
+        donde cada medición trae ``seconds`` (mediana), ``seconds_min`` y
+        ``queries``, o ``error`` si el caso falló.
+    """
+    names = list(names or BENCHMARKS)
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    # Las peticiones simuladas usan ``BENCHMARK_HOST``; la paginación arma
+    # URLs absolutas y validaría el host contra ``ALLOWED_HOSTS``
+    hosts = override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, BENCHMARK_HOST])
+    try:
+        with hosts, transaction.atomic():
+            fleet = None
+
+            def generate():
+                nonlocal fleet
+                fleet = generate_fleet(
+                    vehicles, seed=seed, prefix="BCH", workbook_path=path, **fleet_options
+                )
+
+            seconds, queries = measure(generate)
+            report = {
+                "fleet": {
+                    "vehicles": fleet.vehicles,
+                    "fuel_fills": fleet.fuel_fills,
+                    "odometer_readings": fleet.odometer_readings,
+                    "work_orders": fleet.work_orders,
+                    "tasks": fleet.tasks,
+                    "parts": fleet.parts,
+                    "without_parts": fleet.without_parts,
+                    "workbook_rows": fleet.workbook_rows,
+                    "notes": fleet.notes,
+                },
+                "generate": {"seconds": round(seconds, 4), "queries": queries},
+                "results": {},
+            }
+            user = get_user_model().objects.create_superuser(
+                f"benchmark-{uuid.uuid4().hex[:8]}", "benchmark@example.com", None
+            )
+            ctx = BenchmarkContext(fleet, user)
+
+            for name in names:
+                timings, queries = [], None
+                try:
+                    for _ in range(repeat):
+                        with transaction.atomic():
+                            seconds, count = measure(BENCHMARKS[name], ctx)
+                            transaction.set_rollback(True)
+                        timings.append(seconds)
+                        queries = count if queries is None else queries
+                except Exception as e:
+                    # Un caso roto no detiene la corrida; queda registrado
+                    report["results"][name] = {"error": f"{type(e).__name__}: {e}"}
+                else:
+                    report["results"][name] = {
+                        "seconds": round(statistics.median(timings), 4),
+                        "seconds_min": round(min(timings), 4),
+                        "queries": queries,
+                    }
+                if progress:
+                    progress(name, report["results"][name])
+            transaction.set_rollback(True)
+    finally:
+        os.remove(path)
+    return report
+
+
+def environment():
+    """Datos de la máquina y versiones para interpretar los resultados."""
+    return {
+        "created_at": timezone.now().isoformat(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+def compare(current, baseline, tolerance=0.2):
+    """Regresiones de ``current`` frente a ``baseline``.
+
+    Un caso empeora si su mediana supera la de la línea base en más de
+    ``tolerance`` (fracción) o si hace más consultas. Una escala cuya flota
+    se generó sin repuestos en una sola de las corridas no es comparable y
+    también se reporta.
+
+    Returns:
+        list: ``(escala, caso, mensaje)`` por cada regresión.
+    """
+    regressions = []
+    for scale, report in current.get("scales", {}).items():
+        base = baseline.get("scales", {}).get(scale, {})
+        before = base.get("results", {})
+        without_parts = report.get("fleet", {}).get("without_parts", False)
+        if base and without_parts != base.get("fleet", {}).get("without_parts", False):
+            regressions.append(
+                (scale, "flota", "sin repuestos en " + ("esta corrida" if without_parts else "la línea base"))
+            )
+        for name, now in report["results"].items():
+            old = before.get(name)
+            if "error" in now and old and "error" not in old:
+                regressions.append((scale, name, now["error"]))
+            if not old or "error" in old or "error" in now:
+                continue
+            if now["queries"] > old["queries"]:
+                regressions.append(
+                    (scale, name, f"consultas {old['queries']} -> {now['queries']}")
+                )
+            if old["seconds"] and now["seconds"] > old["seconds"] * (1 + tolerance):
+                change = (now["seconds"] / old["seconds"] - 1) * 100
+                regressions.append(
+                    (scale, name, f"tiempo {old['seconds']:.3f}s -> {now['seconds']:.3f}s (+{change:.0f} %)")
+                )
+    return regressions
@@ -0,0 +1,171 @@
+"""Indicadores del tablero del admin, calculados en pocas consultas y en caché.
+
+Los indicadores se agrupan según los modelos de los que dependen; cada grupo
+se calcula con una sola consulta agregada y se guarda en la caché de Django
+(``CACHE_SECONDS``):
+
+- ``workshop``: vehículos en taller y vehículos con una OT programada a futuro.
+- ``alerts``: alertas abiertas por severidad y preventivos vencidos.
+- ``documents``: SOAT/RTM vencidos o que vencen en ``DOC_WINDOW_DAYS`` días.
+- ``stock``: repuestos en o por debajo de su stock mínimo.
+
+:func:`get_metrics` lee todos los grupos con un ``get_many``; con la caché
+caliente el tablero no toca la base de datos. Las señales de ``WorkOrder``,
+``Alert``, ``Vehicle`` y ``Part`` descartan los grupos afectados (al guardar y
+otra vez al confirmar la transacción). Las escrituras masivas
+(``bulk_create``, ``QuerySet.update``) deben llamar a :func:`invalidate`.
+
+Con varios procesos, la invalidación solo alcanza a los demás si la caché es
+compartida (Redis/Memcached); con ``LocMemCache`` el TTL corto es la red de
+seguridad.
+"""
+
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.db.models import Count, Exists, F, OuterRef, Q
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+CACHE_PREFIX = "dashboard:"
+CACHE_SECONDS = 60
+DOC_WINDOW_DAYS = 30
+
+
+def _workshop():
+    from fleet.models import Vehicle
+    from workorders.models import WorkOrder
+
+    now = timezone.now()
+    scheduled = WorkOrder.objects.filter(
+        vehicle_id=OuterRef("pk"),
+        status=WorkOrder.OrderStatus.SCHEDULED,
+        scheduled_start__gt=now,
+    )
+    return Vehicle.objects.aggregate(
+        in_workshop_count=Count("pk", filter=Q(in_workshop_since__lte=now)),
+        scheduled_count=Count("pk", filter=Q(Exists(scheduled))),
+    )
+
+
+def _alerts():
+    from core.models import Alert
+
+    rows = (
+        Alert.objects.filter(seen=False)
+        .order_by()
+        .values("severity")
+        .annotate(
+            total=Count("pk"),
+            preventive=Count("pk", filter=Q(alert_type=Alert.AlertType.PREVENTIVE_DUE)),
+        )
+    )
+    by_severity = {severity: 0 for severity in Alert.Severity.values}
+    overdue = 0
+    for row in rows:
+        by_severity[row["severity"]] = row["total"]
+        if row["severity"] == Alert.Severity.CRITICAL:
+            # Preventivo crítico = hito ya alcanzado (ver run_periodic_checks)
+            overdue = row["preventive"]
+    return {
+        "open_alerts": sum(by_severity.values()),
+        "alerts_by_severity": by_severity,
+        "overdue_preventives": overdue,
+    }
+
+
+def _documents():
+    from fleet.models import Vehicle
+
+    today = timezone.localdate()
+    window = (today, today + timedelta(days=DOC_WINDOW_DAYS))
+    return Vehicle.objects.aggregate(
+        soat_expired=Count("pk", filter=Q(soat_due_date__lt=today)),
+        soat_expiring=Count("pk", filter=Q(soat_due_date__range=window)),
+        rtm_expired=Count("pk", filter=Q(rtm_due_date__lt=today)),
+        rtm_expiring=Count("pk", filter=Q(rtm_due_date__range=window)),
+    )
+
+
+def _stock():
+    from inventory.models import Part
+
+    try:
+        with transaction.atomic():
+            return Part.objects.aggregate(
+                low_stock=Count(
+                    "pk",
+                    filter=Q(minimal_stock__gt=0, quantity__lte=F("minimal_stock")),
+                )
+            )
+    except DatabaseError:
+        # Tabla de inventario desactualizada: el tablero se muestra sin el dato
+        return {"low_stock": None}
+
+
+# Grupo -> función que lo calcula (una consulta)
+METRIC_GROUPS = {
+    "workshop": _workshop,
+    "alerts": _alerts,
+    "documents": _documents,
+    "stock": _stock,
+}
+
+# Modelo ("app_label.Model") -> grupos que dependen de él
+DEPENDENCIES = {
+    "workorders.WorkOrder": ("workshop",),
+    "core.Alert": ("alerts",),
+    "fleet.Vehicle": ("workshop", "documents"),
+    "inventory.Part": ("stock",),
+}
+
+
+def _key(group):
+    return f"{CACHE_PREFIX}{group}"
+
+
+def get_metrics() -> dict:
+    """Todos los indicadores del tablero en un solo dict plano.
+
+    Los grupos que no están en caché se calculan (una consulta cada uno) y se
+    guardan juntos.
+    """
+    cached = cache.get_many([_key(group) for group in METRIC_GROUPS])
+    metrics, missing = {}, {}
+    for group, compute in METRIC_GROUPS.items():
+        values = cached.get(_key(group))
+        if values is None:
+            values = missing[_key(group)] = compute()
+        metrics.update(values)
+    if missing:
+        cache.set_many(missing, CACHE_SECONDS)
+    return metrics
+
+
+def invalidate(*groups) -> None:
+    """Descarta los grupos indicados (todos si no se indica ninguno).
+
+    Se descartan de inmediato y otra vez al confirmar la transacción en
+    curso, para no conservar un valor que otra petición calculó antes del
+    ``COMMIT``.
+    """
+    keys = [_key(group) for group in (groups or METRIC_GROUPS)]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _on_change(sender, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate(*DEPENDENCIES[sender._meta.label])
+
+
+def connect_signals() -> None:
+    """Conecta la invalidación a los modelos de ``DEPENDENCIES``."""
+    from django.apps import apps
+
+    for label in DEPENDENCIES:
+        model = apps.get_model(label)
+        for signal in (post_save, post_delete):
+            signal.connect(_on_change, sender=model, dispatch_uid=f"dashboard:{label}")
@@ -0,0 +1,154 @@
+"""Importación de odómetros desde la hoja TANQUEOS (API en proceso).
+
+La usan el comando ``import_odometer`` y el worker de trabajos en segundo
+plano (``core.jobs``). Cuando el archivo viene de la vista de carga, el hash
+SHA-256 y el tamaño ya se calcularon mientras se recibía
+(``core.uploads.HashingFileUploadHandler``) y no se vuelve a leer el archivo
+para obtenerlos.
+"""
+
+import hashlib
+import os
+from collections import defaultdict
+from typing import Optional
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from fleet.models import Vehicle
+from fleet.odometer import advance_odometers
+from fleet.plates import resolve_plates
+from reports.models import FuelUploadLog
+
+from .incremental import ODOMETER, RowWatermark, source_key
+from .sheet_reader import FECHA, KILOMETRAJE, PLACA, Column, WorkbookReader
+
+# FECHA es opcional aquí: sin ella no hay marca de agua y se procesa todo
+FECHA_OPCIONAL = Column(FECHA.name, FECHA.parse, required=False)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class DuplicateUpload(Exception):
+    """El archivo (mismo SHA-256) ya fue importado."""
+
+
+def sha256_file(path: str) -> str:
+    """SHA-256 de un archivo leído por bloques de 1 MB."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def is_known_upload(sha256: str) -> bool:
+    """``True`` si un archivo con ese hash ya se importó."""
+    return FuelUploadLog.objects.filter(sha256=sha256).exists()
+
+
+def _reading(km_and_date):
+    km, fecha = km_and_date
+    if fecha is not None and timezone.is_naive(fecha):
+        fecha = timezone.make_aware(fecha, timezone.get_default_timezone())
+    return km, fecha
+
+
+def import_odometer_file(
+    file_path: str,
+    *,
+    sheet_name: str = "TANQUEOS",
+    original_filename: Optional[str] = None,
+    user_id: Optional[int] = None,
+    sha256: Optional[str] = None,
+    size_bytes: Optional[int] = None,
+    full: bool = False,
+) -> FuelUploadLog:
+    """Importa el máximo kilometraje por placa y registra la carga.
+
+    Args:
+        file_path: Ruta del ``.xlsx``.
+        sheet_name: Hoja a procesar.
+        original_filename: Nombre con el que se subió (fuente de la marca de agua).
+        user_id: Usuario que ejecuta.
+        sha256: Hash ya calculado; si falta se calcula leyendo el archivo.
+        size_bytes: Tamaño ya conocido.
+        full: Ignora la marca de agua y procesa todas las filas.
+
+    Returns:
+        FuelUploadLog: Registro de la carga.
+
+    Raises:
+        FileNotFoundError: Si el archivo no existe.
+        DuplicateUpload: Si el archivo ya fue importado (incluso por una carga
+            concurrente).
+        SheetError: Si el libro o la hoja no son válidos.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Archivo no encontrado: {file_path}")
+    original_filename = original_filename or os.path.basename(file_path)
+    sha256 = sha256 or sha256_file(file_path)
+    if size_bytes is None:
+        size_bytes = os.path.getsize(file_path)
+
+    # Evitar reprocesos: no se abre el libro
+    if is_known_upload(sha256):
+        raise DuplicateUpload(f"Ya procesado: {original_filename}")
+
+    # Solo las filas que no llegaron en cargas anteriores del mismo archivo
+    watermark = RowWatermark.load(
+        source_key(original_filename, ODOMETER), sheet_name, full=full
+    )
+
+    # Tomar máximo KM por placa (con la FECHA de esa fila, si la hay)
+    max_km_by_plate: dict = defaultdict(lambda: (0, None))
+    rows_processed = 0
+    with WorkbookReader(file_path) as reader:
+        batches = reader.batches(sheet_name, (FECHA_OPCIONAL, PLACA, KILOMETRAJE))
+        for batch in watermark.filter(batches):
+            for row in batch:
+                placa, km = row["PLACA"], row["KILOMETRAJE"]
+                if km > max_km_by_plate[placa][0]:
+                    max_km_by_plate[placa] = (km, row.get("FECHA"))
+            rows_processed += len(batch)
+
+    try:
+        with transaction.atomic():
+            # Todas las placas en una consulta (clave canónica, ver fleet.plates)
+            vehicle_ids = resolve_plates(max_km_by_plate)
+            # Las filas de placas no registradas se reintentan en la próxima carga
+            watermark.forget(lambda row: row["PLACA"] not in vehicle_ids)
+            # La fecha de la lectura permite a la ingesta de tanqueos no
+            # comparar contra este km las filas anteriores (ver core.services)
+            advanced = advance_odometers(
+                (vehicle_id, *_reading(max_km_by_plate[plate]))
+                for plate, vehicle_id in vehicle_ids.items()
+            )
+            Vehicle.objects.filter(pk__in=advanced).update(
+                odometer_status=Vehicle.OdometerStatus.VALID
+            )
+            log = FuelUploadLog.objects.create(
+                original_filename=original_filename,
+                sha256=sha256,
+                size_bytes=size_bytes,
+                sheet_name=sheet_name,
+                rows_processed=rows_processed,
+                vehicles_updated=len(advanced),
+                rows_skipped=watermark.rows_skipped,
+                rows_late=watermark.rows_late,
+                processed_by_id=user_id,
+            )
+    except IntegrityError:
+        # Otra carga del mismo archivo terminó primero (``sha256`` es único)
+        raise DuplicateUpload(f"Ya procesado: {original_filename}")
+    watermark.save()
+    return log
+
+
+def summary(log: FuelUploadLog) -> str:
+    """Línea de resumen de una carga."""
+    return (
+        f"OK: {log.original_filename} | filas={log.rows_processed} | "
+        f"omitidas_ya_importadas={log.rows_skipped} | "
+        f"omitidas_fuera_de_ventana={log.rows_late} | vehiculos_actualizados={log.vehicles_updated}"
+    )
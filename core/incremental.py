@@ -0,0 +1,258 @@
+"""Importación incremental de hojas que crecen (p. ej. el libro mensual de tanqueos).
+
+Operaciones re-exporta cada día el mismo "GESTION DE COMBUSTIBLE.XLSX" con
+algunas filas nuevas al final: el hash del archivo cambia, pero casi todas
+las filas ya se importaron. :class:`RowWatermark` filtra los lotes del lector
+(``core.sheet_reader``) y deja pasar solo las filas no vistas de esa fuente.
+Cada importador (odómetros, tanqueos) tiene su propia marca por archivo
+(:func:`source_key`):
+
+- Las filas con ``FECHA`` anterior a ``marca - LOOKBACK`` se omiten sin
+  compararlas por contenido: una fila vieja editada en el libro no se
+  detecta. Solo se cuentan; las que exceden las filas ya importadas de esos
+  días son filas tardías, se reportan en ``rows_late`` y se registran en el
+  log. ``--full`` procesa todas las filas de nuevo.
+- Las filas dentro de la ventana se comparan por huella (hash del contenido
+  tipado) contra las guardadas en :class:`~reports.models.FuelImportWatermark`;
+  así se aceptan filas agregadas tarde con fecha de días anteriores.
+- Las filas sin ``FECHA`` siempre se procesan.
+
+Solo se guardan las huellas de las filas que el importador realmente
+ingirió: las que descarta (p. ej. placas aún no registradas) se retiran con
+:meth:`RowWatermark.forget` y vuelven a procesarse en la próxima carga. La
+marca se guarda con :meth:`RowWatermark.save` después de procesar, así
+que un fallo a mitad de la carga no pierde filas. Las restricciones únicas
+de ``FuelFill``/``OdometerReading`` siguen evitando duplicados si dos cargas
+de la misma fuente se cruzan.
+"""
+
+import hashlib
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from reports.models import FuelImportWatermark
+
+logger = logging.getLogger(__name__)
+
+# Días antes de la marca en los que se revisan filas por huella
+LOOKBACK = timedelta(days=3)
+
+
+# Importadores con marca propia: que el de odómetros haya visto una fila no
+# significa que se haya importado como tanqueo (y viceversa)
+ODOMETER = "odometer"
+FUEL_FILLS = "fuelfills"
+
+
+def source_key(filename: str, importer: str) -> str:
+    """Nombre de fuente estable para un archivo y un importador.
+
+    ``"<importador>:<archivo sin ruta, en minúsculas>"``, p. ej.
+    ``"fuelfills:gestion de combustible.xlsx"``.
+    """
+    name = os.path.basename(filename or "").strip().lower()
+    return f"{importer}:{name}"[:255]
+
+
+def row_fingerprint(row: Dict[str, Any]) -> str:
+    """Huella del contenido tipado de una fila (independiente del orden de columnas)."""
+    text = "\x1f".join(f"{key}={row[key]!s}" for key in sorted(row))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _aware(value: datetime) -> datetime:
+    if timezone.is_naive(value):
+        return timezone.make_aware(value, timezone.get_default_timezone())
+    return value
+
+
+def _day(fecha: datetime) -> str:
+    return timezone.localtime(fecha).date().isoformat()
+
+
+class RowWatermark:
+    """Filtro de filas ya importadas para una fuente y hoja.
+
+    Uso::
+
+        watermark = RowWatermark.load(source_key(nombre, FUEL_FILLS), "TANQUEOS")
+        for batch in watermark.filter(reader.batches("TANQUEOS", columnas)):
+            ...
+        watermark.forget(lambda row: row["PLACA"] in no_ingeridas)
+        watermark.save()
+
+    Las filas anteriores a la ventana no se comparan por huella: se cuentan
+    y solo las que exceden lo ya importado se reportan en ``rows_late``; el
+    resto se cuenta en ``rows_skipped``. ``day_counts`` guarda las filas por
+    día solo desde el día del corte; los días anteriores se acumulan en
+    ``rows_settled`` al salir de la ventana.
+    """
+
+    def __init__(
+        self, source: str, sheet_name: str, last_row_at=None, recent_rows=None,
+        day_counts=None, rows_settled=0, full=False,
+    ):
+        self.source = source
+        self.sheet_name = sheet_name
+        self.last_row_at: Optional[datetime] = last_row_at
+        self.recent_rows: Dict[str, str] = dict(recent_rows or {})
+        self.day_counts: Dict[str, int] = dict(day_counts or {})
+        self.rows_settled = rows_settled
+        self.full = full
+        self.rows_new = 0
+        self.rows_forgotten = 0
+        self._rows_filtered = 0
+        # Filas entregadas en esta carga: (huella, FECHA, fila)
+        self._pending: List[Tuple[str, datetime, Dict[str, Any]]] = []
+        # Filas por día ya importadas (dentro de la ventana) y anteriores a ella
+        self._known_days: Counter = Counter()
+        self._before_days: Counter = Counter()
+
+    @classmethod
+    def load(cls, source: str, sheet_name: str = "TANQUEOS", full: bool = False) -> "RowWatermark":
+        """Carga la marca guardada; con ``full=True`` no se omite ninguna fila."""
+        stored = FuelImportWatermark.objects.filter(source=source, sheet_name=sheet_name).first()
+        if stored is None:
+            return cls(source, sheet_name, full=full)
+        return cls(
+            source, sheet_name, stored.last_row_at, stored.recent_rows, stored.day_counts,
+            stored.rows_settled, full=full,
+        )
+
+    @property
+    def cutoff(self) -> Optional[datetime]:
+        return self.last_row_at - LOOKBACK if self.last_row_at else None
+
+    @property
+    def rows_late(self) -> int:
+        """Filas anteriores a la ventana que no se habían importado (no se procesan)."""
+        late = settled = 0
+        for day, rows in self._before_days.items():
+            if day in self.day_counts:
+                late += max(0, rows - self.day_counts[day])
+            else:
+                settled += rows
+        return late + max(0, settled - self.rows_settled)
+
+    @property
+    def rows_skipped(self) -> int:
+        """Filas omitidas por haberse importado en una carga anterior."""
+        return self._rows_filtered - self.rows_late
+
+    def is_new(self, row: Dict[str, Any]) -> bool:
+        """``True`` si la fila debe procesarse.
+
+        Las filas entregadas quedan pendientes; su huella se guarda en
+        :meth:`save` salvo que se retiren antes con :meth:`forget`.
+        """
+        fecha = row.get("FECHA")
+        if fecha is None:
+            return True
+        fecha = _aware(fecha)
+        cutoff = self.cutoff
+        if not self.full and cutoff is not None and fecha < cutoff:
+            self._before_days[_day(fecha)] += 1
+            return False
+        fingerprint = row_fingerprint(row)
+        if not self.full and fingerprint in self.recent_rows:
+            self._known_days[_day(fecha)] += 1
+            return False
+        self._pending.append((fingerprint, fecha, row))
+        return True
+
+    def filter(self, batches: Iterable[List[Dict[str, Any]]]) -> Iterator[List[Dict[str, Any]]]:
+        """Entrega los lotes con solo las filas nuevas (los lotes vacíos se omiten)."""
+        for batch in batches:
+            fresh = [row for row in batch if self.is_new(row)]
+            self.rows_new += len(fresh)
+            self._rows_filtered += len(batch) - len(fresh)
+            if fresh:
+                yield fresh
+
+    def forget(self, predicate: Callable[[Dict[str, Any]], bool]) -> int:
+        """Retira de la carga las filas que el importador no ingirió.
+
+        Sus huellas no se guardan, así que la próxima carga las procesa de
+        nuevo (p. ej. cuando ya se registró el vehículo de la placa).
+
+        Returns:
+            int: Filas retiradas.
+        """
+        kept = [entry for entry in self._pending if not predicate(entry[2])]
+        dropped = len(self._pending) - len(kept)
+        self._pending = kept
+        self.rows_forgotten += dropped
+        return dropped
+
+    def save(self) -> None:
+        """Avanza la marca con las filas ingeridas en esta carga.
+
+        Se combina con lo guardado bajo bloqueo de fila, por si otra carga de
+        la misma fuente terminó mientras tanto.
+        """
+        rows_late, cutoff_before = self.rows_late, self.cutoff
+        day_rows = Counter(self._known_days)
+        day_rows.update(_day(fecha) for _, fecha, _ in self._pending)
+        with transaction.atomic():
+            stored, _ = FuelImportWatermark.objects.select_for_update().get_or_create(
+                source=self.source, sheet_name=self.sheet_name
+            )
+            recent = {
+                fingerprint: datetime.fromisoformat(iso)
+                for fingerprint, iso in (stored.recent_rows or {}).items()
+            }
+            recent.update((fingerprint, fecha) for fingerprint, fecha, _ in self._pending)
+            last = max(
+                [d for d in (stored.last_row_at, *recent.values()) if d is not None],
+                default=None,
+            )
+            cutoff = last - LOOKBACK if last else None
+            stored.last_row_at = last
+            stored.recent_rows = {
+                fingerprint: fecha.isoformat()
+                for fingerprint, fecha in recent.items()
+                if cutoff is None or fecha >= cutoff
+            }
+            # El libro se re-exporta completo: cada día guarda el máximo visto
+            day_counts = dict(stored.day_counts or {})
+            for day, rows in day_rows.items():
+                day_counts[day] = max(day_counts.get(day, 0), rows)
+            # Los días anteriores al corte solo se cuentan en total. Con --full
+            # se vieron todas las filas y el total se recalcula desde cero.
+            first_day = _day(cutoff) if cutoff else None
+            settled = {
+                day: rows for day, rows in day_counts.items()
+                if first_day is not None and day < first_day
+            }
+            if self.full:
+                stored.rows_settled = sum(
+                    rows for day, rows in day_rows.items() if day in settled
+                )
+            else:
+                stored.rows_settled += sum(settled.values())
+            stored.day_counts = {
+                day: rows for day, rows in day_counts.items() if day not in settled
+            }
+            stored.rows_imported += self.rows_new - self.rows_forgotten
+            stored.save()
+        if rows_late:
+            logger.warning(
+                "%s/%s: %s filas con FECHA anterior a %s no se importaron "
+                "(use --full para procesarlas).",
+                self.source,
+                self.sheet_name,
+                rows_late,
+                cutoff_before,
+            )
+        self.last_row_at = stored.last_row_at
+        self.recent_rows = stored.recent_rows
+        self.day_counts = stored.day_counts
+        self.rows_settled = stored.rows_settled
+        self._pending = []
+        self._known_days.clear()
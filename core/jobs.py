@@ -0,0 +1,231 @@
+"""Cola de trabajos en segundo plano respaldada por la base de datos.
+
+Las vistas solo persisten el archivo y encolan un :class:`~core.models.BackgroundJob`;
+el comando ``run_job_worker`` toma los trabajos pendientes y ejecuta la función
+(``JOB_RUNNERS``) o el comando de gestión (``JOB_COMMANDS``) correspondiente
+fuera del ciclo de la petición HTTP, guardando el progreso y la salida capturada.
+
+El contenido del archivo viaja en el trabajo (``file_content``): el worker
+puede correr en otra máquina (servicio ``worker`` de Render) sin disco
+compartido; lo escribe en su ``JOB_UPLOAD_DIR`` solo mientras lo procesa.
+
+Un trabajo que sigue ``RUNNING`` más de ``JOB_STALE_SECONDS`` se da por
+perdido (el worker murió): :func:`fail_stale_jobs` lo marca ``FAILED`` antes
+de cada reserva, y deja de contar como "en curso" para las cargas repetidas.
+"""
+
+import logging
+import os
+import time
+import uuid
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+def _import_odometer(stdout, file_path, **options):
+    from .fuel_import import DuplicateUpload, import_odometer_file, summary
+
+    try:
+        log = import_odometer_file(file_path, **options)
+    except DuplicateUpload as e:
+        stdout.write(f"{e}\n")
+        return
+    stdout.write(summary(log) + "\n")
+
+
+# Tipo de trabajo -> función en proceso ``(stdout, **payload)``; recibe el
+# hash y tamaño calculados al subir el archivo
+JOB_RUNNERS = {
+    BackgroundJob.Kind.IMPORT_ODOMETER: _import_odometer,
+}
+
+# Tipo de trabajo -> comando de gestión (los que no tienen función propia)
+JOB_COMMANDS = {
+    BackgroundJob.Kind.PERIODIC_CHECKS: "run_periodic_checks",
+}
+
+# Cada cuánto (segundos) se vuelca la salida parcial a la base de datos
+FLUSH_INTERVAL = 2.0
+
+
+def upload_dir() -> Path:
+    """Directorio donde se guardan los archivos subidos hasta que el worker los procese."""
+    path = Path(settings.JOB_UPLOAD_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def save_upload(uploaded_file, suffix: str = ".xlsx") -> str:
+    """Guarda un ``UploadedFile`` en ``JOB_UPLOAD_DIR`` por bloques y retorna la ruta."""
+    path = upload_dir() / f"{uuid.uuid4().hex}{suffix}"
+    with open(path, "wb") as fh:
+        for chunk in uploaded_file.chunks():
+            fh.write(chunk)
+    return str(path)
+
+
+def enqueue(kind, payload=None, user=None, file_path="", original_filename="") -> BackgroundJob:
+    """Crea un trabajo pendiente.
+
+    Si se indica ``file_path``, su contenido se guarda en el trabajo y el
+    archivo local se elimina.
+    """
+    content = b""
+    if file_path:
+        with open(file_path, "rb") as fh:
+            content = fh.read()
+    job = BackgroundJob.objects.create(
+        kind=kind,
+        payload=payload or {},
+        file_path=file_path,
+        file_content=content,
+        original_filename=original_filename,
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+    if file_path:
+        _remove(file_path)
+    return job
+
+
+def stale_cutoff():
+    """Inicio más antiguo de un trabajo ``RUNNING`` que aún se considera vivo."""
+    return timezone.now() - timedelta(seconds=settings.JOB_STALE_SECONDS)
+
+
+def active_jobs():
+    """Trabajos en cola o en ejecución (sin contar los de workers perdidos)."""
+    return BackgroundJob.objects.filter(
+        Q(status=BackgroundJob.Status.PENDING)
+        | Q(status=BackgroundJob.Status.RUNNING, started_at__gte=stale_cutoff())
+    )
+
+
+def fail_stale_jobs() -> int:
+    """Marca ``FAILED`` los trabajos ``RUNNING`` de workers que dejaron de responder.
+
+    Returns:
+        int: Trabajos marcados.
+    """
+    return BackgroundJob.objects.filter(
+        status=BackgroundJob.Status.RUNNING, started_at__lt=stale_cutoff()
+    ).update(
+        status=BackgroundJob.Status.FAILED,
+        error=(
+            f"Sin terminar tras {settings.JOB_STALE_SECONDS} s; "
+            "el worker se detuvo. Vuelva a subir el archivo."
+        ),
+        file_content=b"",
+        finished_at=timezone.now(),
+    )
+
+
+def claim_next(worker_name: str) -> Optional[BackgroundJob]:
+    """Toma el trabajo pendiente más antiguo.
+
+    La reserva es un ``UPDATE ... WHERE status = PENDING`` condicional, de modo
+    que dos workers nunca ejecutan el mismo trabajo (funciona igual en SQLite
+    y PostgreSQL). Antes se liberan los trabajos de workers perdidos
+    (:func:`fail_stale_jobs`).
+    """
+    stale = fail_stale_jobs()
+    if stale:
+        logger.warning("%s trabajo(s) sin worker marcados como fallidos", stale)
+    candidates = (
+        BackgroundJob.objects.filter(status=BackgroundJob.Status.PENDING)
+        .order_by("created_at", "id")
+        .values_list("id", flat=True)[:5]
+    )
+    for job_id in candidates:
+        claimed = BackgroundJob.objects.filter(
+            pk=job_id, status=BackgroundJob.Status.PENDING
+        ).update(
+            status=BackgroundJob.Status.RUNNING,
+            worker=worker_name,
+            started_at=timezone.now(),
+        )
+        if claimed:
+            return BackgroundJob.objects.get(pk=job_id)
+    return None
+
+
+class JobOutput:
+    """Flujo de salida que acumula el stdout del comando y lo guarda en el trabajo."""
+
+    def __init__(self, job: BackgroundJob):
+        self.job = job
+        self._parts = []
+        self._last_flush = time.monotonic()
+
+    def write(self, text: str) -> None:
+        self._parts.append(text)
+        if time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self) -> None:
+        output = self.getvalue()
+        lines = [ln for ln in output.splitlines() if ln.strip()]
+        BackgroundJob.objects.filter(pk=self.job.pk).update(
+            output=output,
+            progress_message=(lines[-1][:255] if lines else ""),
+        )
+        self._last_flush = time.monotonic()
+
+    def getvalue(self) -> str:
+        return "".join(self._parts)
+
+
+def _remove(path) -> None:
+    if os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError:
+            logger.warning("No se pudo eliminar el archivo del trabajo: %s", path)
+
+
+def run_job(job: BackgroundJob) -> BackgroundJob:
+    """Ejecuta un trabajo ya reservado y registra el resultado."""
+    stream = JobOutput(job)
+    options = dict(job.payload)
+    local_path = None
+    if job.file_path:
+        # Copia local del archivo del trabajo, solo mientras se procesa
+        local_path = str(upload_dir() / f"{uuid.uuid4().hex}{Path(job.file_path).suffix}")
+        with open(local_path, "wb") as fh:
+            fh.write(job.file_content)
+        options["file_path"] = local_path
+
+    try:
+        runner = JOB_RUNNERS.get(job.kind)
+        if runner is not None:
+            runner(stream, **options)
+        else:
+            call_command(JOB_COMMANDS[job.kind], stdout=stream, **options)
+    except Exception as e:
+        logger.exception("Falló el trabajo %s", job.pk)
+        job.status = BackgroundJob.Status.FAILED
+        job.error = f"{type(e).__name__}: {e}"
+    else:
+        job.status = BackgroundJob.Status.SUCCEEDED
+        job.progress = 100
+    finally:
+        if local_path:
+            _remove(local_path)
+
+    stream.flush()
+    job.output = stream.getvalue()
+    job.file_content = b""
+    job.finished_at = timezone.now()
+    job.save(
+        update_fields=["status", "error", "progress", "output", "file_content", "finished_at"]
+    )
+    return job
+
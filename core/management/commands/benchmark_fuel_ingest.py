@@ -0,0 +1,86 @@
+# core/management/commands/benchmark_fuel_ingest.py
+"""Mide tiempo y consultas de ``process_fuel_file`` sobre un libro sintético."""
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from core.services import process_fuel_file
+from fleet.models import Vehicle
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera un Excel TANQUEOS sintético, lo procesa con process_fuel_file y "
+        "reporta tiempo y número de consultas. Los datos se revierten al terminar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000, help="Filas de tanqueo a generar")
+        parser.add_argument("--vehicles", type=int, default=500, help="Vehículos sintéticos")
+        parser.add_argument("--seed", type=int, default=42, help="Semilla aleatoria")
+
+    def handle(self, *args, **opts):
+        rows, n_vehicles = opts["rows"], opts["vehicles"]
+        rng = random.Random(opts["seed"])
+        plates = [f"BNF{i:05d}" for i in range(n_vehicles)]
+
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+        try:
+            self._write_workbook(path, plates, rows, rng)
+
+            with transaction.atomic():
+                Vehicle.objects.bulk_create(
+                    [
+                        Vehicle(
+                            plate=plate,
+                            brand="Bench",
+                            linea="Sintético",
+                            modelo=2020,
+                            vehicle_type=Vehicle.VehicleType.AUTOMOVIL,
+                        )
+                        for plate in plates
+                    ],
+                    batch_size=1000,
+                )
+
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    summary = process_fuel_file(path, source_filename="benchmark.xlsx")
+                    elapsed = time.perf_counter() - start
+
+                transaction.set_rollback(True)
+        finally:
+            os.remove(path)
+
+        self.stdout.write(summary)
+        self.stdout.write(self.style.SUCCESS(
+            f"filas={rows} | vehiculos={n_vehicles} | segundos={elapsed:.2f} | consultas={len(ctx.captured_queries)}"
+        ))
+
+    def _write_workbook(self, path, plates, rows, rng):
+        """Escribe la hoja TANQUEOS con kilometrajes crecientes y algunas anomalías."""
+        from openpyxl import Workbook
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("TANQUEOS")
+        ws.append(["FECHA", "PLACA", "KILOMETRAJE", "GALONES", "OBSERVACIONES"])
+
+        km_by_plate = {plate: rng.randint(1_000, 50_000) for plate in plates}
+        start = datetime(2025, 1, 1, 6, 0)
+        step = timedelta(days=30) / max(rows, 1)
+        for i in range(rows):
+            plate = rng.choice(plates)
+            km_by_plate[plate] += rng.randint(50, 400)
+            km = km_by_plate[plate]
+            if rng.random() < 0.01:
+                km -= rng.randint(1_000, 5_000)  # lectura anómala
+            ws.append([start + step * i, plate, km, round(rng.uniform(5, 40), 3), ""])
+        wb.save(path)
@@ -0,0 +1,53 @@
+# core/management/commands/generate_synthetic_fleet.py
+"""Crea una flota sintética (ver ``core.synthetic``) y la deja en la base de datos."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.synthetic import generate_fleet
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera vehículos, planes, histórico de tanqueos/odómetro y OTs sintéticos; "
+        "opcionalmente escribe el libro TANQUEOS/NOVEDADES correspondiente."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--vehicles", type=int, default=1000, help="Vehículos a generar")
+        parser.add_argument("--months", type=int, default=3, help="Meses de histórico de tanqueos")
+        parser.add_argument("--fills-per-month", type=int, default=8, help="Tanqueos por vehículo y mes")
+        parser.add_argument("--orders-per-vehicle", type=int, default=2, help="OTs por vehículo")
+        parser.add_argument("--prefix", default="SYN", help="Prefijo de las placas (por defecto SYN)")
+        parser.add_argument("--seed", type=int, default=42, help="Semilla aleatoria")
+        parser.add_argument("--workbook", default=None, help="Ruta del .xlsx TANQUEOS/NOVEDADES a escribir (opcional)")
+        parser.add_argument("--workbook-fills", type=int, default=2, help="Tanqueos nuevos por vehículo en el libro")
+        parser.add_argument(
+            "--without-parts",
+            action="store_true",
+            help="Genera las OTs sin repuestos (p. ej. si la tabla de repuestos no está migrada).",
+        )
+
+    def handle(self, *args, **opts):
+        if opts["vehicles"] <= 0:
+            raise CommandError("--vehicles debe ser mayor que cero.")
+        try:
+            fleet = generate_fleet(
+                vehicles=opts["vehicles"],
+                months=opts["months"],
+                fills_per_month=opts["fills_per_month"],
+                orders_per_vehicle=opts["orders_per_vehicle"],
+                seed=opts["seed"],
+                prefix=opts["prefix"].upper(),
+                workbook_path=opts["workbook"],
+                workbook_fills=opts["workbook_fills"],
+                with_parts=not opts["without_parts"],
+                progress=lambda msg: self.stdout.write(f"  {msg}"),
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for note in fleet.notes:
+            self.stdout.write(self.style.WARNING(note))
+        self.stdout.write(self.style.SUCCESS(f"OK: {fleet.summary()}"))
+        if fleet.workbook_path:
+            self.stdout.write(f"Libro escrito en {fleet.workbook_path}")
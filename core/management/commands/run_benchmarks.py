@@ -0,0 +1,123 @@
+# core/management/commands/run_benchmarks.py
+"""Mide los caminos críticos sobre flotas sintéticas y guarda los resultados en JSON."""
+
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from core.benchmarks import BENCHMARKS, compare, environment, run_scale
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera una flota sintética por escala, mide tiempo y consultas de importaciones, "
+        "revisiones, reportes, programación y listas del API, y revierte los datos. "
+        f"Casos: {', '.join(BENCHMARKS)}."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scales",
+            default="1000",
+            help="Tamaños de flota separados por coma (p. ej. 1000,10000,100000)",
+        )
+        parser.add_argument("--only", default="", help="Casos a medir, separados por coma (por defecto todos)")
+        parser.add_argument("--repeat", type=int, default=1, help="Repeticiones por caso (se reporta la mediana)")
+        parser.add_argument("--months", type=int, default=3, help="Meses de histórico de tanqueos")
+        parser.add_argument("--seed", type=int, default=42, help="Semilla aleatoria")
+        parser.add_argument(
+            "--without-parts",
+            action="store_true",
+            help="Genera las OTs sin repuestos; queda marcado en el JSON y no se compara con flotas completas.",
+        )
+        parser.add_argument(
+            "--output",
+            default=None,
+            help="Archivo JSON de resultados (por defecto var/benchmarks/benchmark-<fecha>.json)",
+        )
+        parser.add_argument("--baseline", default=None, help="JSON de una corrida anterior para comparar")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Aumento de tiempo tolerado frente a la línea base (fracción, por defecto 0.2)",
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Termina con error si hay regresiones frente a --baseline.",
+        )
+
+    def handle(self, *args, **opts):
+        try:
+            scales = [int(s) for s in opts["scales"].split(",") if s.strip()]
+        except ValueError:
+            raise CommandError(f"Escalas inválidas: {opts['scales']}")
+        names = [n.strip() for n in opts["only"].split(",") if n.strip()]
+        unknown = [n for n in names if n not in BENCHMARKS]
+        if unknown:
+            raise CommandError(f"Casos desconocidos: {', '.join(unknown)}")
+        baseline = None
+        if opts["baseline"]:
+            try:
+                with open(opts["baseline"], encoding="utf-8") as fh:
+                    baseline = json.load(fh)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"No se pudo leer la línea base: {e}")
+
+        results = {"environment": environment(), "scales": {}}
+        for scale in scales:
+            self.stdout.write(self.style.WARNING(f"\n--- Flota de {scale} vehículos ---"))
+            try:
+                report = run_scale(
+                    scale,
+                    names=names,
+                    repeat=max(1, opts["repeat"]),
+                    seed=opts["seed"],
+                    months=opts["months"],
+                    with_parts=not opts["without_parts"],
+                    progress=self.report_case,
+                )
+            except ValueError as e:
+                raise CommandError(str(e))
+            generated = report["generate"]
+            self.stdout.write(
+                f"  (generación: {generated['seconds']:.1f}s, "
+                f"{report['fleet']['fuel_fills']} tanqueos, {report['fleet']['work_orders']} OTs)"
+            )
+            for note in report["fleet"]["notes"]:
+                self.stdout.write(self.style.WARNING(f"  {note}"))
+            results["scales"][str(scale)] = report
+
+        output = opts["output"] or os.path.join(
+            settings.BASE_DIR,
+            "var",
+            "benchmarks",
+            f"benchmark-{timezone.now():%Y%m%dT%H%M%S}.json",
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2, cls=DjangoJSONEncoder)
+        self.stdout.write(self.style.SUCCESS(f"\nResultados en {output}"))
+
+        if baseline is None:
+            return
+        regressions = compare(results, baseline, opts["tolerance"])
+        for scale, name, message in regressions:
+            self.stdout.write(self.style.ERROR(f"REGRESIÓN [{scale}] {name}: {message}"))
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS("Sin regresiones frente a la línea base."))
+        elif opts["fail_on_regression"]:
+            raise CommandError(f"{len(regressions)} regresiones frente a {opts['baseline']}")
+
+    def report_case(self, name, measurement):
+        if "error" in measurement:
+            self.stdout.write(self.style.ERROR(f"  {name:<30} ERROR {measurement['error']}"))
+            return
+        self.stdout.write(
+            f"  {name:<30} {measurement['seconds']:>9.3f}s {measurement['queries']:>7} consultas"
+        )
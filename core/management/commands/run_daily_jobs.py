@@ -1,19 +1,27 @@
 # core/management/commands/run_daily_jobs.py
 """Management command to process daily fuel fills and related tasks."""
 
-import pandas as pd
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django.db import transaction
 import os
-from datetime import timedelta
 
 from fleet.models import Vehicle
-from core.models import FuelFill, OdometerReading, Alert
-from workorders.models import MaintenancePlan
-
-
-class Command(BaseCommand):
+from fleet.plates import vehicle_rows_by_plate
+from core.incremental import FUEL_FILLS, RowWatermark, source_key
+from core.models import Alert
+from core.profiling import ProfileCommandMixin
+from core.management.commands.run_periodic_checks import desired_preventive_alerts
+from core.services import ingest_fuel_rows
+from core.sheet_reader import (
+    NOVEDADES_COLUMNS,
+    TANQUEOS_COLUMNS,
+    SheetError,
+    WorkbookReader,
+)
+
+
+class Command(ProfileCommandMixin, BaseCommand):
     """Handle daily processing of fuel files and maintenance updates."""
 
     help = "Procesa tanqueos, novedades y recalcula los planes de mantenimiento."
@@ -26,6 +34,16 @@ class Command(BaseCommand):
             required=False,
             help="Ruta opcional al archivo XLSX a procesar.",
         )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help=(
+                "Procesa todos los tanqueos, aunque ya se hayan importado en cargas anteriores "
+                "del mismo archivo. Sin esta opción, las filas con FECHA anterior a la ventana de "
+                "revisión (3 días antes de la última importada) se omiten sin comparar su "
+                "contenido: los cambios en filas viejas solo se importan con --full."
+            ),
+        )
 
     def handle(self, *args, **kwargs):
         """Execute the command."""
@@ -41,110 +59,123 @@ class Command(BaseCommand):
 
         self.stdout.write(self.style.SUCCESS(f"[{timezone.now()}] Iniciando proceso desde '{os.path.basename(file_path)}'"))
 
-        self.process_tanqueos(file_path)
-        self.process_novedades(file_path)
+        try:
+            reader = WorkbookReader(file_path)
+        except SheetError as e:
+            self.stdout.write(self.style.ERROR(str(e)))
+            return
+
+        # El libro se abre una sola vez y cada hoja se recorre una vez
+        with reader:
+            self.process_tanqueos(reader, os.path.basename(file_path), full=kwargs.get("full", False))
+            self.process_novedades(reader)
         self.stdout.write(self.style.SUCCESS(f"[{timezone.now()}] Proceso de ingesta de archivo completado."))
 
-    def process_tanqueos(self, file_path):
-        """Import fuel fill records from the provided Excel file."""
+    def process_tanqueos(self, reader, source_filename="", full=False):
+        """Import fuel fill records from the TANQUEOS sheet.
+
+        Only rows not seen in earlier runs of the same file are ingested
+        (see ``core.incremental``) unless ``full`` is set.
+        """
         self.stdout.write(self.style.WARNING("\n--- Procesando Hoja de TANQUEOS ---"))
         try:
-            df = pd.read_excel(file_path, sheet_name='TANQUEOS')
-            self.stdout.write(f"Archivo leído. Se encontraron {len(df)} registros de tanqueo.")
-        except Exception as e:
+            batches = reader.batches("TANQUEOS", TANQUEOS_COLUMNS)
+        except SheetError as e:
             self.stdout.write(self.style.ERROR(f"No se pudo leer la hoja 'TANQUEOS': {e}"))
             return
 
-        df.columns = [str(col).strip().upper() for col in df.columns]
-        required_columns = ['FECHA', 'PLACA', 'KILOMETRAJE']
-        if not all(col in df.columns for col in required_columns):
-            self.stdout.write(self.style.ERROR(f"La hoja 'TANQUEOS' debe contener las columnas: {', '.join(required_columns)}"))
-            return
-
-        df.dropna(subset=['PLACA', 'KILOMETRAJE'], inplace=True)
-        df['FECHA'] = pd.to_datetime(df['FECHA'], errors='coerce')
-        df['KILOMETRAJE'] = pd.to_numeric(df['KILOMETRAJE'], errors='coerce')
-        df['PLACA'] = df['PLACA'].astype(str).str.upper().str.strip().str.replace('-', '')
-        df.dropna(subset=['FECHA', 'KILOMETRAJE'], inplace=True)
-        df = df.sort_values(by='FECHA')
-
-        processed_count = 0
-        new_readings = 0
-        not_found_plates = set()
-
-        with transaction.atomic():
-            for index, row in df.iterrows():
-                placa = row['PLACA']
-                kilometraje = int(row['KILOMETRAJE'])
-                if kilometraje <= 0: continue
-                try:
-                    vehicle = Vehicle.objects.get(plate=placa)
-                except Vehicle.DoesNotExist:
-                    not_found_plates.add(placa)
-                    continue
-                
-                if kilometraje < vehicle.current_odometer_km:
-                    Alert.objects.get_or_create(...)
-                    OdometerReading.objects.create(...)
-                    continue
-
-                if not FuelFill.objects.filter(vehicle=vehicle, fill_date=row['FECHA'], odometer_km=kilometraje).exists():
-                    FuelFill.objects.create(...)
-                    OdometerReading.objects.create(...)
-                    vehicle.current_odometer_km = kilometraje
-                    vehicle.save()
-                    new_readings += 1
-                
-                processed_count += 1
-        
-        self.stdout.write(self.style.SUCCESS(f"Tanqueos procesados: {processed_count}. Nuevas lecturas válidas: {new_readings}."))
-        if not_found_plates:
-            self.stdout.write(self.style.WARNING(f"{len(not_found_plates)} placas del archivo no fueron encontradas en la base de datos."))
-            sample = list(not_found_plates)[:5]
+        watermark = RowWatermark.load(
+            source_key(source_filename, FUEL_FILLS), "TANQUEOS", full=full
+        )
+        result = ingest_fuel_rows(watermark.filter(batches), source_filename)
+        # Las filas de placas no registradas se reintentan en la próxima carga
+        watermark.forget(lambda row: row["PLACA"] in result.missing_plates)
+        watermark.save()
+        self.stdout.write(
+            f"Archivo leído. Se encontraron {result.rows_read} registros de tanqueo nuevos "
+            f"({watermark.rows_skipped} ya importados en cargas anteriores)."
+        )
+        if watermark.rows_late:
+            self.stdout.write(self.style.WARNING(
+                f"{watermark.rows_late} registros con FECHA anterior a la ventana de revisión "
+                f"no se importaron. Use --full para procesarlos."
+            ))
+
+        if result.anomaly_vehicle_ids:
+            plates = dict(
+                Vehicle.objects.filter(id__in=list(result.anomaly_vehicle_ids)).values_list("id", "plate")
+            )
+            Alert.objects.bulk_raise_or_update(
+                Alert.AlertType.ODOMETER_INCONSISTENT,
+                {
+                    (vehicle_id, Alert.Subject.ODOMETER): (
+                        Alert.Severity.WARNING,
+                        f"Lectura de odómetro inconsistente para {plate} en el archivo de tanqueos.",
+                    )
+                    for vehicle_id, plate in plates.items()
+                },
+            )
+
+        if result.advanced_vehicle_ids:
+            # Solo los vehículos cuyo odómetro avanzó pueden acercarse a un preventivo
+            desired, _ = desired_preventive_alerts(result.advanced_vehicle_ids)
+            Alert.objects.bulk_raise_or_update(
+                Alert.AlertType.PREVENTIVE_DUE,
+                {
+                    (vehicle_id, subject): value
+                    for (vehicle_id, _, subject), value in desired.items()
+                },
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Tanqueos procesados: {result.processed}. Nuevas lecturas válidas: {result.new_readings}. Odómetros actualizados: {len(result.advanced_vehicle_ids)}."))
+        if result.missing_plates:
+            self.stdout.write(self.style.WARNING(f"{len(result.missing_plates)} placas del archivo no fueron encontradas en la base de datos."))
+            sample = sorted(result.missing_plates)[:5]
             self.stdout.write(self.style.WARNING(f"Ejemplos de placas no encontradas: {', '.join(sample)}. Verifique que coincidan exactamente."))
 
-    def process_novedades(self, file_path):
-        """Process odometer issues from the spreadsheet."""
+    def process_novedades(self, reader):
+        """Process odometer issues from the NOVEDADES sheet."""
         self.stdout.write(self.style.WARNING("\n--- Procesando Hoja de NOVEDADES ---"))
         try:
-            df = pd.read_excel(file_path, sheet_name='NOVEDADES')
-            self.stdout.write(f"Archivo leído. Se encontraron {len(df)} registros de novedades.")
-        except Exception as e:
+            batches = reader.batches("NOVEDADES", NOVEDADES_COLUMNS)
+        except SheetError as e:
             self.stdout.write(self.style.ERROR(f"No se pudo leer la hoja 'NOVEDADES': {e}"))
             return
 
-        df.columns = [str(col).strip().upper() for col in df.columns]
-        required_columns = ['VEHICULO', 'OBSERVACIONES']
-        if not all(col in df.columns for col in required_columns):
-            self.stdout.write(self.style.ERROR(f"La hoja 'NOVEDADES' debe contener las columnas: {', '.join(required_columns)}"))
-            return
-        
-        df.dropna(subset=['VEHICULO', 'OBSERVACIONES'], inplace=True)
-        df['VEHICULO'] = df['VEHICULO'].astype(str).str.upper().str.strip().str.replace('-', '')
-        df['OBSERVACIONES'] = df['OBSERVACIONES'].astype(str).str.lower()
-
         frase_clave = "kilometraje no le sirve/detenido"
-        df_problemas = df[df['OBSERVACIONES'].str.contains(frase_clave, na=False)]
+        placas_problema = set()
+        total = 0
+        for batch in batches:
+            total += len(batch)
+            placas_problema.update(
+                row["VEHICULO"] for row in batch
+                if frase_clave in row["OBSERVACIONES"].lower()
+            )
+        self.stdout.write(f"Archivo leído. Se encontraron {total} registros de novedades.")
 
-        novedades_procesadas = 0
-        not_found_plates_novedades = set()
         with transaction.atomic():
-            for index, row in df_problemas.iterrows():
-                placa = row['VEHICULO']
-                observacion = row['OBSERVACIONES']
-                try:
-                    vehicle = Vehicle.objects.get(plate=placa)
-                    if vehicle.odometer_status == Vehicle.OdometerStatus.INVALID:
-                        continue
-                    vehicle.odometer_status = Vehicle.OdometerStatus.INVALID
-                    vehicle.save()
-                    Alert.objects.get_or_create(...)
-                    novedades_procesadas += 1
-                except Vehicle.DoesNotExist:
-                    not_found_plates_novedades.add(placa)
-                    continue
+            found = vehicle_rows_by_plate(placas_problema, "plate", "odometer_status")
+            to_invalidate = {
+                vehicle_id: plate
+                for vehicle_id, plate, status in found.values()
+                if status != Vehicle.OdometerStatus.INVALID
+            }
+            Vehicle.objects.filter(id__in=list(to_invalidate)).update(
+                odometer_status=Vehicle.OdometerStatus.INVALID
+            )
+            Alert.objects.bulk_raise_or_update(
+                Alert.AlertType.ODOMETER_UNAVAILABLE,
+                {
+                    (vehicle_id, Alert.Subject.ODOMETER): (
+                        Alert.Severity.WARNING,
+                        f"Odómetro de {plate} reportado como no disponible en NOVEDADES.",
+                    )
+                    for vehicle_id, plate in to_invalidate.items()
+                },
+            )
+        novedades_procesadas = len(to_invalidate)
+        not_found_plates_novedades = placas_problema - set(found)
 
         self.stdout.write(self.style.SUCCESS(f"Novedades de odómetro procesadas: {novedades_procesadas} vehículos actualizados a 'Inválido'."))
         if not_found_plates_novedades:
             self.stdout.write(self.style.WARNING(f"{len(not_found_plates_novedades)} placas de la hoja de novedades no fueron encontradas en la base de datos."))
-
@@ -0,0 +1,45 @@
+# core/management/commands/run_job_worker.py
+"""Worker local que ejecuta los trabajos en segundo plano encolados por las vistas."""
+
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.jobs import claim_next, run_job
+
+
+class Command(BaseCommand):
+    help = "Toma trabajos pendientes (importación de tanqueos, revisiones periódicas) y los ejecuta."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Procesa los trabajos pendientes y termina")
+        parser.add_argument("--poll-interval", type=float, default=2.0, help="Segundos entre consultas a la cola")
+        parser.add_argument("--max-jobs", type=int, default=0, help="Termina tras N trabajos (0 = sin límite)")
+
+    def handle(self, *args, **opts):
+        worker_name = f"{socket.gethostname()}:{os.getpid()}"
+        poll_interval = opts["poll_interval"]
+        max_jobs = opts["max_jobs"]
+        done = 0
+
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker_name} iniciado."))
+        while True:
+            close_old_connections()
+            job = claim_next(worker_name)
+            if job is None:
+                if opts["once"]:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            self.stdout.write(f"Ejecutando {job}…")
+            job = run_job(job)
+            self.stdout.write(f"{job} terminado.")
+            done += 1
+            if max_jobs and done >= max_jobs:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker_name} finalizado ({done} trabajos)."))
@@ -1,148 +1,259 @@
 # core/management/commands/run_periodic_checks.py
-"""Comando de revisiones periódicas: documentos y mantenimiento preventivo."""
+"""Comando de revisiones periódicas: documentos y mantenimiento preventivo.
 
-from django.core.management.base import BaseCommand
+Trabaja por lotes: carga en una consulta todas las alertas abiertas de
+DOC_EXPIRATION y PREVENTIVE_DUE en un índice en memoria con la clave
+estructurada ``(vehículo, tipo de alerta, asunto)`` (ver ``Alert.subject``), calcula el conjunto deseado de
+alertas para toda la flota y aplica la diferencia con ``bulk_create``,
+``bulk_update`` y un único ``update`` de cierre.
+"""
+
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 from django.db import transaction
 
 from fleet.models import Vehicle
+from core.dashboard import invalidate
 from core.models import Alert
+from core.profiling import ProfileCommandMixin
 from workorders.models import MaintenancePlan
+from workorders.scheduling import next_due
+
+BATCH_SIZE = 1000
+DOC_WINDOW_DAYS = 30
+PREVENTIVE_WINDOW_KM = 500
+DOCUMENTS = (
+    (Alert.Subject.SOAT, "soat_due_date"),
+    (Alert.Subject.RTM, "rtm_due_date"),
+)
+
+
+def desired_preventive_alerts(vehicle_ids=None):
+    """Preventivos dentro de la ventana de km.
+
+    El próximo hito de todos los planes se calcula de una vez con
+    ``workorders.scheduling.next_due``.
+
+    Args:
+        vehicle_ids: Limita el cálculo a esos vehículos (p. ej. los que
+            acaban de avanzar su odómetro). ``None`` recorre toda la flota.
+
+    Returns:
+        tuple[dict, set]: ``({clave: (severidad, mensaje)}, claves evaluadas)``.
+        Solo se evalúan los planes con un próximo hito (manual con tareas);
+        las alertas de los demás no se tocan.
+    """
+    plans = MaintenancePlan.objects.filter(is_active=True, manual__isnull=False)
+    if vehicle_ids is not None:
+        plans = plans.filter(vehicle_id__in=list(vehicle_ids))
+    plans = list(
+        plans.values_list(
+            "vehicle_id", "vehicle__plate", "vehicle__current_odometer_km",
+            "manual_id", "last_service_km",
+        )
+        .order_by()
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    schedule = next_due(
+        [(manual_id, last_km, current_km) for _, _, current_km, manual_id, last_km in plans]
+    )
+
+    desired, evaluated = {}, set()
+    for i, (vehicle_id, plate, _, _, _) in enumerate(plans):
+        next_due_km, next_desc, km_to_due = schedule.row(i)
+        if next_due_km is None:
+            continue
+        evaluated.add((vehicle_id, Alert.AlertType.PREVENTIVE_DUE, Alert.Subject.PREVENTIVE))
+        if km_to_due > PREVENTIVE_WINDOW_KM:
+            continue
+
+        severity = Alert.Severity.CRITICAL if km_to_due <= 0 else Alert.Severity.WARNING
+        faltan_txt = f"faltan {max(0, km_to_due)} km" if km_to_due > 0 else "VENCIDO"
+        msg = (
+            f"Preventivo para {plate}: próximo servicio ({next_desc}) a los "
+            f"{next_due_km} km ({faltan_txt})."
+        )
+        desired[(vehicle_id, Alert.AlertType.PREVENTIVE_DUE, Alert.Subject.PREVENTIVE)] = (
+            severity,
+            msg[:255],
+        )
+    return desired, evaluated
 
 
-class Command(BaseCommand):
+class Command(ProfileCommandMixin, BaseCommand):
     help = "Ejecuta revisiones de documentos y mantenimiento preventivo; genera/actualiza alertas."
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Calcula y muestra la diferencia de alertas sin escribir en la BD.",
+        )
+        parser.add_argument(
+            "--synthetic",
+            type=int,
+            default=0,
+            metavar="N",
+            help="Con --dry-run: agrega N vehículos sintéticos (se revierten) para medir tiempos.",
+        )
+
+    def handle(self, *args, **opts):
+        dry_run = opts["dry_run"]
+        synthetic = opts["synthetic"]
+        if synthetic and not dry_run:
+            raise CommandError("--synthetic solo puede usarse junto con --dry-run.")
+
+        with transaction.atomic():
+            if synthetic:
+                self._create_synthetic_fleet(synthetic)
+            self.run_checks(dry_run=dry_run)
+            if synthetic:
+                transaction.set_rollback(True)
+
+    # -----------------------------
+    # Flujo principal
+    # -----------------------------
+    def run_checks(self, dry_run=False):
         today = timezone.now().date()
+        timings = {}
 
-        created, updated, closed = 0, 0, 0
-
-        # --- 1) Documentos vencidos / próximos a vencer (SOAT, RTM) ---
-        for v in Vehicle.objects.all():
-            doc_map = [
-                ("SOAT", getattr(v, "soat_due_date", None)),
-                ("RTM", getattr(v, "rtm_due_date", None)),
-            ]
-            for doc_name, due_date in doc_map:
-                qs = Alert.objects.filter(
-                    alert_type=Alert.AlertType.DOC_EXPIRATION,
-                    related_vehicle=v,
-                    message__icontains=doc_name,
-                    seen=False,
-                )
-                if due_date:
-                    days = (due_date - today).days
-                    if days <= 30:
-                        severity = (
-                            Alert.Severity.CRITICAL if days <= 0 else Alert.Severity.WARNING
-                        )
-                        estado = "VENCIDO" if days <= 0 else f"vence en {days} día(s)"
-                        msg = f"{doc_name} de {v.plate} {estado}. Fecha límite: {due_date}."
-                        alert = qs.first()
-                        if alert:
-                            if alert.severity != severity or alert.message != msg:
-                                alert.severity = severity
-                                alert.message = msg
-                                alert.save(update_fields=["severity", "message"])
-                                updated += 1
-                        else:
-                            Alert.objects.create(
-                                alert_type=Alert.AlertType.DOC_EXPIRATION,
-                                related_vehicle=v,
-                                severity=severity,
-                                message=msg,
-                                seen=False,
-                            )
-                            created += 1
-                    else:
-                        # fuera de ventana (no alertar): cerrar las que estén abiertas
-                        closed += qs.update(seen=True)
-                else:
-                    # sin fecha configurada para ese documento: cerrar cualquier alerta previa
-                    closed += qs.update(seen=True)
-
-        # --- 2) Preventivo por kilometraje ---
-        # Lógica: base = last_service_km (tu “9”); delta = km_actual - base.
-        # Manual define tareas con km_interval (10.000, 20.000, ...).
-        # Elegimos la siguiente tarea cuyo km_interval >= delta; si no hay, saltamos al próximo ciclo del menor intervalo.
-        plans = (
-            MaintenancePlan.objects.filter(is_active=True)
-            .select_related("vehicle", "manual")
-            .prefetch_related("manual__tasks")
+        t0 = time.perf_counter()
+        desired, evaluated = self._desired_doc_alerts(today)
+        preventive, preventive_evaluated = desired_preventive_alerts()
+        desired.update(preventive)
+        evaluated |= preventive_evaluated
+        timings["calcular deseadas"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        open_index = Alert.objects.open_index(
+            [Alert.AlertType.DOC_EXPIRATION, Alert.AlertType.PREVENTIVE_DUE]
         )
+        timings["cargar abiertas"] = time.perf_counter() - t0
 
-        for plan in plans:
-            v = plan.vehicle
-            manual = plan.manual
-            if not v or not manual:
-                continue
-
-            tasks = list(manual.tasks.order_by("km_interval"))
-            if not tasks:
-                continue
-
-            base_km = plan.last_service_km or 0
-            current_km = v.current_odometer_km or 0
-            delta = max(0, current_km - base_km)
-
-            # Buscar próxima tarea
-            next_task = None
-            for t in tasks:
-                if t.km_interval >= delta:
-                    next_task = t
-                    break
-
-            if next_task:
-                next_due_km = base_km + next_task.km_interval
-                next_desc = next_task.description
-            else:
-                # ciclo: usamos el menor intervalo como período
-                period = tasks[0].km_interval or 10000
-                # próximo múltiplo del período
-                multiples = (delta // period) + 1
-                next_due_km = base_km + multiples * period
-                next_desc = f"Ciclo cada {period} km"
-
-            km_to_due = next_due_km - current_km
-
-            qs_prev = Alert.objects.filter(
-                alert_type=Alert.AlertType.PREVENTIVE_DUE,
-                related_vehicle=v,
-                seen=False,
+        to_create, to_update, to_close = self._diff(desired, open_index, evaluated)
+
+        if dry_run:
+            self._print_diff(to_create, to_update, to_close, timings, len(desired))
+            return
+
+        t0 = time.perf_counter()
+        self._apply(to_create, to_update, to_close)
+        timings["aplicar"] = time.perf_counter() - t0
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Revisiones completadas. Alertas: +{len(to_create)} creadas, "
+                f"~{len(to_update)} actualizadas, -{len(to_close)} cerradas."
             )
+        )
 
-            if km_to_due <= 500:
-                severity = (
-                    Alert.Severity.CRITICAL if km_to_due <= 0 else Alert.Severity.WARNING
-                )
-                faltan_txt = f"faltan {max(0, km_to_due)} km" if km_to_due > 0 else "VENCIDO"
-                msg = (
-                    f"Preventivo para {v.plate}: próximo servicio ({next_desc}) a los "
-                    f"{next_due_km} km ({faltan_txt})."
-                )
-                alert = qs_prev.first()
-                if alert:
-                    if alert.severity != severity or alert.message != msg:
-                        alert.severity = severity
-                        alert.message = msg
-                        alert.save(update_fields=["severity", "message"])
-                        updated += 1
-                else:
-                    Alert.objects.create(
-                        alert_type=Alert.AlertType.PREVENTIVE_DUE,
-                        related_vehicle=v,
+    # -----------------------------
+    # Conjunto deseado
+    # -----------------------------
+    def _desired_doc_alerts(self, today):
+        """SOAT/RTM vencidos o próximos a vencer.
+
+        Returns:
+            tuple[dict, set]: ``({clave: (severidad, mensaje)}, claves evaluadas)``;
+            se evalúan ambos documentos de todos los vehículos.
+        """
+        desired, evaluated = {}, set()
+        vehicles = Vehicle.objects.values_list(
+            "id", "plate", "soat_due_date", "rtm_due_date"
+        ).order_by()
+        for vehicle_id, plate, soat_due, rtm_due in vehicles.iterator(chunk_size=BATCH_SIZE):
+            for doc_name, due_date in ((Alert.Subject.SOAT, soat_due), (Alert.Subject.RTM, rtm_due)):
+                evaluated.add((vehicle_id, Alert.AlertType.DOC_EXPIRATION, doc_name))
+                if not due_date:
+                    continue
+                days = (due_date - today).days
+                if days > DOC_WINDOW_DAYS:
+                    continue
+                severity = Alert.Severity.CRITICAL if days <= 0 else Alert.Severity.WARNING
+                estado = "VENCIDO" if days <= 0 else f"vence en {days} día(s)"
+                msg = f"{doc_name.label} de {plate} {estado}. Fecha límite: {due_date}."
+                desired[(vehicle_id, Alert.AlertType.DOC_EXPIRATION, doc_name)] = (severity, msg)
+        return desired, evaluated
+
+    # -----------------------------
+    # Alertas abiertas y diferencia
+    # -----------------------------
+    def _diff(self, desired, open_index, evaluated):
+        """Alertas a crear, actualizar y cerrar.
+
+        Solo se cierran las alertas abiertas de claves evaluadas en esta
+        corrida que ya no están en ``desired``.
+        """
+        to_create, to_update = [], []
+        for key, (severity, msg) in desired.items():
+            alert = open_index.get(key)
+            if alert is None:
+                vehicle_id, alert_type, subject = key
+                to_create.append(
+                    Alert(
+                        alert_type=alert_type,
+                        related_vehicle_id=vehicle_id,
+                        subject=subject,
                         severity=severity,
                         message=msg,
                         seen=False,
                     )
-                    created += 1
-            else:
-                # si ahora está lejos del umbral, cerrar alertas abiertas
-                closed += qs_prev.update(seen=True)
+                )
+            elif alert.severity != severity or alert.message != msg:
+                alert.severity = severity
+                alert.message = msg
+                to_update.append(alert)
+        to_close = [
+            a for key, a in open_index.items() if key in evaluated and key not in desired
+        ]
+        return to_create, to_update, to_close
 
-        self.stdout.write(
-            self.style.SUCCESS(
-                f"Revisiones completadas. Alertas: +{created} creadas, ~{updated} actualizadas, -{closed} cerradas."
-            )
+    def _apply(self, to_create, to_update, to_close):
+        with transaction.atomic():
+            if to_create:
+                Alert.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+            if to_update:
+                Alert.objects.bulk_update(
+                    to_update, ["severity", "message"], batch_size=BATCH_SIZE
+                )
+            if to_close:
+                Alert.objects.filter(id__in=[a.id for a in to_close]).update(seen=True)
+            if to_create or to_update or to_close:
+                invalidate("alerts")
+
+    def _print_diff(self, to_create, to_update, to_close, timings, desired_count):
+        self.stdout.write(self.style.WARNING("--- DRY RUN: no se escribió nada ---"))
+        self.stdout.write(f"Alertas deseadas: {desired_count}")
+        for label, items in (("+ crear", to_create), ("~ actualizar", to_update), ("- cerrar", to_close)):
+            self.stdout.write(f"{label}: {len(items)}")
+            for alert in items[:5]:
+                self.stdout.write(f"    [{alert.severity}] {alert.message}")
+        for phase, seconds in timings.items():
+            self.stdout.write(f"tiempo {phase}: {seconds * 1000:.1f} ms")
+
+    # -----------------------------
+    # Flota sintética (solo --dry-run)
+    # -----------------------------
+    def _create_synthetic_fleet(self, n):
+        today = timezone.now().date()
+        rng = random.Random(n)
+        Vehicle.objects.bulk_create(
+            [
+                Vehicle(
+                    plate=f"SYN{i:06d}",
+                    brand="Sintético",
+                    linea="Dry-run",
+                    modelo=2020,
+                    vehicle_type=Vehicle.VehicleType.AUTOMOVIL,
+                    soat_due_date=today + timedelta(days=rng.randint(-30, 365)),
+                    rtm_due_date=today + timedelta(days=rng.randint(-30, 365)),
+                )
+                for i in range(n)
+            ],
+            batch_size=BATCH_SIZE,
         )
+        self.stdout.write(f"Flota sintética: {n} vehículos (se revierten al final).")
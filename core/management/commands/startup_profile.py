@@ -0,0 +1,58 @@
+# core/management/commands/startup_profile.py
+"""Reporta el costo de importación del arranque de un worker web por paquete."""
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.startup import HEAVY_MODULES, profile_imports
+
+
+class Command(BaseCommand):
+    help = (
+        "Carga la aplicación WSGI en un intérprete nuevo con -X importtime y muestra "
+        "el tiempo de importación por app/paquete. Falla con --check si se cargan "
+        f"dependencias pesadas ({', '.join(HEAVY_MODULES)})."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--module", default="project.wsgi", help="Módulo WSGI a importar")
+        parser.add_argument("--limit", type=int, default=20, help="Paquetes/módulos a listar")
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Termina con error si el arranque importa alguna dependencia pesada.",
+        )
+
+    def handle(self, *args, **opts):
+        try:
+            profile = profile_imports(opts["module"])
+        except RuntimeError as e:
+            raise CommandError(f"No se pudo cargar {opts['module']}:\n{e}")
+        limit = opts["limit"]
+        base_dir = str(settings.BASE_DIR)
+        local_apps = {
+            config.name.split(".")[0]
+            for config in apps.get_app_configs()
+            if str(config.path).startswith(base_dir)
+        }
+
+        self.stdout.write(f"Arranque de {opts['module']}: {profile.total_us / 1000:.1f} ms en importaciones")
+        self.stdout.write(f"\n{'paquete':<32}{'ms':>10}")
+        for package, self_us in list(profile.by_package.items())[:limit]:
+            mark = " *" if package in local_apps else ""
+            self.stdout.write(f"{package:<32}{self_us / 1000:>10.1f}{mark}")
+        self.stdout.write("(* app del proyecto; tiempo propio de todos sus módulos)")
+
+        self.stdout.write(f"\n{'módulo (acumulado)':<48}{'ms':>10}")
+        for name, _, cumulative in sorted(profile.modules, key=lambda m: -m[2])[:limit]:
+            self.stdout.write(f"{name:<48}{cumulative / 1000:>10.1f}")
+
+        heavy = profile.heavy_loaded()
+        if heavy:
+            message = f"Dependencias pesadas cargadas al arrancar: {', '.join(heavy)}"
+            if opts["check"]:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS("Sin dependencias pesadas en el arranque."))
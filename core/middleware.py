@@ -1,14 +1,26 @@
-"""Middleware utilitario para volcar información de errores.
+"""Middleware utilitario para errores y métricas de las peticiones.
 
 `DumpOnErrorMiddleware` registra en los logs los datos relevantes de la
 solicitud y el *traceback* cuando ocurre una excepción no controlada.
+`RequestMetricsMiddleware` mide tiempo y consultas de cada petición y
+registra las lentas.
 """
 
 import logging
+import math
+import re
+import threading
+import time
 import traceback
+from collections import Counter, deque
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
 
 
 logger = logging.getLogger(__name__)
+slow_logger = logging.getLogger("core.slow_requests")
 
 
 class DumpOnErrorMiddleware:
@@ -52,3 +64,181 @@ class DumpOnErrorMiddleware:
             except Exception:
                 logger.exception("No se pudo volcar el error")
             raise
+
+
+class RequestMetrics:
+    """Agregados por ruta de las peticiones medidas (en memoria, por proceso).
+
+    Cada ruta guarda contadores totales y las últimas ``SAMPLE_SIZE``
+    duraciones, de las que se calculan los percentiles al consultar.
+    """
+
+    SAMPLE_SIZE = 500
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self.started_at = time.time()
+
+    def record(self, route, wall_ms, db_ms, queries, duplicates):
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = {
+                    "count": 0,
+                    "wall_ms_total": 0.0,
+                    "db_ms_total": 0.0,
+                    "queries_total": 0,
+                    "queries_max": 0,
+                    "duplicates_total": 0,
+                    "samples": deque(maxlen=self.SAMPLE_SIZE),
+                }
+            stats["count"] += 1
+            stats["wall_ms_total"] += wall_ms
+            stats["db_ms_total"] += db_ms
+            stats["queries_total"] += queries
+            stats["queries_max"] = max(stats["queries_max"], queries)
+            stats["duplicates_total"] += duplicates
+            stats["samples"].append(wall_ms)
+
+    def snapshot(self):
+        """Agregados por ruta, de la más lenta (p95) a la más rápida."""
+        with self._lock:
+            routes = {
+                route: dict(stats, samples=sorted(stats["samples"]))
+                for route, stats in self._routes.items()
+            }
+        result = []
+        for route, stats in routes.items():
+            samples, count = stats["samples"], stats["count"]
+            result.append(
+                {
+                    "route": route,
+                    "count": count,
+                    "p50_ms": _percentile(samples, 50),
+                    "p95_ms": _percentile(samples, 95),
+                    "p99_ms": _percentile(samples, 99),
+                    "max_ms": round(samples[-1], 1) if samples else None,
+                    "avg_db_ms": round(stats["db_ms_total"] / count, 1),
+                    "avg_queries": round(stats["queries_total"] / count, 1),
+                    "max_queries": stats["queries_max"],
+                    "avg_duplicate_queries": round(stats["duplicates_total"] / count, 1),
+                }
+            )
+        result.sort(key=lambda r: r["p95_ms"] or 0, reverse=True)
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self.started_at = time.time()
+
+
+def _percentile(samples, pct):
+    """Percentil por rango más cercano sobre una lista ordenada."""
+    if not samples:
+        return None
+    index = max(0, math.ceil(pct / 100 * len(samples)) - 1)
+    return round(samples[index], 1)
+
+
+# Agregados de este proceso (los expone ``core.views.request_metrics_view``)
+request_metrics = RequestMetrics()
+
+# ``IN (%s, %s, ...)`` de distinto largo cuenta como la misma consulta
+_PARAM_LIST = re.compile(r"%s(?:\s*,\s*%s)+")
+
+
+def query_fingerprint(sql):
+    """Forma normalizada de una consulta (sin parámetros ni largo de listas)."""
+    return _PARAM_LIST.sub("%s...", " ".join(sql.split()))
+
+
+class QueryCounter:
+    """``execute_wrapper`` que cuenta consultas, tiempo en BD y repeticiones."""
+
+    def __init__(self):
+        self.count = 0
+        self.db_seconds = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[sql] += 1
+
+    def duplicates(self):
+        """Consultas repetidas (mismo SQL normalizado) -> veces, mayor primero."""
+        grouped = Counter()
+        for sql, times in self.fingerprints.items():
+            grouped[query_fingerprint(sql)] += times
+        return [(sql, times) for sql, times in grouped.most_common() if times > 1]
+
+
+class RequestMetricsMiddleware:
+    """Mide tiempo total, tiempo en BD y consultas de cada petición.
+
+    - Las peticiones que superan ``SLOW_REQUEST_MS``, ``SLOW_REQUEST_QUERIES``
+      o ``SLOW_REQUEST_DUPLICATES`` (repeticiones de una misma consulta, el
+      síntoma de un N+1) se registran en el logger ``core.slow_requests`` con
+      las consultas más repetidas.
+    - Los agregados por ruta quedan en :data:`request_metrics`.
+    - La respuesta lleva un encabezado ``Server-Timing`` (``db`` y ``total``).
+
+    Está apagado por defecto y se activa con ``REQUEST_METRICS=true`` en el
+    entorno. Con ``REQUEST_METRICS_ENABLED = False`` Django descarta el
+    middleware al arrancar (``MiddlewareNotUsed``) y no agrega ningún costo
+    por petición.
+    El tiempo de respuestas en streaming cubre solo hasta entregar la
+    respuesta, no el envío del cuerpo.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_METRICS_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, "SLOW_REQUEST_MS", 1000)
+        self.slow_queries = getattr(settings, "SLOW_REQUEST_QUERIES", 50)
+        self.slow_duplicates = getattr(settings, "SLOW_REQUEST_DUPLICATES", 10)
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        wall_ms = (time.perf_counter() - start) * 1000
+        db_ms = counter.db_seconds * 1000
+
+        try:
+            self._record(request, response, counter, wall_ms, db_ms)
+        except Exception:
+            logger.exception("No se pudieron registrar las métricas de la petición")
+        return response
+
+    def _record(self, request, response, counter, wall_ms, db_ms):
+        match = getattr(request, "resolver_match", None)
+        route = f"{request.method} /{match.route}" if match else f"{request.method} <sin ruta>"
+        duplicates = counter.duplicates()
+        repeated = sum(times - 1 for _, times in duplicates)
+        request_metrics.record(route, wall_ms, db_ms, counter.count, repeated)
+
+        if not response.has_header("Server-Timing"):
+            response["Server-Timing"] = f"db;dur={db_ms:.1f}, total;dur={wall_ms:.1f}"
+
+        worst = duplicates[0][1] if duplicates else 0
+        if wall_ms >= self.slow_ms or counter.count >= self.slow_queries or worst >= self.slow_duplicates:
+            slow_logger.warning(
+                "Petición lenta %s %s -> %s | total=%.0fms bd=%.0fms consultas=%d repetidas=%d%s",
+                request.method,
+                request.get_full_path(),
+                response.status_code,
+                wall_ms,
+                db_ms,
+                counter.count,
+                repeated,
+                "".join(f"\n  {times}x {sql[:300]}" for sql, times in duplicates[:5]),
+            )
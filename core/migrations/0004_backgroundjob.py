@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-17 12:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_zone'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackgroundJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('IMPORT_ODOMETER', 'Importar Tanqueos'), ('PERIODIC_CHECKS', 'Revisiones Periódicas')], max_length=30, verbose_name='Tipo')),
+                ('status', models.CharField(choices=[('PENDING', 'En cola'), ('RUNNING', 'En ejecución'), ('SUCCEEDED', 'Completado'), ('FAILED', 'Fallido')], default='PENDING', max_length=20, verbose_name='Estado')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Parámetros')),
+                ('file_path', models.CharField(blank=True, max_length=500, verbose_name='Archivo')),
+                ('original_filename', models.CharField(blank=True, max_length=255, verbose_name='Nombre Original')),
+                ('progress', models.PositiveSmallIntegerField(default=0, verbose_name='Progreso (%)')),
+                ('progress_message', models.CharField(blank=True, max_length=255, verbose_name='Último Mensaje')),
+                ('output', models.TextField(blank=True, verbose_name='Salida')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('worker', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='background_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Trabajo en Segundo Plano',
+                'verbose_name_plural': 'Trabajos en Segundo Plano',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='core_backgr_status_e66a68_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.5 on 2026-10-17 12:41
+
+from django.db import migrations, models
+
+
+DOCUMENTS = ("SOAT", "RTM")
+
+
+def backfill_subject(apps, schema_editor):
+    """Asigna el asunto a las alertas existentes y cierra duplicados abiertos.
+
+    El documento de DOC_EXPIRATION se deducía del mensaje; es la última vez
+    que se hace. Entre varias alertas abiertas con la misma clave (solo las
+    de tipos con asunto) se conserva la más reciente para poder crear el
+    índice único parcial.
+    """
+    Alert = apps.get_model("core", "Alert")
+    subject_by_type = {
+        "PREVENTIVE_DUE": "PREVENTIVE",
+        "ODOMETER_INCONSISTENT": "ODOMETER",
+        "ODOMETER_UNAVAILABLE": "ODOMETER",
+    }
+    for alert_type, subject in subject_by_type.items():
+        Alert.objects.filter(alert_type=alert_type).update(subject=subject)
+    for doc in DOCUMENTS:
+        Alert.objects.filter(
+            alert_type="DOC_EXPIRATION", message__istartswith=doc
+        ).update(subject=doc)
+
+    seen_keys = set()
+    duplicates = []
+    open_alerts = (
+        Alert.objects.filter(seen=False, related_vehicle__isnull=False)
+        .exclude(subject="")
+        .order_by("-created_at", "-id")
+        .values_list("id", "alert_type", "related_vehicle_id", "subject")
+    )
+    for alert_id, alert_type, vehicle_id, subject in open_alerts.iterator():
+        key = (alert_type, vehicle_id, subject)
+        if key in seen_keys:
+            duplicates.append(alert_id)
+        else:
+            seen_keys.add(key)
+    for start in range(0, len(duplicates), 500):
+        Alert.objects.filter(id__in=duplicates[start:start + 500]).update(seen=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_backgroundjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='alert',
+            name='subject',
+            field=models.CharField(blank=True, choices=[('', 'Sin asunto'), ('SOAT', 'SOAT'), ('RTM', 'RTM'), ('PREVENTIVE', 'Preventivo'), ('ODOMETER', 'Odómetro')], default='', max_length=30, verbose_name='Asunto'),
+        ),
+        migrations.RunPython(backfill_subject, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='alert',
+            constraint=models.UniqueConstraint(condition=models.Q(('seen', False), models.Q(('subject', ''), _negated=True)), fields=('alert_type', 'related_vehicle', 'subject'), name='core_alert_one_open_per_subject'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def collapse_duplicates(apps, schema_editor):
+    """Deja una sola fila (la más antigua) por clave natural antes de crear las restricciones."""
+    for model_name, key in (
+        ("FuelFill", ("vehicle_id", "fill_date", "odometer_km")),
+        ("OdometerReading", ("vehicle_id", "reading_date", "reading_km", "source")),
+    ):
+        Model = apps.get_model("core", model_name)
+        duplicates = (
+            Model.objects.values(*key)
+            .annotate(n=Count("id"), keep=Min("id"))
+            .filter(n__gt=1)
+            .order_by()
+        )
+        for group in duplicates.iterator():
+            keep = group.pop("keep")
+            group.pop("n")
+            Model.objects.filter(**group).exclude(pk=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_alert_subject'),
+    ]
+
+    operations = [
+        migrations.RunPython(collapse_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='fuelfill',
+            constraint=models.UniqueConstraint(fields=('vehicle', 'fill_date', 'odometer_km'), name='core_fuelfill_natural_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='odometerreading',
+            constraint=models.UniqueConstraint(fields=('vehicle', 'reading_date', 'reading_km', 'source'), name='core_odometerreading_natural_key'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 13:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_fuel_natural_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backgroundjob',
+            name='file_content',
+            field=models.BinaryField(blank=True, default=b'', verbose_name='Contenido'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Recrea el índice único parcial sin las alertas sin asunto.
+
+    En bases donde 0005 ya creó el índice sobre todos los tipos de alerta lo
+    reemplaza; en una base nueva lo vuelve a crear igual.
+    """
+
+    dependencies = [
+        ('core', '0007_backgroundjob_file_content'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='alert',
+            name='core_alert_one_open_per_subject',
+        ),
+        migrations.AddConstraint(
+            model_name='alert',
+            constraint=models.UniqueConstraint(condition=models.Q(('seen', False), models.Q(('subject', ''), _negated=True)), fields=('alert_type', 'related_vehicle', 'subject'), name='core_alert_one_open_per_subject'),
+        ),
+    ]
@@ -1,7 +1,9 @@
 """Core models shared across the project."""
 
-from django.db import models
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import Q
 from django.conf import settings
+from django.utils import timezone
 
 
 # --- NUEVO MODELO ---
@@ -46,6 +48,13 @@ class FuelFill(models.Model):
         verbose_name = "Registro de Tanqueo"
         verbose_name_plural = "Registros de Tanqueo"
         ordering = ["-fill_date"]
+        constraints = [
+            # Clave natural: reimportar un archivo no duplica tanqueos
+            models.UniqueConstraint(
+                fields=["vehicle", "fill_date", "odometer_km"],
+                name="core_fuelfill_natural_key",
+            ),
+        ]
 
 
 class OdometerReading(models.Model):
@@ -80,6 +89,142 @@ class OdometerReading(models.Model):
         verbose_name = "Histórico de Odómetro"
         verbose_name_plural = "Históricos de Odómetro"
         ordering = ["-reading_date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["vehicle", "reading_date", "reading_km", "source"],
+                name="core_odometerreading_natural_key",
+            ),
+        ]
+
+
+class AlertManager(models.Manager):
+    """Operaciones de alta o actualización de alertas abiertas por clave estructurada.
+
+    La clave de una alerta abierta es ``(alert_type, related_vehicle, subject)``
+    y está respaldada por un índice único parcial (``seen = False`` y asunto
+    no vacío); estas operaciones requieren un ``subject``.
+    """
+
+    def open_index(self, alert_types, vehicle_ids=None):
+        """Una consulta: ``{(vehicle_id, alert_type, subject): alerta}`` de alertas abiertas."""
+        qs = self.filter(
+            alert_type__in=list(alert_types),
+            related_vehicle__isnull=False,
+            seen=False,
+        )
+        if vehicle_ids is not None:
+            qs = qs.filter(related_vehicle_id__in=list(vehicle_ids))
+        qs = qs.only("id", "alert_type", "subject", "related_vehicle_id", "severity", "message")
+        return {
+            (a.related_vehicle_id, a.alert_type, a.subject): a
+            for a in qs.order_by().iterator(chunk_size=2000)
+        }
+
+    def raise_or_update(self, alert_type, vehicle, subject, severity, message):
+        """Crea la alerta abierta de la clave dada o actualiza su severidad/mensaje.
+
+        En PostgreSQL es un único ``INSERT ... ON CONFLICT DO UPDATE``; en
+        otros motores se usa ``UPDATE`` y, si no había alerta, ``INSERT``.
+
+        Returns:
+            tuple[int, bool]: ``(id de la alerta, creada)``.
+        """
+        from .dashboard import invalidate
+
+        vehicle_id = getattr(vehicle, "pk", vehicle)
+        message = message[:255]
+        if connection.vendor == "postgresql":
+            result = self._upsert_postgresql(alert_type, vehicle_id, subject, severity, message)
+        else:
+            result = self._update_or_create(alert_type, vehicle_id, subject, severity, message)
+        # Después de escribir (las rutas con ``update``/SQL crudo no emiten
+        # señales): así ninguna lectura anterior a la escritura queda en caché
+        invalidate("alerts")
+        return result
+
+    def _update_or_create(self, alert_type, vehicle_id, subject, severity, message):
+        open_qs = self.filter(
+            alert_type=alert_type,
+            related_vehicle_id=vehicle_id,
+            subject=subject,
+            seen=False,
+        )
+        for _ in range(2):
+            if open_qs.update(severity=severity, message=message):
+                return open_qs.values_list("id", flat=True).first(), False
+            try:
+                with transaction.atomic():
+                    alert = self.create(
+                        alert_type=alert_type,
+                        related_vehicle_id=vehicle_id,
+                        subject=subject,
+                        severity=severity,
+                        message=message,
+                    )
+                return alert.pk, True
+            except IntegrityError:
+                continue  # otro proceso la creó; actualizamos
+        raise IntegrityError("No se pudo registrar la alerta %s/%s" % (alert_type, subject))
+
+    def _upsert_postgresql(self, alert_type, vehicle_id, subject, severity, message):
+        opts = self.model._meta
+        col = lambda name: opts.get_field(name).column  # noqa: E731
+        sql = (
+            f"INSERT INTO {opts.db_table} "
+            f"({col('alert_type')}, {col('related_vehicle')}, {col('subject')}, "
+            f"{col('severity')}, {col('message')}, {col('seen')}, {col('created_at')}) "
+            f"VALUES (%s, %s, %s, %s, %s, false, %s) "
+            f"ON CONFLICT ({col('alert_type')}, {col('related_vehicle')}, {col('subject')}) "
+            f"WHERE {col('seen')} = false AND {col('subject')} <> '' "
+            f"DO UPDATE SET {col('severity')} = EXCLUDED.{col('severity')}, "
+            f"{col('message')} = EXCLUDED.{col('message')} "
+            f"RETURNING id, (xmax = 0)"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                sql, [alert_type, vehicle_id, subject, severity, message, timezone.now()]
+            )
+            alert_id, created = cursor.fetchone()
+        return alert_id, created
+
+    def bulk_raise_or_update(self, alert_type, desired, batch_size=1000):
+        """Versión por lotes de :meth:`raise_or_update`.
+
+        Args:
+            alert_type: Tipo de alerta.
+            desired: ``{(vehicle_id, subject): (severity, message)}``.
+
+        Returns:
+            tuple[int, int]: ``(creadas, actualizadas)``.
+        """
+        if not desired:
+            return 0, 0
+        index = self.open_index([alert_type], {vehicle_id for vehicle_id, _ in desired})
+        to_create, to_update = [], []
+        for (vehicle_id, subject), (severity, message) in desired.items():
+            alert = index.get((vehicle_id, alert_type, subject))
+            message = message[:255]
+            if alert is None:
+                to_create.append(
+                    self.model(
+                        alert_type=alert_type,
+                        related_vehicle_id=vehicle_id,
+                        subject=subject,
+                        severity=severity,
+                        message=message,
+                    )
+                )
+            elif (alert.severity, alert.message) != (severity, message):
+                alert.severity, alert.message = severity, message
+                to_update.append(alert)
+        with transaction.atomic():
+            self.bulk_create(to_create, batch_size=batch_size)
+            self.bulk_update(to_update, ["severity", "message"], batch_size=batch_size)
+        if to_create or to_update:
+            from .dashboard import invalidate
+
+            invalidate("alerts")
+        return len(to_create), len(to_update)
 
 
 class Alert(models.Model):
@@ -105,9 +250,25 @@ class Alert(models.Model):
         WARNING = "WARNING", "Advertencia"
         CRITICAL = "CRITICAL", "Crítica"
 
+    class Subject(models.TextChoices):
+        """Documento o hito al que se refiere la alerta (clave de deduplicación)."""
+
+        NONE = "", "Sin asunto"
+        SOAT = "SOAT", "SOAT"
+        RTM = "RTM", "RTM"
+        PREVENTIVE = "PREVENTIVE", "Preventivo"
+        ODOMETER = "ODOMETER", "Odómetro"
+
     alert_type = models.CharField(
         "Tipo de Alerta", max_length=30, choices=AlertType.choices
     )
+    subject = models.CharField(
+        "Asunto",
+        max_length=30,
+        choices=Subject.choices,
+        blank=True,
+        default=Subject.NONE,
+    )
     message = models.CharField("Mensaje", max_length=255)
     severity = models.CharField(
         "Severidad", max_length=20, choices=Severity.choices, default=Severity.INFO
@@ -126,6 +287,8 @@ class Alert(models.Model):
     seen = models.BooleanField("Vista", default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = AlertManager()
+
     def __str__(self) -> str:
         """Return alert message with severity."""
 
@@ -135,4 +298,67 @@ class Alert(models.Model):
         verbose_name = "Alerta"
         verbose_name_plural = "Alertas"
         ordering = ["-created_at"]
+        constraints = [
+            # Una sola alerta abierta por (tipo, vehículo, asunto); las alertas
+            # sin asunto (OT urgente, stock bajo, ...) pueden repetirse
+            models.UniqueConstraint(
+                fields=["alert_type", "related_vehicle", "subject"],
+                condition=Q(seen=False) & ~Q(subject=""),
+                name="core_alert_one_open_per_subject",
+            ),
+        ]
+
+
+
+class BackgroundJob(models.Model):
+    """Trabajo en segundo plano ejecutado por ``run_job_worker``."""
+
+    class Kind(models.TextChoices):
+        IMPORT_ODOMETER = "IMPORT_ODOMETER", "Importar Tanqueos"
+        PERIODIC_CHECKS = "PERIODIC_CHECKS", "Revisiones Periódicas"
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "En cola"
+        RUNNING = "RUNNING", "En ejecución"
+        SUCCEEDED = "SUCCEEDED", "Completado"
+        FAILED = "FAILED", "Fallido"
+
+    kind = models.CharField("Tipo", max_length=30, choices=Kind.choices)
+    status = models.CharField(
+        "Estado", max_length=20, choices=Status.choices, default=Status.PENDING
+    )
+    payload = models.JSONField("Parámetros", default=dict, blank=True)
+    file_path = models.CharField("Archivo", max_length=500, blank=True)
+    # Contenido del archivo hasta que el worker lo procesa (sin disco compartido)
+    file_content = models.BinaryField("Contenido", blank=True, default=b"")
+    original_filename = models.CharField("Nombre Original", max_length=255, blank=True)
+    progress = models.PositiveSmallIntegerField("Progreso (%)", default=0)
+    progress_message = models.CharField("Último Mensaje", max_length=255, blank=True)
+    output = models.TextField("Salida", blank=True)
+    error = models.TextField("Error", blank=True)
+    worker = models.CharField("Worker", max_length=100, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="background_jobs",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        """Return kind and status of the job."""
 
+        return f"#{self.pk} {self.get_kind_display()} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (self.Status.SUCCEEDED, self.Status.FAILED)
+
+    class Meta:
+        verbose_name = "Trabajo en Segundo Plano"
+        verbose_name_plural = "Trabajos en Segundo Plano"
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["status", "created_at"])]
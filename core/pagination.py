@@ -0,0 +1,56 @@
+"""Paginación por cursor (keyset) para los endpoints de lista grandes del API.
+
+Se activa por viewset (``pagination_class = KeysetPagination``); los demás
+endpoints conservan la lista completa sin paginar que esperan sus clientes.
+
+En lugar de ``OFFSET`` cada página filtra por la clave de la última fila
+vista (``WHERE clave > cursor ORDER BY clave LIMIT n``), así que la latencia
+no depende del tamaño de la tabla ni de la página pedida.
+
+Cada viewset declara en ``keyset_orderings`` los ordenamientos permitidos;
+solo deben incluir campos únicos respaldados por un índice (pk o campos
+``unique``): DRF posiciona el cursor con el primer campo del orden, así que
+con valores repetidos las páginas saltan o repiten filas. El primero es el
+predeterminado. ``?ordering=<campo>`` elige
+otro de la lista y ``?count=1`` agrega el total en el encabezado
+``X-Total-Count`` (cuesta un ``COUNT(*)``, por eso es opcional).
+"""
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+
+DEFAULT_ORDERINGS = ("-id", "id")
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+class KeysetPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    ordering_param = "ordering"
+    count_query_param = "count"
+
+    def get_ordering(self, request, queryset, view):
+        allowed = tuple(getattr(view, "keyset_orderings", DEFAULT_ORDERINGS))
+        requested = request.query_params.get(self.ordering_param)
+        if requested and requested not in allowed:
+            raise ValidationError(
+                {self.ordering_param: f"Ordenamientos permitidos: {', '.join(allowed)}."}
+            )
+        field = requested or allowed[0]
+        if field.lstrip("-") in ("id", "pk"):
+            return (field,)
+        # Desempate por id en la misma dirección para que el cursor sea estable
+        return (field, "-id" if field.startswith("-") else "id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.total_count = None
+        if request.query_params.get(self.count_query_param, "").lower() in ("1", "true", "yes"):
+            self.total_count = queryset.count()
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.total_count is not None:
+            response[TOTAL_COUNT_HEADER] = str(self.total_count)
+        return response
@@ -0,0 +1,225 @@
+"""Perfilado bajo demanda de peticiones y comandos de gestión.
+
+Nada se perfila por defecto. Se activa:
+
+- En una petición de un superusuario con ``?_profile=1``.
+- En una petición con el encabezado ``X-Sigma-Profile: <token>``, donde el
+  token es la firma de un superusuario (:func:`profile_token`, válido
+  ``TOKEN_MAX_AGE`` segundos); sirve para clientes de la API con JWT, cuyo
+  usuario no se conoce en el middleware.
+- En ``import_odometer``, ``run_daily_jobs`` y ``run_periodic_checks`` con
+  ``--profile`` (:class:`ProfileCommandMixin`).
+
+Si ``pyinstrument`` está instalado (y ``PROFILER`` no es ``"cprofile"``) se
+usa ese perfilador por muestreo y se guarda su reporte HTML; si no, se usa
+``cProfile`` y se guardan las estadísticas (``.prof``, legibles con
+``pstats``/snakeviz). Los perfiles van a ``PROFILE_DIR``, que funciona como
+buffer circular de ``PROFILE_KEEP`` archivos; se listan y descargan desde
+``core/profiles/``.
+"""
+
+import cProfile
+import logging
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional
+
+from django.conf import settings
+from django.core import signing
+from django.utils.text import slugify
+
+logger = logging.getLogger(__name__)
+
+PROFILE_PARAM = "_profile"
+PROFILE_HEADER = "HTTP_X_SIGMA_PROFILE"
+TOKEN_SALT = "core.profiling"
+TOKEN_MAX_AGE = 60 * 60
+
+# Solo nombres generados por ``_store`` (evita recorrer rutas en la descarga)
+PROFILE_NAME = re.compile(r"^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}-[\w-]*\.(prof|html)$")
+
+
+class Capture:
+    """Resultado de :func:`profiled`; ``path`` se completa al salir del bloque."""
+
+    def __init__(self, label):
+        self.label = label
+        self.path: Optional[Path] = None
+        self.elapsed_ms: Optional[float] = None
+
+
+def profile_dir() -> Path:
+    """Directorio de perfiles (se crea si no existe)."""
+    path = Path(settings.PROFILE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _sampling_profiler():
+    if getattr(settings, "PROFILER", "auto") == "cprofile":
+        return None
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        return None
+    return Profiler
+
+
+def _store(label, suffix, write) -> Path:
+    """Guarda un perfil nuevo y descarta los más viejos que ``PROFILE_KEEP``."""
+    directory = profile_dir()
+    name = "%s-%s-%s%s" % (
+        time.strftime("%Y%m%dT%H%M%S"),
+        uuid.uuid4().hex[:8],
+        slugify(label.replace("/", " "))[:80],
+        suffix,
+    )
+    path = directory / name
+    write(str(path))
+    for old in list_profiles()[settings.PROFILE_KEEP:]:
+        try:
+            (directory / old["name"]).unlink()
+        except FileNotFoundError:
+            pass
+    return path
+
+
+@contextmanager
+def profiled(label):
+    """Perfila el bloque y guarda el resultado en ``PROFILE_DIR``.
+
+    Uso::
+
+        with profiled("run_daily_jobs") as capture:
+            ...
+        print(capture.path)
+    """
+    capture = Capture(label)
+    sampler = _sampling_profiler()
+    start = time.perf_counter()
+    if sampler is not None:
+        profiler = sampler()
+        profiler.start()
+        try:
+            yield capture
+        finally:
+            profiler.stop()
+            capture.elapsed_ms = (time.perf_counter() - start) * 1000
+            html = profiler.output_html()
+            capture.path = _store(label, ".html", lambda p: Path(p).write_text(html, encoding="utf-8"))
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield capture
+        finally:
+            profiler.disable()
+            capture.elapsed_ms = (time.perf_counter() - start) * 1000
+            capture.path = _store(label, ".prof", profiler.dump_stats)
+
+
+def list_profiles() -> List[dict]:
+    """Perfiles guardados, del más reciente al más viejo."""
+    directory = Path(settings.PROFILE_DIR)
+    if not directory.is_dir():
+        return []
+    profiles = []
+    for path in directory.iterdir():
+        if not PROFILE_NAME.match(path.name):
+            continue
+        stat = path.stat()
+        profiles.append(
+            {
+                "name": path.name,
+                "label": path.stem.split("-", 2)[-1],
+                "size_bytes": stat.st_size,
+                "created_at": stat.st_mtime,
+            }
+        )
+    profiles.sort(key=lambda p: (p["created_at"], p["name"]), reverse=True)
+    return profiles
+
+
+def profile_path(name) -> Optional[Path]:
+    """Ruta de un perfil guardado o ``None`` si el nombre no es válido."""
+    if not PROFILE_NAME.match(name or ""):
+        return None
+    path = Path(settings.PROFILE_DIR) / name
+    return path if path.is_file() else None
+
+
+def profile_token(user) -> str:
+    """Token firmado para el encabezado ``X-Sigma-Profile``."""
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(str(user.pk))
+
+
+def _token_allows(token) -> bool:
+    try:
+        user_id = signing.TimestampSigner(salt=TOKEN_SALT).unsign(token, max_age=TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    from django.contrib.auth import get_user_model
+
+    return get_user_model().objects.filter(pk=user_id, is_active=True, is_superuser=True).exists()
+
+
+def wants_profile(request) -> bool:
+    """``True`` si la petición pidió ser perfilada y tiene permiso."""
+    token = request.META.get(PROFILE_HEADER)
+    if token:
+        return _token_allows(token)
+    # Se revisa la cadena cruda antes de analizar ``request.GET``
+    if PROFILE_PARAM not in request.META.get("QUERY_STRING", ""):
+        return False
+    user = getattr(request, "user", None)
+    return bool(
+        request.GET.get(PROFILE_PARAM) == "1" and user is not None and user.is_superuser
+    )
+
+
+class ProfilingMiddleware:
+    """Perfila las peticiones que lo piden (ver :func:`wants_profile`).
+
+    Va después de ``AuthenticationMiddleware``. La respuesta lleva el nombre
+    del perfil en ``X-Sigma-Profile-Name``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not wants_profile(request):
+            return self.get_response(request)
+        with profiled(f"{request.method} {request.path}") as capture:
+            response = self.get_response(request)
+        response["X-Sigma-Profile-Name"] = capture.path.name
+        logger.info("Perfil de %s %s: %s", request.method, request.path, capture.path)
+        return response
+
+
+class ProfileCommandMixin:
+    """Agrega ``--profile`` a un comando de gestión.
+
+    Debe ir antes de ``BaseCommand`` en las bases de la clase.
+    """
+
+    def create_parser(self, prog_name, subcommand, **kwargs):
+        parser = super().create_parser(prog_name, subcommand, **kwargs)
+        parser.add_argument(
+            "--profile",
+            action="store_true",
+            help="Perfila la ejecución y guarda el resultado en PROFILE_DIR.",
+        )
+        return parser
+
+    def execute(self, *args, **options):
+        if not options.get("profile"):
+            return super().execute(*args, **options)
+        name = self.__module__.rsplit(".", 1)[-1]
+        with profiled(name) as capture:
+            result = super().execute(*args, **options)
+        self.stderr.write(f"Perfil guardado en {capture.path} ({capture.elapsed_ms:.0f} ms)")
+        return result
@@ -0,0 +1,130 @@
+"""Plan de consultas derivado del serializer de cada viewset.
+
+:class:`QueryPlanMixin` recorre los campos declarados del serializer y
+aplica al queryset exactamente los ``select_related``/``prefetch_related``
+que necesita:
+
+- FK serializada como PK: se lee de ``<campo>_id``, sin join.
+- FK anidada o con ``source`` punteado (``vehicle.plate``): ``select_related``.
+- Relaciones múltiples (M2M, FK inversa) como PKs o anidadas: ``prefetch_related``
+  (recursivo para los serializers anidados).
+
+Los ``select_related``/``prefetch_related`` que el viewset declare y el
+serializer no use se descartan. El plan se calcula una vez por serializer.
+"""
+
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField, RelatedField
+
+_plans = {}
+
+
+class QueryPlan:
+    """Joins y prefetches que necesita un serializer."""
+
+    def __init__(self):
+        self.select = set()
+        self.prefetch = {}  # ruta -> modelo (solo PKs) o None (objetos completos)
+
+    def apply(self, queryset):
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if self.select:
+            queryset = queryset.select_related(*sorted(self.select))
+        lookups = []
+        for path, pk_model in sorted(self.prefetch.items()):
+            if pk_model is not None:
+                # Solo se serializan las PKs: no se cargan las demás columnas
+                lookups.append(Prefetch(path, queryset=pk_model._default_manager.only("pk")))
+            else:
+                lookups.append(path)
+        if lookups:
+            queryset = queryset.prefetch_related(*lookups)
+        return queryset
+
+
+def _related_model(model, attr):
+    try:
+        field = model._meta.get_field(attr)
+    except Exception:
+        return None
+    return field.related_model if field.is_relation else None
+
+
+def _many(model, attr):
+    try:
+        field = model._meta.get_field(attr)
+    except Exception:
+        return False
+    return field.is_relation and (field.many_to_many or field.one_to_many)
+
+
+def _walk(serializer, model, prefix, plan, in_prefetch):
+    """Recorre los campos de ``serializer`` (modelo ``model``) bajo la ruta ``prefix``."""
+    for field in serializer.fields.values():
+        if field.write_only or field.source == "*":
+            continue
+        attrs = field.source_attrs
+
+        # Ruta de relaciones recorridas por un ``source`` punteado
+        current, path = model, []
+        for attr in attrs[:-1]:
+            related = _related_model(current, attr)
+            if related is None:
+                break
+            path.append(attr)
+            if _many(current, attr):
+                plan.prefetch.setdefault(prefix + "__".join(path), None)
+                in_prefetch = True
+            elif not in_prefetch:
+                plan.select.add(prefix + "__".join(path))
+            current = related
+        else:
+            last = attrs[-1] if attrs else None
+            full = prefix + "__".join(path + [last]) if last else None
+            related = _related_model(current, last) if last else None
+
+            if isinstance(field, serializers.ListSerializer):
+                if related is not None:
+                    plan.prefetch[full] = None
+                    _walk(field.child, related, full + "__", plan, True)
+            elif isinstance(field, serializers.BaseSerializer):
+                if related is not None:
+                    if in_prefetch or _many(current, last):
+                        plan.prefetch[full] = None
+                    else:
+                        plan.select.add(full)
+                    _walk(field, related, full + "__", plan, in_prefetch)
+            elif isinstance(field, ManyRelatedField):
+                if related is not None and full not in plan.prefetch:
+                    child = field.child_relation
+                    pk_only = isinstance(child, PrimaryKeyRelatedField)
+                    plan.prefetch[full] = related if pk_only else None
+            elif isinstance(field, RelatedField):
+                # Una FK como PK se lee de ``<campo>_id``; otras representaciones
+                # (slug, str) necesitan el objeto relacionado
+                if related is not None and not isinstance(field, PrimaryKeyRelatedField):
+                    if in_prefetch:
+                        plan.prefetch.setdefault(full, None)
+                    else:
+                        plan.select.add(full)
+
+
+def plan_for(serializer_class):
+    """Plan (en caché) para un serializer de modelo."""
+    plan = _plans.get(serializer_class)
+    if plan is None:
+        plan = QueryPlan()
+        model = getattr(getattr(serializer_class, "Meta", None), "model", None)
+        if model is not None:
+            _walk(serializer_class(), model, "", plan, False)
+        _plans[serializer_class] = plan
+    return plan
+
+
+class QueryPlanMixin:
+    """Mixin de viewset: ajusta el queryset a lo que serializa ``serializer_class``."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        return plan_for(self.get_serializer_class()).apply(queryset)
@@ -1,132 +1,294 @@
 # core/services.py
+"""Servicios de ingesta de tanqueos (hoja TANQUEOS).
+
+Las filas llegan ya tipadas desde ``core.sheet_reader``.
+
+La ingesta trabaja por conjuntos: las anomalías y nuevas lecturas se calculan
+con operaciones de pandas/NumPy agrupadas por vehículo y todo se escribe con
+``bulk_create(ignore_conflicts=True)`` por lotes. Las restricciones únicas de
+``FuelFill`` y ``OdometerReading`` descartan en la base de datos las filas ya
+importadas, así que reimportar un archivo solapado no duplica nada aunque dos
+cargas corran a la vez. Los tanqueos nuevos se cuentan con ``RETURNING`` en la
+misma inserción (PostgreSQL, SQLite >= 3.35). El número de consultas no
+depende de las filas.
+El odómetro de los vehículos avanza con ``fleet.odometer.advance_odometers``
+(una sentencia, sin lectura previa en Python).
+"""
+
 import logging
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import TYPE_CHECKING, Set
 
-import pandas as pd
-from django.db import transaction
+from django.db import connection, transaction
+from django.utils import timezone
 
-from fleet.models import Vehicle
+from fleet.odometer import advance_odometers
+from fleet.plates import vehicle_rows_by_plate
 from core.models import FuelFill, OdometerReading
+from core.sheet_reader import TANQUEOS_COLUMNS, WorkbookReader
 
 
+if TYPE_CHECKING:  # pandas/NumPy se importan dentro de la ingesta (arranque liviano)
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
+# Tamaño de lote para ``bulk_create``/``bulk_update``.
+BULK_BATCH_SIZE = 2000
+# Tanqueos por sentencia de inserción (7 parámetros por fila)
+FILL_BATCH_SIZE = 500
+
+
+def _frame_from_batches(batches) -> "pd.DataFrame":
+    """Concatena los lotes tipados del lector en un DataFrame compacto."""
+    import pandas as pd
+
+    columns = ["FECHA", "PLACA", "KILOMETRAJE", "GALONES", "OBSERVACIONES"]
+    frames = [pd.DataFrame.from_records(batch, columns=columns) for batch in batches]
+    if not frames:
+        return pd.DataFrame(
+            {
+                "FECHA": pd.Series(dtype="datetime64[ns]"),
+                "PLACA": pd.Series(dtype="object"),
+                "KILOMETRAJE": pd.Series(dtype="int64"),
+                "GALONES": pd.Series(dtype="float64"),
+                "OBSERVACIONES": pd.Series(dtype="object"),
+            }
+        )
+    df = pd.concat(frames, ignore_index=True)
+    df["FECHA"] = pd.to_datetime(df["FECHA"])
+    df["KILOMETRAJE"] = df["KILOMETRAJE"].astype("int64")
+    df["GALONES"] = pd.to_numeric(df["GALONES"], errors="coerce").fillna(0)
+    df["OBSERVACIONES"] = df["OBSERVACIONES"].fillna("")
+    return df
+
+
+def _to_utc(fechas: "pd.Series") -> "pd.Series":
+    """Interpreta fechas ingenuas en la zona horaria del proyecto y las pasa a UTC."""
+    if fechas.dt.tz is None:
+        fechas = fechas.dt.tz_localize(
+            timezone.get_default_timezone(),
+            ambiguous="NaT",
+            nonexistent="shift_forward",
+        )
+    return fechas.dt.tz_convert("UTC")
+
+
+def _to_datetimes(series: "pd.Series"):
+    """Convierte una serie con zona horaria en ``datetime`` de Python conscientes."""
+    import pandas as pd
+
+    return pd.DatetimeIndex(series).to_pydatetime()
+
+
+def _insert_fuel_fills(fuel_fills) -> int:
+    """Inserta tanqueos descartando los ya importados (clave natural).
+
+    Una sentencia ``INSERT ... ON CONFLICT DO NOTHING RETURNING id`` por lote
+    (PostgreSQL y SQLite >= 3.35, como ``fleet.odometer``): las filas
+    retornadas son exactamente las insertadas.
+
+    Returns:
+        int: Tanqueos nuevos.
+    """
+    opts = FuelFill._meta
+    columns = ["vehicle", "fill_date", "odometer_km", "gallons", "notes", "source_file", "imported_at"]
+    gallons = opts.get_field("gallons")
+    ops = connection.ops
+    now = ops.adapt_datetimefield_value(timezone.now())
+    row_sql = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    inserted = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(fuel_fills), FILL_BATCH_SIZE):
+            chunk = fuel_fills[start:start + FILL_BATCH_SIZE]
+            sql = (
+                f"INSERT INTO {ops.quote_name(opts.db_table)} "
+                f"({', '.join(ops.quote_name(opts.get_field(c).column) for c in columns)}) "
+                f"VALUES {', '.join([row_sql] * len(chunk))} "
+                f"ON CONFLICT DO NOTHING RETURNING {ops.quote_name(opts.pk.column)}"
+            )
+            params = [
+                p
+                for fill in chunk
+                for p in (
+                    fill.vehicle_id,
+                    ops.adapt_datetimefield_value(fill.fill_date),
+                    fill.odometer_km,
+                    ops.adapt_decimalfield_value(
+                        fill.gallons, gallons.max_digits, gallons.decimal_places
+                    ),
+                    fill.notes,
+                    fill.source_file,
+                    now,
+                )
+            ]
+            cursor.execute(sql, params)
+            inserted += len(cursor.fetchall())
+    return inserted
+
+
+@dataclass
+class FuelIngestResult:
+    """Resumen de una ingesta de tanqueos."""
+
+    rows_read: int = 0
+    processed: int = 0
+    new_readings: int = 0
+    anomalies: int = 0
+    anomaly_vehicle_ids: Set[int] = field(default_factory=set)
+    advanced_vehicle_ids: Set[int] = field(default_factory=set)
+    missing_plates: Set[str] = field(default_factory=set)
+
+    def summary(self) -> str:
+        return (
+            f"Registros leídos: {self.rows_read}. Registros procesados: {self.processed}. "
+            f"Nuevas lecturas válidas: {self.new_readings}. Anomalías encontradas: {self.anomalies}."
+        )
+
+
 def process_fuel_file(file_object, source_filename=''):
     """
-    Procesa un archivo de tanqueos (desde un objeto en memoria) y actualiza la BD.
+    Procesa un archivo de tanqueos (ruta o archivo binario) y actualiza la BD.
     Retorna un resumen del proceso.
     """
-    try:
-        df = pd.read_excel(file_object, sheet_name='TANQUEOS')
-    except Exception as e:
-        raise ValueError(f"No se pudo leer la hoja 'TANQUEOS' del archivo Excel: {e}")
-
-    df.columns = [str(col).strip().upper() for col in df.columns]
-    required_columns = ["FECHA", "PLACA", "KILOMETRAJE"]
-    if not all(col in df.columns for col in required_columns):
-        raise ValueError(
-            f"El archivo debe contener las columnas: {', '.join(required_columns)}"
+    with WorkbookReader(file_object) as reader:
+        result = ingest_fuel_rows(
+            reader.batches("TANQUEOS", TANQUEOS_COLUMNS), source_filename
         )
+    return result.summary()
 
-    df.dropna(subset=["PLACA", "KILOMETRAJE"], inplace=True)
-    df["FECHA"] = pd.to_datetime(df["FECHA"], errors="coerce")
-    df["KILOMETRAJE"] = pd.to_numeric(df["KILOMETRAJE"], errors="coerce")
-    df["PLACA"] = df["PLACA"].astype(str).str.upper().str.strip()
-    df.dropna(subset=["FECHA", "KILOMETRAJE"], inplace=True)
-    df = df.sort_values(by="FECHA")
 
-    processed_count = 0
-    new_readings = 0
-    anomalies_found = 0
+def ingest_fuel_rows(batches, source_filename='') -> FuelIngestResult:
+    """Ingiere lotes de filas TANQUEOS ya tipadas (ver ``core.sheet_reader``)."""
+    import numpy as np
+    import pandas as pd
 
-    plates = df["PLACA"].unique()
-    vehicles = Vehicle.objects.filter(plate__in=plates)
-    vehicle_map = {v.plate: v for v in vehicles}
-    missing = set(plates) - set(vehicle_map.keys())
-    if missing:
-        logger.warning("Vehículos no encontrados: %s", ", ".join(sorted(missing)))
+    df = _frame_from_batches(batches)
+    result = FuelIngestResult(rows_read=len(df))
 
-    fuel_fills = []
-    odometer_readings = []
-    vehicles_to_update = {}
+    df = df[df["KILOMETRAJE"] > 0].copy()
+    df["FECHA"] = _to_utc(df["FECHA"])
+    df.dropna(subset=["FECHA"], inplace=True)
 
-    with transaction.atomic():
-        for idx, row in df.iterrows():
-            placa = row["PLACA"]
-            kilometraje = int(row["KILOMETRAJE"])
-            if kilometraje <= 0:
-                continue
-
-            vehicle = vehicle_map.get(placa)
-            if not vehicle:
-                continue
-
-            try:
-                if kilometraje < vehicle.current_odometer_km:
-                    anomalies_found += 1
-                    OdometerReading.objects.get_or_create(
-                        vehicle=vehicle,
-                        reading_km=kilometraje,
-                        reading_date=row["FECHA"],
-                        defaults={
-                            "source": OdometerReading.Source.FUEL_FILL,
-                            "is_anomaly": True,
-                            "notes": (
-                                f"Lectura anómala. Anterior: {vehicle.current_odometer_km} km."
-                            ),
-                        },
-                    )
-                    continue
-
-                if not FuelFill.objects.filter(
-                    vehicle=vehicle,
-                    fill_date=row["FECHA"],
-                    odometer_km=kilometraje,
-                ).exists():
-                    fuel_fills.append(
-                        FuelFill(
-                            vehicle=vehicle,
-                            fill_date=row["FECHA"],
-                            odometer_km=kilometraje,
-                            gallons=row.get("GALONES", 0) or 0,
-                            notes=row.get("OBSERVACIONES", ""),
-                            source_file=source_filename,
-                        )
-                    )
-                    odometer_readings.append(
-                        OdometerReading(
-                            vehicle=vehicle,
-                            reading_km=kilometraje,
-                            reading_date=row["FECHA"],
-                            source=OdometerReading.Source.FUEL_FILL,
-                        )
-                    )
-                    vehicle.current_odometer_km = kilometraje
-                    vehicles_to_update[vehicle.id] = vehicle
-                    new_readings += 1
-
-                processed_count += 1
-
-            except Exception:
-                logger.exception("Error procesando fila %s", idx)
+    # 1) Resolver placas -> vehículos en una consulta
+    plates = df["PLACA"].unique().tolist()
+    vehicles = pd.DataFrame(
+        [
+            (vehicle_id, plate, seed_km, seed_at)
+            for plate, (vehicle_id, seed_km, seed_at) in vehicle_rows_by_plate(
+                plates, "current_odometer_km", "odometer_read_at"
+            ).items()
+        ],
+        columns=["vehicle_id", "PLACA", "seed_km", "seed_at"],
+    )
+    result.missing_plates = set(plates) - set(vehicles["PLACA"])
+    if result.missing_plates:
+        logger.warning(
+            "Vehículos no encontrados: %s", ", ".join(sorted(result.missing_plates))
+        )
 
+    df = df.merge(vehicles, on="PLACA", how="inner")
+    df["vehicle_id"] = df["vehicle_id"].astype("int64")
+    df["seed_km"] = df["seed_km"].fillna(0).astype("int64")
+    # El odómetro actual solo acota las filas posteriores a su lectura; si no
+    # tiene fecha acota todas
+    seed_at = pd.to_datetime(df["seed_at"], utc=True)
+    df.loc[seed_at.notna() & (df["FECHA"] <= seed_at), "seed_km"] = 0
+    df = df.sort_values(by=["FECHA"], kind="stable").reset_index(drop=True)
+
+    # 2) Anomalías: km por debajo del máximo acumulado previo del vehículo
+    grouped_km = df.groupby("vehicle_id", sort=False)["KILOMETRAJE"]
+    prev_max = grouped_km.cummax().groupby(df["vehicle_id"], sort=False).shift(1)
+    running_max = np.maximum(prev_max.fillna(-1).to_numpy(), df["seed_km"].to_numpy())
+    is_anomaly = df["KILOMETRAJE"].to_numpy() < running_max
+    df["running_max"] = running_max
+
+    valid = df[~is_anomaly]
+    anomalies = df[is_anomaly]
+    result.processed = len(valid)
+    result.anomalies = len(anomalies)
+    result.anomaly_vehicle_ids = set(anomalies["vehicle_id"].tolist())
+
+    fill_key = ["vehicle_id", "FECHA", "KILOMETRAJE"]
+    new_fills = valid.drop_duplicates(subset=fill_key)
+    new_anomalies = anomalies.drop_duplicates(subset=fill_key)
+
+    # 3) Escritura por lotes
+    fill_dates = _to_datetimes(new_fills["FECHA"])
+    fuel_fills = [
+        FuelFill(
+            vehicle_id=vehicle_id,
+            fill_date=fill_date,
+            odometer_km=km,
+            gallons=Decimal(str(round(gallons, 3))),
+            notes=notes[:255],
+            source_file=source_filename[:100],
+        )
+        for vehicle_id, fill_date, km, gallons, notes in zip(
+            new_fills["vehicle_id"].tolist(),
+            fill_dates,
+            new_fills["KILOMETRAJE"].tolist(),
+            new_fills["GALONES"].tolist(),
+            new_fills["OBSERVACIONES"].tolist(),
+        )
+    ]
+    odometer_readings = [
+        OdometerReading(
+            vehicle_id=vehicle_id,
+            reading_km=km,
+            reading_date=fill_date,
+            source=OdometerReading.Source.FUEL_FILL,
+        )
+        for vehicle_id, fill_date, km in zip(
+            new_fills["vehicle_id"].tolist(),
+            fill_dates,
+            new_fills["KILOMETRAJE"].tolist(),
+        )
+    ]
+    odometer_readings += [
+        OdometerReading(
+            vehicle_id=vehicle_id,
+            reading_km=km,
+            reading_date=reading_date,
+            source=OdometerReading.Source.FUEL_FILL,
+            is_anomaly=True,
+            notes=f"Lectura anómala. Anterior: {previous} km.",
+        )
+        for vehicle_id, reading_date, km, previous in zip(
+            new_anomalies["vehicle_id"].tolist(),
+            _to_datetimes(new_anomalies["FECHA"]),
+            new_anomalies["KILOMETRAJE"].tolist(),
+            new_anomalies["running_max"].astype("int64").tolist(),
+        )
+    ]
+
+    # Lectura mayor de cada vehículo (con su fecha) para avanzar el odómetro
+    latest = new_fills.loc[new_fills.groupby("vehicle_id")["KILOMETRAJE"].idxmax()]
+    odometer_advances = list(
+        zip(
+            latest["vehicle_id"].tolist(),
+            latest["KILOMETRAJE"].tolist(),
+            _to_datetimes(latest["FECHA"]),
+        )
+    )
+
+    # Las filas ya importadas chocan con las restricciones únicas y se
+    # descartan en la misma inserción (sin consultas previas por fila)
+    with transaction.atomic():
         if fuel_fills:
-            FuelFill.objects.bulk_create(fuel_fills)
+            result.new_readings = _insert_fuel_fills(fuel_fills)
         if odometer_readings:
-            OdometerReading.objects.bulk_create(odometer_readings)
-        if vehicles_to_update:
-            Vehicle.objects.bulk_update(
-                list(vehicles_to_update.values()), ["current_odometer_km"]
+            OdometerReading.objects.bulk_create(
+                odometer_readings, batch_size=BULK_BATCH_SIZE, ignore_conflicts=True
             )
+        result.advanced_vehicle_ids = advance_odometers(odometer_advances)
 
     logger.info(
         "Archivo procesado: %s registros, %s procesados, %s nuevas lecturas, %s anomalías",
-        len(df),
-        processed_count,
-        new_readings,
-        anomalies_found,
-    )
-
-    return (
-        f"Registros leídos: {len(df)}. Registros procesados: {processed_count}. "
-        f"Nuevas lecturas válidas: {new_readings}. Anomalías encontradas: {anomalies_found}."
+        result.rows_read,
+        result.processed,
+        result.new_readings,
+        result.anomalies,
     )
+    return result
@@ -0,0 +1,231 @@
+"""Lector en streaming de las hojas del archivo GESTION DE COMBUSTIBLE.
+
+Todas las importaciones (TANQUEOS / NOVEDADES) leen el libro con este módulo:
+se abre una sola vez con ``openpyxl`` en modo ``read_only`` y cada hoja se
+recorre una vez, entregando lotes de filas ya tipadas (placa normalizada como
+en ``Vehicle.save``, kilometraje entero, fechas parseadas). La memoria queda
+acotada por el tamaño del lote y no por el número de filas del archivo.
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from fleet.plates import normalize_plate
+
+
+BATCH_SIZE = 5000
+HEADER_SCAN_ROWS = 10
+
+DATE_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y",
+)
+
+
+class SheetError(ValueError):
+    """La hoja no existe o no tiene las columnas requeridas."""
+
+
+# -----------------------------
+# Conversores de celdas
+# -----------------------------
+def parse_plate(value: Any) -> Optional[str]:
+    """Placa normalizada o ``None`` si la celda está vacía."""
+    plate = normalize_plate(value)
+    return plate or None
+
+
+def parse_km(value: Any) -> Optional[int]:
+    """Kilometraje entero no negativo."""
+    if isinstance(value, str):
+        value = value.strip()
+    km = int(float(value))
+    return km if km >= 0 else None
+
+
+def parse_datetime(value: Any) -> Optional[datetime]:
+    """Fecha/hora desde celdas de fecha, números seriales de Excel o texto."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, (int, float)):
+        from openpyxl.utils.datetime import from_excel
+
+        return from_excel(value)
+    text = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Fecha no reconocida: {value!r}")
+
+
+def parse_decimal(value: Any) -> Optional[Decimal]:
+    """Número decimal (p. ej. galones)."""
+    try:
+        return Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError(f"Número no reconocido: {value!r}")
+
+
+def parse_text(value: Any) -> Optional[str]:
+    """Texto sin espacios en los extremos."""
+    text = str(value).strip()
+    return text or None
+
+
+@dataclass(frozen=True)
+class Column:
+    """Columna esperada en una hoja y su conversor."""
+
+    name: str
+    parse: Callable[[Any], Any]
+    required: bool = True
+
+
+FECHA = Column("FECHA", parse_datetime)
+PLACA = Column("PLACA", parse_plate)
+KILOMETRAJE = Column("KILOMETRAJE", parse_km)
+GALONES = Column("GALONES", parse_decimal, required=False)
+OBSERVACIONES = Column("OBSERVACIONES", parse_text, required=False)
+VEHICULO = Column("VEHICULO", parse_plate)
+
+TANQUEOS_COLUMNS = (FECHA, PLACA, KILOMETRAJE, GALONES, OBSERVACIONES)
+NOVEDADES_COLUMNS = (VEHICULO, Column("OBSERVACIONES", parse_text))
+
+
+@dataclass
+class SheetStats:
+    """Contadores de lectura de una hoja."""
+
+    rows_read: int = 0
+    rows_skipped: int = 0
+
+
+class WorkbookReader:
+    """Abre un libro ``.xlsx`` una vez y entrega lotes tipados por hoja.
+
+    Uso::
+
+        with WorkbookReader(path) as reader:
+            for batch in reader.batches("TANQUEOS", TANQUEOS_COLUMNS):
+                ...
+    """
+
+    def __init__(self, source):
+        """Abre el libro en modo streaming.
+
+        Args:
+            source: Ruta o archivo binario del ``.xlsx``.
+
+        Raises:
+            SheetError: Si el archivo no puede abrirse como Excel.
+        """
+        # openpyxl (y NumPy, que importa) solo se carga al leer un libro
+        from openpyxl import load_workbook
+
+        try:
+            self._wb = load_workbook(source, read_only=True, data_only=True)
+        except Exception as e:
+            raise SheetError(f"No se pudo abrir el Excel: {e}")
+        self.stats: Dict[str, SheetStats] = {}
+
+    @property
+    def sheetnames(self) -> List[str]:
+        return self._wb.sheetnames
+
+    def close(self) -> None:
+        self._wb.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def batches(
+        self,
+        sheet_name: str,
+        columns: Sequence[Column],
+        batch_size: int = BATCH_SIZE,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Recorre la hoja una vez y entrega lotes de filas tipadas.
+
+        Los encabezados se buscan en la primera fila no vacía (entre las
+        primeras ``HEADER_SCAN_ROWS``) y se comparan sin distinguir
+        mayúsculas. Las filas con un valor requerido vacío o inválido se
+        omiten y se cuentan en ``stats[sheet_name].rows_skipped``.
+
+        Raises:
+            SheetError: Si falta la hoja o alguna columna requerida. Se lanza
+                al llamar el método, antes de leer las filas.
+        """
+        if sheet_name not in self._wb.sheetnames:
+            raise SheetError(f"No existe la hoja '{sheet_name}' en el archivo.")
+        ws = self._wb[sheet_name]
+
+        header_idx = None
+        header = None
+        for idx, row in enumerate(
+            ws.iter_rows(min_row=1, max_row=HEADER_SCAN_ROWS, values_only=True), start=1
+        ):
+            if row and any(cell is not None for cell in row):
+                header = [str(c).strip().upper() if c is not None else "" for c in row]
+                header_idx = idx
+                break
+        if header is None:
+            raise SheetError(f"No se encontraron encabezados en la hoja '{sheet_name}'.")
+
+        positions = {}
+        for column in columns:
+            if column.name in header:
+                positions[column.name] = header.index(column.name)
+        missing = [c.name for c in columns if c.required and c.name not in positions]
+        if missing:
+            raise SheetError(
+                f"La hoja '{sheet_name}' debe contener las columnas: {', '.join(missing)}"
+            )
+
+        stats = self.stats.setdefault(sheet_name, SheetStats())
+        return self._iter_batches(ws, header_idx + 1, columns, positions, batch_size, stats)
+
+    def _iter_batches(self, ws, first_row, columns, positions, batch_size, stats):
+        batch: List[Dict[str, Any]] = []
+        for row in ws.iter_rows(min_row=first_row, values_only=True):
+            if not row or all(cell is None for cell in row):
+                continue
+            stats.rows_read += 1
+
+            record = {}
+            for column in columns:
+                pos = positions.get(column.name)
+                raw = row[pos] if pos is not None and pos < len(row) else None
+                value = None
+                if raw is not None:
+                    try:
+                        value = column.parse(raw)
+                    except (TypeError, ValueError, OverflowError):
+                        value = None
+                if value is None and column.required:
+                    record = None
+                    break
+                record[column.name] = value
+
+            if record is None:
+                stats.rows_skipped += 1
+                continue
+
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
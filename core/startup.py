@@ -0,0 +1,88 @@
+"""Costo de importación al arrancar un worker web.
+
+:func:`profile_imports` carga la aplicación WSGI (y el URLconf, como en la
+primera petición) en un intérprete nuevo con ``python -X importtime`` y
+agrupa el tiempo por paquete de primer nivel. ``HEAVY_MODULES`` lista las
+dependencias que solo deben cargarse en las rutas de ingesta/reportes.
+"""
+
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+
+HEAVY_MODULES = ("pandas", "numpy", "openpyxl")
+
+# ``__import__`` (no ``importlib.import_module``): -X importtime solo registra
+# las importaciones que pasan por la maquinaria en C
+STARTUP_SCRIPT = (
+    "import sys\n"
+    "__import__({module!r})\n"
+    "module = sys.modules[{module!r}]\n"
+    "getattr(module, 'application')\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+)
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)\s*$")
+
+
+@dataclass
+class ImportProfile:
+    """Resultado de :func:`profile_imports` (tiempos en microsegundos)."""
+
+    total_us: int = 0
+    by_package: Dict[str, int] = field(default_factory=dict)  # tiempo propio acumulado
+    modules: List[Tuple[str, int, int]] = field(default_factory=list)  # (módulo, propio, acumulado)
+
+    @property
+    def loaded(self) -> Set[str]:
+        return {name for name, _, _ in self.modules}
+
+    def heavy_loaded(self) -> List[str]:
+        return [m for m in HEAVY_MODULES if m in self.loaded]
+
+
+def parse_importtime(stderr: str) -> ImportProfile:
+    """Interpreta la salida de ``-X importtime``."""
+    profile = ImportProfile()
+    by_package = defaultdict(int)
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        self_us, cumulative_us = int(self_us), int(cumulative_us)
+        profile.modules.append((name, self_us, cumulative_us))
+        by_package[name.split(".")[0]] += self_us
+        if len(indent) <= 1:  # módulo de primer nivel: su acumulado ya incluye a los hijos
+            profile.total_us += cumulative_us
+    profile.by_package = dict(sorted(by_package.items(), key=lambda kv: -kv[1]))
+    return profile
+
+
+def profile_imports(module: str = "project.wsgi", env=None) -> ImportProfile:
+    """Importa ``module`` en un subproceso con ``-X importtime``.
+
+    Raises:
+        RuntimeError: Si el subproceso falla.
+    """
+    env = dict(os.environ if env is None else env)
+    if "DJANGO_SETTINGS_MODULE" not in env:
+        from django.conf import settings
+
+        env["DJANGO_SETTINGS_MODULE"] = settings.SETTINGS_MODULE
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STARTUP_SCRIPT.format(module=module)],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    if completed.returncode != 0:
+        errors = [l for l in completed.stderr.splitlines() if not l.startswith("import time:")]
+        raise RuntimeError("\n".join(errors[-20:]))
+    return parse_importtime(completed.stderr)
@@ -0,0 +1,394 @@
+"""Flota sintética para pruebas de carga y benchmarks.
+
+:func:`generate_fleet` crea, por lotes de ``CHUNK_SIZE`` vehículos:
+
+- Zonas, manuales (con sus tareas) y la taxonomía mínima de mantenimiento
+  (se reutilizan si ya existen).
+- Vehículos con placas ``<prefijo>NNNNNN``, su plan de mantenimiento activo
+  y vencimientos de SOAT/RTM alrededor de hoy.
+- ``FuelFill``/``OdometerReading`` de los últimos ``months`` meses con
+  kilometraje creciente.
+- OTs completadas, en taller y programadas, con trabajos y repuestos (salvo
+  con ``with_parts=False``, que queda marcado en ``without_parts``); los
+  costos y el libro de costos quedan consistentes (``workorders.costs``/
+  ``workorders.ledger``), igual que ``Vehicle.in_workshop_since``
+  (``workorders.workshop``).
+- Opcionalmente, un libro con las hojas TANQUEOS (tanqueos posteriores al
+  histórico) y NOVEDADES para las importaciones.
+
+Los datos se generan con una semilla fija: misma semilla, mismos datos.
+"""
+
+import random
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+from typing import List, Optional
+
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+CHUNK_SIZE = 1000
+BATCH_SIZE = 2000
+
+BRANDS = (
+    ("Chevrolet", "NHR"),
+    ("Toyota", "Hilux"),
+    ("Renault", "Duster"),
+    ("Nissan", "Frontier"),
+    ("Mercedes-Benz", "Sprinter"),
+)
+MANUAL_TASKS = (
+    (5000, "Cambio de aceite y filtro"),
+    (10000, "Revisión de frenos"),
+    (20000, "Cambio de filtros de aire y combustible"),
+    (40000, "Cambio de correa de distribución"),
+)
+TAXONOMY = {
+    "Motor": ("Aceite", "Filtros", "Correas"),
+    "Frenos": ("Pastillas", "Discos"),
+    "Suspensión": ("Amortiguadores",),
+}
+NOVEDAD_ODOMETRO = "Kilometraje no le sirve/detenido"
+
+
+@dataclass
+class SyntheticFleet:
+    """Resumen de lo generado."""
+
+    vehicles: int = 0
+    fuel_fills: int = 0
+    odometer_readings: int = 0
+    work_orders: int = 0
+    tasks: int = 0
+    parts: int = 0
+    workbook_rows: int = 0
+    plates: List[str] = field(default_factory=list)
+    workbook_path: Optional[str] = None
+    # OTs generadas sin repuestos (``with_parts=False``): no comparable con una flota completa
+    without_parts: bool = False
+    notes: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (
+            f"vehiculos={self.vehicles} | tanqueos={self.fuel_fills} | "
+            f"lecturas={self.odometer_readings} | ots={self.work_orders} | "
+            f"trabajos={self.tasks} | repuestos={self.parts} | filas_libro={self.workbook_rows}"
+        )
+
+
+def synthetic_plates(count, prefix="SYN"):
+    """Placas sintéticas ``<prefijo>NNNNNN`` (máximo 10 caracteres)."""
+    width = max(6, len(str(count)))
+    return [f"{prefix}{i:0{width}d}" for i in range(count)]
+
+
+def _catalogs():
+    """Zonas, manuales y subcategorías (se crean solo si faltan)."""
+    from core.models import Zone
+    from fleet.models import Vehicle
+    from workorders.models import (
+        MaintenanceCategory,
+        MaintenanceManual,
+        MaintenanceSubcategory,
+        ManualTask,
+    )
+    from workorders.scheduling import invalidate
+
+    zones = [Zone.objects.get_or_create(name=f"Zona sintética {i + 1}")[0].pk for i in range(10)]
+    manuals = {}
+    for fuel_type, label in Vehicle.FuelType.choices:
+        manual, created = MaintenanceManual.objects.get_or_create(
+            name=f"Manual sintético {label}", defaults={"fuel_type": fuel_type}
+        )
+        if created:
+            ManualTask.objects.bulk_create(
+                ManualTask(manual=manual, km_interval=km, description=desc)
+                for km, desc in MANUAL_TASKS
+            )
+            # bulk_create no emite post_save: se descarta el cronograma en caché
+            invalidate(manual.pk)
+        manuals[fuel_type] = manual.pk
+    subcategories = []
+    for category_name, names in TAXONOMY.items():
+        category = MaintenanceCategory.objects.get_or_create(name=category_name)[0]
+        for name in names:
+            sub = MaintenanceSubcategory.objects.get_or_create(category=category, name=name)[0]
+            subcategories.append((category.pk, sub.pk, f"{category_name} - {name}"))
+    return zones, manuals, subcategories
+
+
+def _parts_catalog(rng):
+    """Repuestos para las OTs.
+
+    Raises:
+        ValueError: Si la tabla de repuestos no está al día con el modelo.
+    """
+    from inventory.models import Part
+
+    try:
+        with transaction.atomic():
+            parts = [
+                Part.objects.get_or_create(
+                    sku=f"SYN-{i:03d}",
+                    defaults={"name": f"Repuesto sintético {i}", "unit": "und"},
+                )[0]
+                for i in range(20)
+            ]
+    except DatabaseError as e:
+        raise ValueError(
+            f"No se pudieron crear repuestos ({e}); aplique las migraciones de "
+            f"inventory o genere la flota sin repuestos (--without-parts)."
+        ) from e
+    return [(part.pk, Decimal(rng.randint(20, 900) * 1000)) for part in parts]
+
+
+def generate_fleet(
+    vehicles=1000,
+    months=3,
+    fills_per_month=8,
+    orders_per_vehicle=2,
+    seed=42,
+    prefix="SYN",
+    workbook_path=None,
+    workbook_fills=2,
+    with_parts=True,
+    progress=None,
+) -> SyntheticFleet:
+    """Genera una flota sintética completa (ver el docstring del módulo).
+
+    Args:
+        vehicles: Número de vehículos.
+        months: Meses de histórico de tanqueos.
+        fills_per_month: Tanqueos por vehículo y mes.
+        orders_per_vehicle: OTs por vehículo.
+        seed: Semilla aleatoria.
+        prefix: Prefijo de las placas.
+        workbook_path: Si se indica, escribe ahí el libro TANQUEOS/NOVEDADES.
+        workbook_fills: Tanqueos nuevos por vehículo en el libro.
+        with_parts: ``False`` genera las OTs sin repuestos (la flota queda
+            marcada con ``without_parts``).
+        progress: Callable opcional ``(mensaje)`` para reportar avance.
+
+    Returns:
+        SyntheticFleet: Conteos de lo generado.
+
+    Raises:
+        ValueError: Si ya existen vehículos con ese prefijo de placa o no se
+            pueden crear los repuestos.
+    """
+    from core.models import FuelFill, OdometerReading
+    from fleet.models import Vehicle
+    from workorders.costs import recalculate_costs_bulk, suspend_cost_recalculation
+    from workorders.ledger import apply_changes, contribution
+    from workorders.models import MaintenancePlan, WorkOrder, WorkOrderPart, WorkOrderTask
+    from workorders.workshop import refresh_in_workshop
+
+    rng = random.Random(seed)
+    plates = synthetic_plates(vehicles, prefix)
+    if Vehicle.objects.filter(plate__startswith=prefix).exists():
+        raise ValueError(f"Ya existen vehículos con placas {prefix}…; use otro prefijo.")
+
+    result = SyntheticFleet(plates=plates, workbook_path=workbook_path)
+    zones, manuals, subcategories = _catalogs()
+    parts_catalog = _parts_catalog(rng) if with_parts else []
+    if not with_parts:
+        result.without_parts = True
+        result.notes.append("Flota generada SIN repuestos (--without-parts).")
+
+    now = timezone.now()
+    history_end = now - timedelta(days=2)
+    history_start = history_end - timedelta(days=30 * months)
+    fills_per_vehicle = months * fills_per_month
+    today = timezone.localdate()
+
+    workbook = tanqueos = None
+    novedades = []
+    if workbook_path:
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        tanqueos = workbook.create_sheet("TANQUEOS")
+        tanqueos.append(["FECHA", "PLACA", "KILOMETRAJE", "GALONES", "OBSERVACIONES"])
+
+    for offset in range(0, vehicles, CHUNK_SIZE):
+        chunk = plates[offset:offset + CHUNK_SIZE]
+        with transaction.atomic(), suspend_cost_recalculation():
+            # Kilometrajes del histórico de cada vehículo
+            histories = []
+            for _ in chunk:
+                km = rng.randint(1_000, 150_000)
+                readings = []
+                for i in range(fills_per_vehicle):
+                    km += rng.randint(80, 600)
+                    share = (i + rng.random()) / max(fills_per_vehicle, 1)
+                    when = history_start + (history_end - history_start) * share
+                    readings.append((when, km, Decimal(str(round(rng.uniform(5, 40), 3)))))
+                histories.append((km, readings))
+
+            fleet = []
+            for plate, (km, readings) in zip(chunk, histories):
+                brand, linea = rng.choice(BRANDS)
+                fleet.append(
+                    Vehicle(
+                        plate=plate,
+                        brand=brand,
+                        linea=linea,
+                        modelo=rng.randint(2012, 2025),
+                        vehicle_type=rng.choice(Vehicle.VehicleType.values),
+                        fuel_type=rng.choice(Vehicle.FuelType.values),
+                        current_zone_id=rng.choice(zones),
+                        current_odometer_km=km,
+                        odometer_read_at=readings[-1][0] if readings else None,
+                        soat_due_date=today + timedelta(days=rng.randint(-30, 365)),
+                        rtm_due_date=today + timedelta(days=rng.randint(-30, 365)),
+                    )
+                )
+            Vehicle.objects.bulk_create(fleet, batch_size=BATCH_SIZE)
+
+            MaintenancePlan.objects.bulk_create(
+                [
+                    MaintenancePlan(
+                        vehicle=vehicle,
+                        manual_id=manuals[vehicle.fuel_type],
+                        last_service_km=max(0, vehicle.current_odometer_km - rng.randint(0, 12_000)),
+                        last_service_date=today - timedelta(days=rng.randint(10, 200)),
+                        is_active=True,
+                    )
+                    for vehicle in fleet
+                ],
+                batch_size=BATCH_SIZE,
+            )
+
+            fills, odometers = [], []
+            for vehicle, (_, readings) in zip(fleet, histories):
+                for when, km, gallons in readings:
+                    fills.append(
+                        FuelFill(
+                            vehicle=vehicle,
+                            fill_date=when,
+                            odometer_km=km,
+                            gallons=gallons,
+                            source_file="sintetico.xlsx",
+                        )
+                    )
+                    odometers.append(
+                        OdometerReading(
+                            vehicle=vehicle,
+                            reading_km=km,
+                            reading_date=when,
+                            source=OdometerReading.Source.FUEL_FILL,
+                        )
+                    )
+            FuelFill.objects.bulk_create(fills, batch_size=BATCH_SIZE)
+            OdometerReading.objects.bulk_create(odometers, batch_size=BATCH_SIZE)
+            result.fuel_fills += len(fills)
+            result.odometer_readings += len(odometers)
+
+            orders = []
+            for vehicle in fleet:
+                for _ in range(orders_per_vehicle):
+                    orders.append(_work_order(rng, vehicle, now))
+            WorkOrder.objects.bulk_create(orders, batch_size=BATCH_SIZE)
+            # bulk_create no emite señales: las OTs completadas se registran
+            # en el libro (aún sin costos) y los costos se recalculan abajo
+            apply_changes((None, contribution(order)) for order in orders)
+
+            tasks, parts = [], []
+            for order in orders:
+                for _ in range(rng.randint(1, 3)):
+                    category_id, subcategory_id, label = rng.choice(subcategories)
+                    external = rng.random() < 0.2
+                    tasks.append(
+                        WorkOrderTask(
+                            work_order=order,
+                            category_id=category_id,
+                            subcategory_id=subcategory_id,
+                            description=label,
+                            hours_spent=Decimal(rng.randint(1, 16)) / 2,
+                            is_external=external,
+                            labor_rate=Decimal(rng.randint(50, 600) * 1000) if external else None,
+                        )
+                    )
+                if parts_catalog and rng.random() < 0.6:
+                    part_id, cost = rng.choice(parts_catalog)
+                    parts.append(
+                        WorkOrderPart(
+                            work_order=order,
+                            part_id=part_id,
+                            quantity=Decimal(rng.randint(1, 4)),
+                            cost_at_moment=cost,
+                        )
+                    )
+            WorkOrderTask.objects.bulk_create(tasks, batch_size=BATCH_SIZE)
+            WorkOrderPart.objects.bulk_create(parts, batch_size=BATCH_SIZE)
+            recalculate_costs_bulk(order.pk for order in orders)
+            refresh_in_workshop(vehicle.pk for vehicle in fleet)
+
+        result.vehicles += len(fleet)
+        result.work_orders += len(orders)
+        result.tasks += len(tasks)
+        result.parts += len(parts)
+
+        if tanqueos is not None:
+            for vehicle in fleet:
+                km = vehicle.current_odometer_km
+                shares = sorted(rng.random() for _ in range(workbook_fills))
+                for share in shares:
+                    km += rng.randint(80, 600)
+                    when = timezone.localtime(history_end + (now - history_end) * share)
+                    tanqueos.append(
+                        [when.replace(tzinfo=None), vehicle.plate, km, round(rng.uniform(5, 40), 3), ""]
+                    )
+                    result.workbook_rows += 1
+                if rng.random() < 0.01:
+                    novedades.append(vehicle.plate)
+
+        if progress:
+            progress(f"{result.vehicles}/{vehicles} vehículos")
+
+    if workbook is not None:
+        sheet = workbook.create_sheet("NOVEDADES")
+        sheet.append(["VEHICULO", "OBSERVACIONES"])
+        for plate in novedades:
+            sheet.append([plate, NOVEDAD_ODOMETRO])
+        workbook.save(workbook_path)
+    return result
+
+
+def _work_order(rng, vehicle, now):
+    """OT completada (70 %), en taller (15 %) o programada (15 %)."""
+    from workorders.models import WorkOrder
+
+    order = WorkOrder(
+        vehicle=vehicle,
+        order_type=rng.choice(WorkOrder.OrderType.values),
+        priority=rng.choice(WorkOrder.Priority.values),
+        description="OT sintética",
+    )
+    roll = rng.random()
+    if roll < 0.7:
+        check_in = now - timedelta(days=rng.randint(3, 180), hours=rng.randint(0, 23))
+        order.status = WorkOrder.OrderStatus.COMPLETED
+        order.scheduled_start = check_in
+        order.check_in_at = check_in
+        order.check_out_at = check_in + timedelta(hours=rng.randint(4, 72))
+        order.odometer_at_service = max(0, vehicle.current_odometer_km - rng.randint(500, 20_000))
+    elif roll < 0.85:
+        check_in = now - timedelta(hours=rng.randint(1, 96))
+        order.status = rng.choice(
+            [
+                WorkOrder.OrderStatus.IN_PROGRESS,
+                WorkOrder.OrderStatus.WAITING_PART,
+                WorkOrder.OrderStatus.IN_ROAD_TEST,
+            ]
+        )
+        order.scheduled_start = check_in
+        order.check_in_at = check_in
+        order.odometer_at_service = vehicle.current_odometer_km
+    else:
+        start = now + timedelta(days=rng.randint(1, 30), hours=rng.randint(6, 16))
+        order.status = WorkOrder.OrderStatus.SCHEDULED
+        order.scheduled_start = start
+        order.scheduled_end = start + timedelta(hours=rng.randint(2, 24))
+    return order
@@ -1,5 +1,1166 @@
 """Tests for the core application."""
 
-from django.test import TestCase
+import os
+import tempfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import Workbook
+
+from core.jobs import claim_next, run_job
+from core.models import Alert, BackgroundJob, FuelFill, OdometerReading
+from core.pagination import KeysetPagination
+from core.services import process_fuel_file
+from core.sheet_reader import TANQUEOS_COLUMNS, Column, SheetError, WorkbookReader
+from fleet.models import Vehicle
+
+
+def build_tanqueos_workbook(rows):
+    """Return an in-memory workbook with a TANQUEOS sheet built from ``rows``."""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "TANQUEOS"
+    ws.append(["FECHA", "PLACA", "KILOMETRAJE", "GALONES", "OBSERVACIONES"])
+    for row in rows:
+        ws.append(list(row))
+    buffer = BytesIO()
+    wb.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+class ProcessFuelFileTests(TestCase):
+    def setUp(self):
+        self.vehicle = Vehicle.objects.create(
+            plate="ABC123",
+            brand="Brand",
+            linea="Line",
+            modelo=2020,
+            vehicle_type=Vehicle.VehicleType.AUTOMOVIL,
+            current_odometer_km=1000,
+        )
+
+    def test_imports_fills_flags_anomalies_and_advances_odometer(self):
+        workbook = build_tanqueos_workbook([
+            (datetime(2025, 1, 1, 8), "abc123", 1500, 10, "ok"),
+            (datetime(2025, 1, 2, 8), "ABC123", 1200, 8, ""),
+            (datetime(2025, 1, 3, 8), "ABC123", 1800, 12, ""),
+            (datetime(2025, 1, 3, 9), "ZZZ999", 500, 5, ""),
+        ])
+
+        summary = process_fuel_file(workbook, source_filename="t.xlsx")
+
+        self.assertIn("Nuevas lecturas válidas: 2", summary)
+        self.assertIn("Anomalías encontradas: 1", summary)
+        self.assertEqual(FuelFill.objects.count(), 2)
+        anomaly = OdometerReading.objects.get(is_anomaly=True)
+        self.assertEqual(anomaly.reading_km, 1200)
+        self.vehicle.refresh_from_db()
+        self.assertEqual(self.vehicle.current_odometer_km, 1800)
+
+    def test_reimport_does_not_duplicate(self):
+        rows = [
+            (datetime(2025, 1, 1, 8), "ABC123", 1500, 10, ""),
+            (datetime(2025, 1, 2, 8), "ABC123", 900, 10, ""),
+        ]
+        process_fuel_file(build_tanqueos_workbook(rows))
+        process_fuel_file(build_tanqueos_workbook(rows))
+
+        self.assertEqual(FuelFill.objects.count(), 1)
+        self.assertEqual(OdometerReading.objects.filter(is_anomaly=False).count(), 1)
+        self.assertEqual(OdometerReading.objects.filter(is_anomaly=True).count(), 1)
+
+    def test_overlapping_import_counts_only_new_fills(self):
+        first = [(datetime(2025, 3, 1, 8), "ABC123", 1500, 10, "")]
+        process_fuel_file(build_tanqueos_workbook(first))
+        summary = process_fuel_file(
+            build_tanqueos_workbook(first + [(datetime(2025, 3, 2, 8), "ABC123", 1700, 9, "")])
+        )
+
+        self.assertIn("Nuevas lecturas válidas: 1", summary)
+        self.assertEqual(FuelFill.objects.count(), 2)
+
+    def test_new_fills_are_counted_by_the_insert(self):
+        first = [(datetime(2025, 3, 1, 8), "ABC123", 1500, 10, "")]
+        process_fuel_file(build_tanqueos_workbook(first))
+        workbook = build_tanqueos_workbook(first + [(datetime(2025, 3, 2, 8), "ABC123", 1700, 9, "")])
+        with CaptureQueriesContext(connection) as ctx:
+            summary = process_fuel_file(workbook)
+        self.assertIn("Nuevas lecturas válidas: 1.", summary)
+        self.assertFalse([q for q in ctx.captured_queries if "COUNT(" in q["sql"]])
+        fill = FuelFill.objects.get(fill_date__day=2)
+        self.assertEqual((fill.odometer_km, fill.gallons), (1700, Decimal("9.000")))
+        self.assertIsNotNone(fill.imported_at)
+
+    def test_natural_key_is_enforced_by_the_database(self):
+        fill = dict(
+            vehicle=self.vehicle,
+            fill_date=timezone.now(),
+            odometer_km=1500,
+            gallons=10,
+        )
+        FuelFill.objects.create(**fill)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            FuelFill.objects.create(**fill)
+
+    def test_query_count_does_not_depend_on_row_count(self):
+        def run(n_rows, day, base_km):
+            rows = [
+                (datetime(2025, 2, day, 0, i // 60, i % 60), "ABC123", base_km + i, 1, "")
+                for i in range(n_rows)
+            ]
+            workbook = build_tanqueos_workbook(rows)
+            with CaptureQueriesContext(connection) as ctx:
+                process_fuel_file(workbook)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(run(5, 1, 2000), run(120, 2, 10000))
+
+
+class WorkbookReaderTests(TestCase):
+    def test_batches_are_typed_and_normalized(self):
+        workbook = build_tanqueos_workbook([
+            (datetime(2025, 1, 1, 8), " abc-123 ", "1500.0", 10, None),
+            ("02/01/2025", "DEF456", 1600, None, "obs"),
+            (datetime(2025, 1, 3, 8), "GHI789", "n/a", 5, ""),
+        ])
+        with WorkbookReader(workbook) as reader:
+            batches = list(reader.batches("TANQUEOS", TANQUEOS_COLUMNS, batch_size=1))
+            stats = reader.stats["TANQUEOS"]
+
+        rows = [row for batch in batches for row in batch]
+        self.assertEqual(len(batches), 2)
+        self.assertEqual(rows[0]["PLACA"], "ABC123")
+        self.assertEqual(rows[0]["KILOMETRAJE"], 1500)
+        self.assertEqual(rows[1]["FECHA"], datetime(2025, 1, 2))
+        self.assertIsNone(rows[1]["GALONES"])
+        self.assertEqual((stats.rows_read, stats.rows_skipped), (3, 1))
+
+    def test_missing_required_column_raises(self):
+        with WorkbookReader(build_tanqueos_workbook([])) as reader:
+            with self.assertRaises(SheetError):
+                reader.batches("TANQUEOS", (Column("NO_EXISTE", str),))
+            with self.assertRaises(SheetError):
+                reader.batches("NOVEDADES", TANQUEOS_COLUMNS)
+
+
+@override_settings(JOB_UPLOAD_DIR=tempfile.mkdtemp())
+class BackgroundJobTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_superuser(username="admin", password="pass")
+        self.client.force_login(self.user)
+        Vehicle.objects.create(
+            plate="ABC123",
+            brand="Brand",
+            linea="Line",
+            modelo=2020,
+            vehicle_type=Vehicle.VehicleType.AUTOMOVIL,
+        )
+
+    def test_upload_enqueues_job_and_worker_runs_it(self):
+        workbook = build_tanqueos_workbook([(datetime(2025, 1, 1), "ABC123", 1500, 10, "")])
+        upload = SimpleUploadedFile("tanqueos.xlsx", workbook.getvalue())
+
+        response = self.client.post(reverse("upload_fuel_file"), {"file": upload})
+
+        job = BackgroundJob.objects.get()
+        self.assertRedirects(response, reverse("job_detail", args=[job.pk]))
+        self.assertEqual(job.status, BackgroundJob.Status.PENDING)
+        # El contenido viaja en el trabajo; no queda copia en el disco del servicio web
+        self.assertEqual(bytes(job.file_content), workbook.getvalue())
+        self.assertFalse(os.path.exists(job.file_path))
+        self.assertEqual(Vehicle.objects.get().current_odometer_km, 0)
+
+        claimed = claim_next("test-worker")
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertIsNone(claim_next("other-worker"))
+        run_job(claimed)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.Status.SUCCEEDED)
+        self.assertIn("tanqueos.xlsx", job.output)
+        self.assertEqual(bytes(job.file_content), b"")
+        self.assertEqual(os.listdir(os.path.dirname(job.file_path)), [])
+        self.assertEqual(Vehicle.objects.get().current_odometer_km, 1500)
+
+        status = self.client.get(reverse("job_status", args=[job.pk])).json()
+        self.assertTrue(status["finished"])
+        self.assertEqual(status["progress"], 100)
+
+    def test_upload_is_hashed_on_receipt_and_duplicates_are_rejected(self):
+        import hashlib
+
+        content = build_tanqueos_workbook([(datetime(2025, 1, 1), "ABC123", 1500, 10, "")]).getvalue()
+        digest = hashlib.sha256(content).hexdigest()
+        self.client.post(
+            reverse("upload_fuel_file"), {"file": SimpleUploadedFile("t.xlsx", content)}
+        )
+        job = BackgroundJob.objects.get()
+        self.assertEqual(job.payload["sha256"], digest)
+        self.assertEqual(job.payload["size_bytes"], len(content))
+
+        # Mientras el primero sigue en cola, el mismo archivo no se guarda
+        before = set(os.listdir(os.path.dirname(job.file_path)))
+        response = self.client.post(
+            reverse("upload_fuel_file"), {"file": SimpleUploadedFile("copia.xlsx", content)}
+        )
+        self.assertRedirects(response, reverse("admin:index"), fetch_redirect_response=False)
+        self.assertEqual(BackgroundJob.objects.count(), 1)
+        self.assertEqual(set(os.listdir(os.path.dirname(job.file_path))), before)
+
+        run_job(claim_next("test-worker"))
+        with mock.patch("core.fuel_import.WorkbookReader") as reader:
+            response = self.client.post(
+                reverse("upload_fuel_file"), {"file": SimpleUploadedFile("t.xlsx", content)}
+            )
+        self.assertEqual(BackgroundJob.objects.count(), 1)
+        reader.assert_not_called()
+
+    def test_rejected_uploads_leave_no_files_or_descriptors(self):
+        from core.uploads import HashingFileUploadHandler
+
+        handler = HashingFileUploadHandler()
+        handler.new_file("file", "t.xlsx", "application/octet-stream", 3)
+        handler.receive_data_chunk(b"abc", 0)
+        upload = handler.file_complete(3)
+        self.assertIsNone(upload.file)
+        with upload.open() as fh:
+            self.assertEqual(fh.read(), b"abc")
+        upload.discard()
+        self.assertFalse(os.path.exists(handler._path))
+
+        before = set(os.listdir(settings.JOB_UPLOAD_DIR))
+        response = self.client.post(
+            reverse("upload_fuel_file"), {"file": SimpleUploadedFile("vacio.xlsx", b"")}
+        )
+        self.assertRedirects(response, reverse("admin:index"), fetch_redirect_response=False)
+        self.assertEqual(set(os.listdir(settings.JOB_UPLOAD_DIR)), before)
+        self.assertFalse(BackgroundJob.objects.exists())
+
+    def test_job_of_a_dead_worker_fails_and_allows_reupload(self):
+        content = build_tanqueos_workbook([(datetime(2025, 1, 1), "ABC123", 1500, 10, "")]).getvalue()
+        self.client.post(reverse("upload_fuel_file"), {"file": SimpleUploadedFile("t.xlsx", content)})
+        job = claim_next("worker-muerto")
+
+        self.client.post(reverse("upload_fuel_file"), {"file": SimpleUploadedFile("t.xlsx", content)})
+        self.assertEqual(BackgroundJob.objects.count(), 1)
+
+        BackgroundJob.objects.filter(pk=job.pk).update(
+            started_at=timezone.now() - timedelta(seconds=settings.JOB_STALE_SECONDS + 1)
+        )
+        self.client.post(reverse("upload_fuel_file"), {"file": SimpleUploadedFile("t.xlsx", content)})
+        retry = BackgroundJob.objects.latest("id")
+        self.assertNotEqual(retry.pk, job.pk)
+
+        self.assertEqual(claim_next("worker-nuevo").pk, retry.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.Status.FAILED)
+        self.assertIn("worker", job.error)
+
+    def test_upload_requires_csrf_token(self):
+        from django.test import Client
+
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        content = build_tanqueos_workbook([]).getvalue()
+        response = client.post(
+            reverse("upload_fuel_file"), {"file": SimpleUploadedFile("t.xlsx", content)}
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class RunPeriodicChecksTests(TestCase):
+    def setUp(self):
+        self.today = timezone.now().date()
+
+    def _vehicle(self, plate, **kwargs):
+        return Vehicle.objects.create(
+            plate=plate,
+            brand="Brand",
+            linea="Line",
+            modelo=2020,
+            vehicle_type=Vehicle.VehicleType.AUTOMOVIL,
+            **kwargs,
+        )
+
+    def _run(self, *args):
+        call_command("run_periodic_checks", *args, stdout=StringIO())
+
+    def test_reconciles_document_alerts(self):
+        vehicle = self._vehicle(
+            "ABC123",
+            soat_due_date=self.today + timedelta(days=5),
+            rtm_due_date=self.today - timedelta(days=1),
+        )
+        self._run()
+        open_alerts = Alert.objects.filter(related_vehicle=vehicle, seen=False)
+        self.assertEqual(open_alerts.count(), 2)
+        self.assertEqual(
+            open_alerts.get(subject=Alert.Subject.RTM).severity, Alert.Severity.CRITICAL
+        )
+
+        self._run()
+        self.assertEqual(Alert.objects.count(), 2)
+
+        vehicle.soat_due_date = self.today + timedelta(days=200)
+        vehicle.save()
+        self._run()
+        self.assertEqual(
+            list(open_alerts.values_list("message", flat=True)),
+            [f"RTM de ABC123 VENCIDO. Fecha límite: {vehicle.rtm_due_date}."],
+        )
+
+    def test_closes_only_preventive_alerts_it_evaluated(self):
+        from workorders.models import MaintenanceManual, MaintenancePlan, ManualTask
+
+        with_tasks = MaintenanceManual.objects.create(name="Con tareas", fuel_type="DIESEL")
+        ManualTask.objects.create(manual=with_tasks, km_interval=10000, description="Aceite")
+        without_tasks = MaintenanceManual.objects.create(name="Sin tareas", fuel_type="GASOLINA")
+        far = self._vehicle("FAR001", current_odometer_km=1000)
+        empty = self._vehicle("EMP001", current_odometer_km=1000)
+        no_plan = self._vehicle("NOP001", current_odometer_km=1000)
+        for vehicle, manual in ((far, with_tasks), (empty, without_tasks)):
+            MaintenancePlan.objects.update_or_create(
+                vehicle=vehicle,
+                defaults={"manual": manual, "last_service_km": 0, "is_active": True},
+            )
+        MaintenancePlan.objects.filter(vehicle=no_plan).delete()
+        for vehicle in (far, empty, no_plan):
+            Alert.objects.create(
+                alert_type=Alert.AlertType.PREVENTIVE_DUE,
+                subject=Alert.Subject.PREVENTIVE,
+                related_vehicle=vehicle,
+                severity=Alert.Severity.WARNING,
+                message="Preventivo",
+            )
+
+        self._run()
+        self.assertEqual(
+            set(Alert.objects.filter(seen=False).values_list("related_vehicle__plate", flat=True)),
+            {"EMP001", "NOP001"},
+        )
+
+    def test_subject_key_ignores_plate_text(self):
+        vehicle = self._vehicle("RTM123", soat_due_date=self.today + timedelta(days=3))
+        self._run()
+        self._run()
+        alert = Alert.objects.get(related_vehicle=vehicle, seen=False)
+        self.assertEqual(alert.subject, Alert.Subject.SOAT)
+
+    def test_dry_run_does_not_write(self):
+        self._vehicle("ABC123", soat_due_date=self.today)
+        self._run("--dry-run")
+        self.assertFalse(Alert.objects.exists())
+
+    def test_query_count_does_not_depend_on_fleet_size(self):
+        def run():
+            with CaptureQueriesContext(connection) as ctx:
+                self._run()
+            return len(ctx.captured_queries)
+
+        self._vehicle("AAA001", soat_due_date=self.today)
+        small = run()
+        for i in range(20):
+            self._vehicle(f"BBB{i:03d}", soat_due_date=self.today, rtm_due_date=self.today)
+        self.assertEqual(small, run())
+
+
+class AlertManagerTests(TestCase):
+    def setUp(self):
+        self.vehicle = Vehicle.objects.create(
+            plate="XYZ789",
+            brand="Brand",
+            linea="Line",
+            modelo=2020,
+            vehicle_type=Vehicle.VehicleType.AUTOMOVIL,
+        )
+
+    def _raise(self, severity, message):
+        return Alert.objects.raise_or_update(
+            Alert.AlertType.PREVENTIVE_DUE,
+            self.vehicle,
+            Alert.Subject.PREVENTIVE,
+            severity,
+            message,
+        )
+
+    def test_raise_or_update_keeps_one_open_alert(self):
+        first_id, created = self._raise(Alert.Severity.INFO, "primero")
+        self.assertTrue(created)
+        second_id, created = self._raise(Alert.Severity.CRITICAL, "segundo")
+        self.assertFalse(created)
+        self.assertEqual(first_id, second_id)
+        alert = Alert.objects.get()
+        self.assertEqual((alert.severity, alert.message), (Alert.Severity.CRITICAL, "segundo"))
+
+        alert.seen = True
+        alert.save()
+        _, created = self._raise(Alert.Severity.INFO, "nuevo ciclo")
+        self.assertTrue(created)
+        self.assertEqual(Alert.objects.count(), 2)
+
+    def test_open_alerts_are_unique_per_subject(self):
+        self._raise(Alert.Severity.INFO, "primero")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Alert.objects.create(
+                alert_type=Alert.AlertType.PREVENTIVE_DUE,
+                related_vehicle=self.vehicle,
+                subject=Alert.Subject.PREVENTIVE,
+                severity=Alert.Severity.INFO,
+                message="duplicada",
+            )
+
+    def test_alerts_without_subject_can_repeat(self):
+        for order in ("OT-1", "OT-2"):
+            Alert.objects.create(
+                alert_type=Alert.AlertType.URGENT_OT,
+                related_vehicle=self.vehicle,
+                severity=Alert.Severity.CRITICAL,
+                message=f"{order} urgente",
+            )
+        self.assertEqual(
+            Alert.objects.filter(alert_type=Alert.AlertType.URGENT_OT, seen=False).count(), 2
+        )
+
+    def test_bulk_raise_or_update(self):
+        desired = {(self.vehicle.pk, Alert.Subject.ODOMETER): (Alert.Severity.WARNING, "km")}
+        self.assertEqual(
+            Alert.objects.bulk_raise_or_update(Alert.AlertType.ODOMETER_INCONSISTENT, desired),
+            (1, 0),
+        )
+        self.assertEqual(
+            Alert.objects.bulk_raise_or_update(Alert.AlertType.ODOMETER_INCONSISTENT, desired),
+            (0, 0),
+        )
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        Vehicle.objects.bulk_create(
+            [
+                Vehicle(
+                    plate=f"PAG{i:03d}",
+                    brand="Brand",
+                    linea="Line",
+                    modelo=2020,
+                    vehicle_type=Vehicle.VehicleType.AUTOMOVIL,
+                )
+                for i in range(7)
+            ]
+        )
+        self.url = reverse("vehicle-list")
+
+    def test_walks_pages_with_cursor(self):
+        plates = []
+        url = f"{self.url}?page_size=3"
+        while url:
+            data = self.client.get(url).json()
+            plates += [v["plate"] for v in data["results"]]
+            url = data["next"]
+        self.assertEqual(plates, [f"PAG{i:03d}" for i in range(7)])
+
+    def test_driver_orderings_are_unique_keys(self):
+        from users.models import Driver
+
+        Driver.objects.bulk_create(
+            [Driver(full_name="Mismo Nombre", document_number=f"D{i:02d}") for i in range(5)]
+        )
+        url = f"{reverse('driver-list')}?page_size=2&ordering=document_number"
+        documents = []
+        while url:
+            data = self.client.get(url).json()
+            documents += [d["document_number"] for d in data["results"]]
+            url = data["next"]
+        self.assertEqual(documents, [f"D{i:02d}" for i in range(5)])
+        response = self.client.get(reverse("driver-list"), {"ordering": "full_name"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_total_count_is_opt_in(self):
+        response = self.client.get(self.url)
+        self.assertNotIn("X-Total-Count", response)
+        response = self.client.get(self.url, {"count": "1"})
+        self.assertEqual(response["X-Total-Count"], "7")
+
+    def test_ordering_limited_to_indexed_fields(self):
+        data = self.client.get(self.url, {"ordering": "-plate", "page_size": 1}).json()
+        self.assertEqual(data["results"][0]["plate"], "PAG006")
+        response = self.client.get(self.url, {"ordering": "brand"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_page_size_is_capped(self):
+        Vehicle.objects.bulk_create(
+            [
+                Vehicle(
+                    plate=f"CAP{i:03d}",
+                    brand="Brand",
+                    linea="Line",
+                    modelo=2020,
+                    vehicle_type=Vehicle.VehicleType.AUTOMOVIL,
+                )
+                for i in range(KeysetPagination.max_page_size)
+            ]
+        )
+        data = self.client.get(self.url, {"page_size": 10000}).json()
+        self.assertEqual(len(data["results"]), KeysetPagination.max_page_size)
+
+
+class ApiQueryBudgetTests(TestCase):
+    """List endpoints run a fixed number of queries regardless of row count.
+
+    Inventory endpoints are not covered: their tables lag behind the models
+    in the migration history.
+    """
+
+    # url name -> queries per page (1 page query + 1 per prefetched relation)
+    BUDGETS = {
+        "vehicle-list": 1,
+        "driver-list": 1,
+        "userprofile-list": 1,
+        "workorder-list": 5,
+        "workordertask-list": 1,
+        "maintenanceplan-list": 1,
+        "category-list": 1,
+        "subcategory-list": 1,
+    }
+    # Endpoints con KeysetPagination; los demás retornan la lista completa
+    PAGINATED = {"vehicle-list", "driver-list"}
+
+    def _add_rows(self, start, n):
+        from users.models import Driver, UserProfile
+        from workorders.models import (
+            MaintenanceCategory,
+            MaintenancePlan,
+            MaintenanceSubcategory,
+            ProbableCause,
+            WorkOrder,
+            WorkOrderDriver,
+            WorkOrderTask,
+        )
+
+        for i in range(start, start + n):
+            vehicle = Vehicle.objects.create(
+                plate=f"QB{i:04d}",
+                brand="Brand",
+                linea="Line",
+                modelo=2020,
+                vehicle_type=Vehicle.VehicleType.AUTOMOVIL,
+            )
+            MaintenancePlan.objects.get_or_create(vehicle=vehicle)
+            driver = Driver.objects.create(full_name=f"Conductor {i}", document_number=f"D{i}")
+            user = get_user_model().objects.create_user(f"user{i}")
+            UserProfile.objects.create(user=user)
+            category = MaintenanceCategory.objects.create(name=f"Categoría {i}")
+            MaintenanceSubcategory.objects.create(category=category, name=f"Sub {i}")
+            order = WorkOrder.objects.create(vehicle=vehicle, description="Trabajo")
+            WorkOrderTask.objects.create(work_order=order, description="Tarea")
+            WorkOrderDriver.objects.create(work_order=order, driver=driver)
+            order.probable_causes.add(ProbableCause.objects.create(name=f"Causa {i}"))
+
+    def test_list_endpoints_stay_within_budget(self):
+        for rows_added in ((0, 2), (2, 8)):
+            self._add_rows(*rows_added)
+            for name, budget in self.BUDGETS.items():
+                with self.subTest(endpoint=name, rows=sum(rows_added)):
+                    with self.assertNumQueries(budget):
+                        response = self.client.get(reverse(name))
+                    self.assertEqual(response.status_code, 200)
+                    data = response.json()
+                    self.assertTrue(data["results"] if name in self.PAGINATED else data)
+
+    def test_unpaginated_lists_return_every_row(self):
+        from workorders.models import MaintenanceCategory
+
+        MaintenanceCategory.objects.bulk_create(
+            [MaintenanceCategory(name=f"Categoría {i:03d}") for i in range(KeysetPagination.page_size + 5)]
+        )
+        data = self.client.get(reverse("category-list")).json()
+        self.assertEqual(len(data), KeysetPagination.page_size + 5)
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        for plate in ("ABC1234", "ABC123", "ABD100", "XYZ999"):
+            Vehicle.objects.create(
+                plate=plate,
+                brand="Brand",
+                linea="Line",
+                modelo=2020,
+                vehicle_type=Vehicle.VehicleType.AUTOMOVIL,
+            )
+        self.url = reverse("autocomplete", kwargs={"source": "vehicles"})
+        User = get_user_model()
+        self.staff = User.objects.create_user("staff", password="pass", is_staff=True)
+
+    def test_exact_match_first_then_prefix(self):
+        from core.autocomplete import search
+
+        results = search("vehicles", "abc-123")
+        self.assertEqual([r["text"] for r in results], ["ABC123", "ABC1234"])
+        self.assertEqual(set(results[0]), {"id", "text"})
+
+    def test_sparse_fields_and_limit(self):
+        self.client.force_login(self.staff)
+        data = self.client.get(self.url, {"q": "AB", "fields": "id,brand", "limit": 2}).json()
+        self.assertEqual(len(data["results"]), 2)
+        self.assertEqual(set(data["results"][0]), {"id", "brand"})
+        response = self.client.get(self.url, {"fields": "id,password"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_one_query_then_cached(self):
+        from core.autocomplete import search
+
+        with self.assertNumQueries(1):
+            first = search("vehicles", "AB")
+        with self.assertNumQueries(0):
+            self.assertEqual(search("vehicles", "AB"), first)
+
+    def test_subcategories_filtered_by_category(self):
+        from core.autocomplete import search
+        from workorders.models import MaintenanceCategory, MaintenanceSubcategory
+
+        motor = MaintenanceCategory.objects.create(name="Motor")
+        frenos = MaintenanceCategory.objects.create(name="Frenos")
+        MaintenanceSubcategory.objects.create(category=motor, name="Aceite")
+        MaintenanceSubcategory.objects.create(category=frenos, name="Pastillas")
+        results = search("subcategories", filters={"category": str(frenos.pk)})
+        self.assertEqual([r["text"] for r in results], ["Pastillas"])
+
+    def test_spare_items_include_inactive(self):
+        from core.autocomplete import search
+        from inventory.models import SpareCategory, SpareItem
+
+        category = SpareCategory.objects.create(name="Filtros", slug="filtros")
+        SpareItem.objects.create(category=category, name="Filtro aceite")
+        SpareItem.objects.create(category=category, name="Filtro aire", is_active=False)
+        results = search("spare-items", "filtro")
+        self.assertEqual([r["text"] for r in results], ["Filtro aceite", "Filtro aire"])
+
+    def test_upper_prefix_index_migration_only_on_postgresql(self):
+        from importlib import import_module
+
+        from django.apps import apps
+
+        migration = import_module("users.migrations.0004_driver_full_name_upper_idx")
+        editor = mock.Mock(quote_name=lambda name: f'"{name}"')
+        editor.connection.vendor = "sqlite"
+        migration.create_index(apps, editor)
+        editor.execute.assert_not_called()
+
+        editor.connection.vendor = "postgresql"
+        migration.create_index(apps, editor)
+        editor.execute.assert_called_once_with(
+            'CREATE INDEX IF NOT EXISTS "users_driver_full_name_upper" ON "users_driver" '
+            '(UPPER("full_name") text_pattern_ops)'
+        )
+
+    def test_admin_spare_items_skip_the_cache(self):
+        from inventory.models import SpareCategory, SpareItem
+
+        category = SpareCategory.objects.create(name="Filtros", slug="filtros")
+        url = reverse("admin:vehicle_spare_items")
+        self.client.force_login(
+            get_user_model().objects.create_superuser("admin", "admin@example.com", "pass")
+        )
+        self.assertEqual(self.client.get(url, {"category": category.pk}).json(), [])
+        item = SpareItem.objects.create(category=category, name="Filtro aceite")
+        self.assertEqual(
+            self.client.get(url, {"category": category.pk}).json(),
+            [{"id": item.pk, "text": "Filtro aceite"}],
+        )
+
+    def test_requires_staff(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        missing = reverse("autocomplete", kwargs={"source": "nope"})
+        self.assertEqual(self.client.get(missing).status_code, 404)
+
+
+class RowWatermarkTests(TestCase):
+    def rows(self, *days):
+        return [
+            {"FECHA": datetime(2025, 4, day, 8), "PLACA": "ABC123", "KILOMETRAJE": 1000 + day}
+            for day in days
+        ]
+
+    def run_load(self, rows, full=False):
+        from core.incremental import RowWatermark
+
+        watermark = RowWatermark.load("gestion.xlsx", "TANQUEOS", full=full)
+        fresh = [row for batch in watermark.filter([rows]) for row in batch]
+        watermark.save()
+        return fresh, watermark
+
+    def test_reupload_processes_only_appended_rows(self):
+        self.run_load(self.rows(1, 2, 3))
+        fresh, watermark = self.run_load(self.rows(1, 2, 3, 4, 5))
+        self.assertEqual([r["KILOMETRAJE"] for r in fresh], [1004, 1005])
+        self.assertEqual(watermark.rows_skipped, 3)
+
+    def test_late_rows_inside_lookback_are_kept(self):
+        self.run_load(self.rows(1, 10))
+        # día 8: dentro de la ventana (marca día 10 - 3 días); día 2: fuera
+        with self.assertLogs("core.incremental", "WARNING"):
+            fresh, watermark = self.run_load(self.rows(1, 2, 8, 10))
+        self.assertEqual([r["KILOMETRAJE"] for r in fresh], [1008])
+        # El día 1 ya estaba importado; el día 2 es una fila tardía
+        self.assertEqual((watermark.rows_skipped, watermark.rows_late), (2, 1))
+        fresh, _ = self.run_load(self.rows(1, 2, 8, 10), full=True)
+        self.assertEqual(len(fresh), 4)
+
+    def test_day_counts_before_the_cutoff_are_summed(self):
+        from reports.models import FuelImportWatermark
+
+        self.run_load(self.rows(1, 2, 3))
+        self.run_load(self.rows(1, 2, 3, 10, 11))
+        stored = FuelImportWatermark.objects.get(source="gestion.xlsx")
+        # Corte: día 8; los días 1-3 solo quedan en el total
+        self.assertEqual(stored.day_counts, {"2025-04-10": 1, "2025-04-11": 1})
+        self.assertEqual(stored.rows_settled, 3)
+        _, watermark = self.run_load(self.rows(1, 2, 3, 10, 11))
+        self.assertEqual((watermark.rows_skipped, watermark.rows_late), (5, 0))
+        with self.assertLogs("core.incremental", "WARNING"):
+            _, watermark = self.run_load(self.rows(1, 2, 3, 4, 10, 11))
+        self.assertEqual(watermark.rows_late, 1)
+        self.run_load(self.rows(1, 2, 3, 4, 10, 11), full=True)
+        stored.refresh_from_db()
+        self.assertEqual(stored.rows_settled, 4)
+
+    def test_import_odometer_skips_rows_from_previous_upload(self):
+        from reports.models import FuelUploadLog
+
+        vehicle = Vehicle.objects.create(
+            plate="ABC123",
+            brand="Brand",
+            linea="Line",
+            modelo=2020,
+            vehicle_type=Vehicle.VehicleType.AUTOMOVIL,
+        )
+
+        def upload(rows):
+            wb = Workbook()
+            ws = wb.active
+            ws.title = "TANQUEOS"
+            ws.append(["FECHA", "PLACA", "KILOMETRAJE"])
+            for row in rows:
+                ws.append(row)
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "upload.xlsx")
+                wb.save(path)
+                call_command(
+                    "import_odometer",
+                    file_path=path,
+                    original_filename="GESTION DE COMBUSTIBLE.xlsx",
+                    stdout=StringIO(),
+                )
+            return FuelUploadLog.objects.latest("id")
+
+        first = [(datetime(2025, 4, 1, 8), "ABC123", 1500)]
+        upload(first)
+        log = upload(first + [(datetime(2025, 4, 2, 8), "ABC123", 1700)])
+        self.assertEqual((log.rows_processed, log.rows_skipped), (1, 1))
+        vehicle.refresh_from_db()
+        self.assertEqual(vehicle.current_odometer_km, 1700)
+
+    def test_forgotten_rows_are_processed_again(self):
+        from core.incremental import RowWatermark
+
+        watermark = RowWatermark.load("gestion.xlsx", "TANQUEOS")
+        list(watermark.filter([self.rows(1, 2)]))
+        self.assertEqual(watermark.forget(lambda row: row["KILOMETRAJE"] == 1002), 1)
+        watermark.save()
+        fresh, _ = self.run_load(self.rows(1, 2))
+        self.assertEqual([r["KILOMETRAJE"] for r in fresh], [1002])
+
+    def test_rows_of_unregistered_plates_import_once_vehicle_exists(self):
+        rows = [(datetime(2025, 4, 1, 8), "NEW999", 1500, 10, "")]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "GESTION DE COMBUSTIBLE.xlsx")
+            with open(path, "wb") as fh:
+                fh.write(build_tanqueos_workbook(rows).getvalue())
+            call_command("run_daily_jobs", file_path=path, stdout=StringIO())
+            Vehicle.objects.create(
+                plate="NEW999",
+                brand="Brand",
+                linea="Line",
+                modelo=2020,
+                vehicle_type=Vehicle.VehicleType.AUTOMOVIL,
+            )
+            call_command("run_daily_jobs", file_path=path, stdout=StringIO())
+        self.assertEqual(FuelFill.objects.filter(vehicle__plate="NEW999").count(), 1)
+
+    def test_odometer_and_fuel_importers_keep_separate_watermarks(self):
+        from reports.models import FuelUploadLog
+
+        Vehicle.objects.create(
+            plate="ABC123",
+            brand="Brand",
+            linea="Line",
+            modelo=2020,
+            vehicle_type=Vehicle.VehicleType.AUTOMOVIL,
+        )
+        rows = [(datetime(2025, 4, day, 8), "ABC123", 1000 + day, 10, "") for day in (1, 2, 3)]
+        with tempfile.TemporaryDirectory() as tmp:
+            first = os.path.join(tmp, "GESTION DE COMBUSTIBLE.xlsx")
+            second = os.path.join(tmp, "OTRA GESTION.xlsx")
+            for path, rows_ in ((first, rows), (second, [r[:2] + (2000,) + r[3:] for r in rows])):
+                with open(path, "wb") as fh:
+                    fh.write(build_tanqueos_workbook(rows_).getvalue())
+            # Odómetros primero, luego tanqueos del mismo archivo
+            call_command("import_odometer", file_path=first, stdout=StringIO())
+            out = StringIO()
+            call_command("run_daily_jobs", file_path=first, stdout=out)
+            self.assertIn("(0 ya importados", out.getvalue())
+            self.assertEqual(FuelFill.objects.count(), 3)
+            self.assertFalse(OdometerReading.objects.filter(is_anomaly=True).exists())
+
+            # Y al revés
+            call_command("run_daily_jobs", file_path=second, stdout=StringIO())
+            call_command("import_odometer", file_path=second, stdout=StringIO())
+        log = FuelUploadLog.objects.latest("id")
+        self.assertEqual((log.rows_processed, log.rows_skipped), (3, 0))
+
+class StartupImportTests(TestCase):
+    def test_parse_importtime_groups_by_package(self):
+        from core.startup import parse_importtime
+
+        profile = parse_importtime(
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       100 |        100 |     core.models\n"
+            "import time:        50 |        150 |   core\n"
+            "import time:        30 |        30 | fleet\n"
+        )
+        self.assertEqual(profile.by_package, {"core": 150, "fleet": 30})
+        self.assertEqual(profile.total_us, 30)
+        self.assertEqual(profile.heavy_loaded(), [])
+
+    def test_wsgi_load_does_not_import_heavy_modules(self):
+        from core.startup import profile_imports
+
+        profile = profile_imports("project.wsgi")
+        self.assertIn("project.wsgi", profile.loaded)
+        self.assertEqual(profile.heavy_loaded(), [])
+
+
+@override_settings(REQUEST_METRICS_ENABLED=True)
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        from core.middleware import request_metrics
+
+        request_metrics.reset()
+        User = get_user_model()
+        self.admin = User.objects.create_superuser("root", "root@example.com", "pass")
+        self.client.force_login(self.admin)
+        self.url = reverse("autocomplete", kwargs={"source": "vehicles"})
+
+    def test_records_route_aggregates_and_server_timing(self):
+        response = self.client.get(self.url, {"q": "ZZ"})
+        self.assertIn("db;dur=", response["Server-Timing"])
+        data = self.client.get(reverse("request_metrics")).json()
+        routes = {r["route"]: r for r in data["routes"]}
+        stats = routes["GET /api/autocomplete/<str:source>/"]
+        self.assertEqual(stats["count"], 1)
+        self.assertGreaterEqual(stats["avg_queries"], 1)
+        self.assertIsNotNone(stats["p95_ms"])
+
+    @override_settings(SLOW_REQUEST_MS=10**6, SLOW_REQUEST_QUERIES=10**6, SLOW_REQUEST_DUPLICATES=2)
+    def test_repeated_queries_go_to_slow_log(self):
+        from django.http import HttpResponse
+
+        from core.middleware import RequestMetricsMiddleware
+        from fleet.models import Vehicle
+
+        def view(request):
+            for plate in ("A", "B", "C"):
+                Vehicle.objects.filter(plate=plate).exists()
+            return HttpResponse()
+
+        request = self.client.get(self.url).wsgi_request
+        with self.assertLogs("core.slow_requests", "WARNING") as logs:
+            RequestMetricsMiddleware(view)(request)
+        self.assertIn("3x SELECT", logs.output[0])
+
+    @override_settings(REQUEST_METRICS_ENABLED=False)
+    def test_disabled_middleware_is_not_loaded(self):
+        from django.core.exceptions import MiddlewareNotUsed
+
+        from core.middleware import RequestMetricsMiddleware
+
+        with self.assertRaises(MiddlewareNotUsed):
+            RequestMetricsMiddleware(lambda request: None)
+        self.assertFalse(self.client.get(self.url).has_header("Server-Timing"))
+
+    def test_endpoint_requires_superuser(self):
+        User = get_user_model()
+        staff = User.objects.create_user("staff", password="pass", is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get(reverse("request_metrics")).status_code, 302)
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        overrides = override_settings(PROFILE_DIR=self.tmp.name, PROFILE_KEEP=2, PROFILER="cprofile")
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        User = get_user_model()
+        self.admin = User.objects.create_superuser("root", "root@example.com", "pass")
+        self.staff = User.objects.create_user("staff", password="pass", is_staff=True)
+        self.url = reverse("autocomplete", kwargs={"source": "vehicles"})
+
+    def test_superuser_request_with_flag_is_profiled(self):
+        from core.profiling import list_profiles
+
+        self.client.force_login(self.staff)
+        response = self.client.get(self.url, {"_profile": "1"})
+        self.assertFalse(response.has_header("X-Sigma-Profile-Name"))
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url, {"_profile": "1"})
+        name = response["X-Sigma-Profile-Name"]
+        self.assertEqual([p["name"] for p in list_profiles()], [name])
+
+        text = self.client.get(reverse("profile_download", args=[name]), {"format": "text"})
+        self.assertIn("cumulative", text.content.decode())
+        listing = self.client.get(reverse("profile_list"))
+        self.assertContains(listing, name)
+        self.assertEqual(self.client.get(reverse("profile_download", args=["..passwd"])).status_code, 404)
+
+    def test_signed_header_and_ring_buffer(self):
+        from core.profiling import list_profiles, profile_token
+
+        token = profile_token(self.admin)
+        for _ in range(3):
+            response = self.client.get(self.url, HTTP_X_SIGMA_PROFILE=token)
+            self.assertTrue(response.has_header("X-Sigma-Profile-Name"))
+        self.assertEqual(len(list_profiles()), 2)
+
+        forged = self.client.get(self.url, HTTP_X_SIGMA_PROFILE=profile_token(self.staff))
+        self.assertFalse(forged.has_header("X-Sigma-Profile-Name"))
+
+    def test_command_profile_flag(self):
+        from core.profiling import list_profiles
+
+        err = StringIO()
+        call_command("run_periodic_checks", "--dry-run", "--profile", stdout=StringIO(), stderr=err)
+        self.assertIn("Perfil guardado", err.getvalue())
+        self.assertEqual(list_profiles()[0]["label"], "run_periodic_checks")
+
+
+class SyntheticFleetTests(TestCase):
+    def test_generates_consistent_fleet_and_workbook(self):
+        from core.synthetic import generate_fleet
+        from workorders.ledger import expected_ledger
+        from workorders.models import MaintenancePlan, VehicleCostLedger, WorkOrder
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "fleet.xlsx")
+            # La tabla de repuestos de la BD de pruebas no está al día con el modelo
+            fleet = generate_fleet(
+                vehicles=12, months=1, fills_per_month=3, seed=1, workbook_path=path,
+                with_parts=False,
+            )
+            with WorkbookReader(path) as reader:
+                rows = sum(len(b) for b in reader.batches("TANQUEOS", TANQUEOS_COLUMNS))
+
+        self.assertEqual(fleet.vehicles, 12)
+        self.assertTrue(fleet.without_parts)
+        self.assertEqual(FuelFill.objects.count(), 36)
+        self.assertEqual(OdometerReading.objects.count(), 36)
+        self.assertEqual(MaintenancePlan.objects.filter(is_active=True).count(), 12)
+        self.assertEqual(WorkOrder.objects.count(), 24)
+        self.assertEqual(rows, fleet.workbook_rows)
+        # El histórico termina en el odómetro actual de cada vehículo
+        vehicle = Vehicle.objects.get(plate="SYN000003")
+        last_fill = FuelFill.objects.filter(vehicle=vehicle).order_by("-fill_date").first()
+        self.assertEqual(last_fill.odometer_km, vehicle.current_odometer_km)
+        # Costos y libro de costos consistentes
+        stored = {
+            (row.vehicle_id, row.month, row.order_type): (
+                row.labor_cost_internal, row.labor_cost_external, row.parts_cost, row.order_count
+            )
+            for row in VehicleCostLedger.objects.all()
+        }
+        self.assertEqual(stored, expected_ledger())
+        with self.assertRaises(ValueError):
+            generate_fleet(vehicles=1, prefix="SYN", with_parts=False)
+
+    def test_run_benchmarks_writes_json(self):
+        import json
+
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "bench.json")
+            call_command(
+                "run_benchmarks",
+                "--scales", "5",
+                "--months", "1",
+                "--only", "process_fuel_file,api_vehicles,report_vehicle_costs",
+                "--output", output,
+                "--without-parts",
+                stdout=StringIO(),
+            )
+            with open(output, encoding="utf-8") as fh:
+                data = json.load(fh)
+            out = StringIO()
+            call_command(
+                "run_benchmarks", "--scales", "5", "--months", "1", "--only", "api_vehicles",
+                "--output", os.path.join(tmp, "again.json"), "--baseline", output,
+                "--without-parts", stdout=out,
+            )
+
+        results = data["scales"]["5"]["results"]
+        self.assertEqual(set(results), {"process_fuel_file", "api_vehicles", "report_vehicle_costs"})
+        self.assertGreater(results["process_fuel_file"]["queries"], 0)
+        self.assertEqual(data["scales"]["5"]["fleet"]["vehicles"], 5)
+        self.assertTrue(data["scales"]["5"]["fleet"]["without_parts"])
+        # Todo se revierte al terminar
+        self.assertFalse(Vehicle.objects.filter(plate__startswith="BCH").exists())
+        self.assertRegex(out.getvalue(), "REGRESIÓN|Sin regresiones")
+
+    @override_settings(ALLOWED_HOSTS=[])
+    def test_api_cases_run_with_repo_allowed_hosts(self):
+        from core.benchmarks import run_scale
+
+        report = run_scale(5, names=["api_vehicles", "api_workorders"], months=1, with_parts=False)
+        for name, measurement in report["results"].items():
+            self.assertNotIn("error", measurement, name)
+
+    def test_compare_flags_fleet_without_parts(self):
+        from core.benchmarks import compare
+
+        def run(without_parts):
+            return {"scales": {"5": {"fleet": {"without_parts": without_parts}, "results": {}}}}
+
+        self.assertEqual(compare(run(True), run(True)), [])
+        self.assertEqual([case for _, case, _ in compare(run(True), run(False))], ["flota"])
+
+    def test_compare_flags_slower_or_chattier_cases(self):
+        from core.benchmarks import compare
+
+        def run(seconds, queries):
+            return {"scales": {"1000": {"results": {"api_vehicles": {"seconds": seconds, "queries": queries}}}}}
+
+        self.assertEqual(compare(run(1.1, 5), run(1.0, 5)), [])
+        messages = [m for _, _, m in compare(run(1.5, 6), run(1.0, 5))]
+        self.assertEqual(len(messages), 2)
+
+
+class DashboardMetricsTests(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        today = timezone.localdate()
+        self.vehicle = Vehicle.objects.create(
+            plate="DSH100",
+            brand="Brand",
+            linea="Line",
+            modelo=2020,
+            vehicle_type=Vehicle.VehicleType.AUTOMOVIL,
+            soat_due_date=today - timedelta(days=1),
+            rtm_due_date=today + timedelta(days=10),
+        )
+        Alert.objects.create(
+            alert_type=Alert.AlertType.PREVENTIVE_DUE,
+            subject=Alert.Subject.PREVENTIVE,
+            severity=Alert.Severity.CRITICAL,
+            message="Preventivo vencido",
+            related_vehicle=self.vehicle,
+        )
+        Alert.objects.create(
+            alert_type=Alert.AlertType.DOC_EXPIRATION,
+            subject=Alert.Subject.RTM,
+            severity=Alert.Severity.WARNING,
+            message="RTM por vencer",
+            related_vehicle=self.vehicle,
+        )
+
+    def test_grouped_queries_then_cached(self):
+        from core.dashboard import METRIC_GROUPS, get_metrics
+
+        with CaptureQueriesContext(connection) as ctx:
+            metrics = get_metrics()
+        selects = [q for q in ctx.captured_queries if q["sql"].startswith("SELECT")]
+        self.assertEqual(len(selects), len(METRIC_GROUPS))
+        self.assertEqual(metrics["open_alerts"], 2)
+        self.assertEqual(metrics["alerts_by_severity"]["CRITICAL"], 1)
+        self.assertEqual(metrics["overdue_preventives"], 1)
+        self.assertEqual((metrics["soat_expired"], metrics["soat_expiring"]), (1, 0))
+        self.assertEqual((metrics["rtm_expired"], metrics["rtm_expiring"]), (0, 1))
+        self.assertEqual(metrics["in_workshop_count"], 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_metrics(), metrics)
+
+    def test_saves_invalidate_affected_groups(self):
+        from core.dashboard import get_metrics
+
+        get_metrics()
+        alert = Alert.objects.get(severity=Alert.Severity.CRITICAL)
+        alert.seen = True
+        alert.save()
+        with CaptureQueriesContext(connection) as ctx:
+            metrics = get_metrics()
+        # Solo se recalcula el grupo de alertas
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(metrics["overdue_preventives"], 0)
+
+        self.vehicle.soat_due_date = timezone.localdate() + timedelta(days=5)
+        self.vehicle.save()
+        metrics = get_metrics()
+        self.assertEqual((metrics["soat_expired"], metrics["soat_expiring"]), (0, 1))
+
+    def test_bulk_alert_writes_invalidate(self):
+        from core.dashboard import get_metrics
+
+        get_metrics()
+        Alert.objects.raise_or_update(
+            Alert.AlertType.PREVENTIVE_DUE,
+            self.vehicle,
+            Alert.Subject.PREVENTIVE,
+            Alert.Severity.WARNING,
+            "Preventivo próximo",
+        )
+        self.assertEqual(get_metrics()["overdue_preventives"], 0)
+
+    def test_raise_or_update_invalidates_after_writing(self):
+        seen_at_invalidation = []
+
+        def record(*groups):
+            seen_at_invalidation.append(
+                Alert.objects.filter(subject=Alert.Subject.ODOMETER).values_list("message", flat=True).first()
+            )
+
+        with mock.patch("core.dashboard.invalidate", side_effect=record):
+            for message in ("Primera", "Segunda"):
+                Alert.objects.raise_or_update(
+                    Alert.AlertType.ODOMETER_INCONSISTENT,
+                    self.vehicle,
+                    Alert.Subject.ODOMETER,
+                    Alert.Severity.WARNING,
+                    message,
+                )
+        # El alta también invalida desde post_save; ninguna invalidación precede a la escritura
+        self.assertEqual(list(dict.fromkeys(seen_at_invalidation)), ["Primera", "Segunda"])
+
+    def test_admin_index_renders_tiles(self):
+        User = get_user_model()
+        admin_user = User.objects.create_superuser("dash", "dash@example.com", "pass")
+        self.client.force_login(admin_user)
+        response = self.client.get(reverse("admin:index"))
+        self.assertContains(response, "Preventivos Vencidos (1)")
+        self.assertContains(response, "Alertas Abiertas (2)")
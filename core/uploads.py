@@ -0,0 +1,131 @@
+"""Recepción de archivos con hash SHA-256 calculado al vuelo.
+
+:class:`HashingFileUploadHandler` reemplaza a los manejadores de Django en la
+vista de carga de tanqueos: cada bloque recibido actualiza el hash y se
+acumula en memoria; solo si el archivo supera ``MEMORY_LIMIT`` se vuelca a un
+archivo en ``JOB_UPLOAD_DIR``. Al terminar, si el hash ya está registrado (o
+la extensión no es la esperada) el archivo se descarta sin abrirlo con
+openpyxl (y, si cabía en memoria, sin tocar el disco); si no, se escribe una
+sola vez en su ruta definitiva, que es la que recibe el trabajo en segundo
+plano. :class:`HashedUpload` no deja un descriptor abierto; si la vista no
+encola el archivo debe llamar a :meth:`HashedUpload.discard`.
+"""
+
+import builtins
+import os
+import uuid
+from hashlib import sha256
+from io import BytesIO
+from typing import Callable, Optional
+
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+
+from .jobs import upload_dir
+
+# Archivos hasta este tamaño se mantienen en memoria mientras se reciben
+MEMORY_LIMIT = 32 * 1024 * 1024
+
+
+class HashedUpload(UploadedFile):
+    """Archivo recibido con su hash, tamaño y (si se guardó) ruta en disco.
+
+    Attributes:
+        sha256: Hash hexadecimal del contenido.
+        duplicate: ``True`` si el hash ya estaba registrado; el contenido se
+            descartó.
+        path: Ruta en ``JOB_UPLOAD_DIR`` o ``None`` si no se guardó.
+    """
+
+    def __init__(self, name, content_type, size, charset, sha256, duplicate, path):
+        # Sin descriptor abierto: el contenido se lee de ``path`` solo con ``open()``
+        super().__init__(None, name, content_type, size, charset)
+        self.sha256 = sha256
+        self.duplicate = duplicate
+        self.path = path
+
+    def open(self, mode="rb"):
+        if self.path is None:
+            raise ValueError(f"El archivo '{self.name}' no se guardó.")
+        self.file = builtins.open(self.path, mode)
+        return self
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+    def temporary_file_path(self):
+        return self.path
+
+    def discard(self) -> None:
+        """Cierra y elimina el archivo guardado (formulario inválido, duplicado, ...)."""
+        self.close()
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+        self.path = None
+
+
+class HashingFileUploadHandler(FileUploadHandler):
+    """Manejador de carga que calcula el SHA-256 mientras recibe los bloques.
+
+    Args:
+        request: Petición en curso.
+        is_known: Callable ``(sha256) -> bool``; si retorna ``True`` el archivo
+            se descarta como duplicado.
+        suffix: Extensión del archivo guardado.
+    """
+
+    def __init__(self, request=None, is_known: Optional[Callable[[str], bool]] = None, suffix=".xlsx"):
+        super().__init__(request)
+        self.is_known = is_known or (lambda digest: False)
+        self.suffix = suffix
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self._hash = sha256()
+        self._buffer = BytesIO()
+        self._path = None
+        self._disk = None
+
+    def receive_data_chunk(self, raw_data, start):
+        self._hash.update(raw_data)
+        if self._disk is None and self._buffer.tell() + len(raw_data) > MEMORY_LIMIT:
+            # Archivo grande: se pasa a disco y se sigue escribiendo ahí
+            self._path = str(upload_dir() / f"{uuid.uuid4().hex}{self.suffix}")
+            self._disk = open(self._path, "wb")
+            self._disk.write(self._buffer.getbuffer())
+            self._buffer = None
+        (self._disk or self._buffer).write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        digest = self._hash.hexdigest()
+        duplicate = self.is_known(digest)
+        # Solo se conserva en disco lo que el trabajo va a procesar
+        keep = not duplicate and self.file_name.lower().endswith(self.suffix)
+        if self._disk is not None:
+            self._disk.close()
+            if not keep:
+                os.remove(self._path)
+                self._path = None
+        elif keep:
+            # Única escritura a disco, en la ruta que usará el trabajo
+            self._path = str(upload_dir() / f"{uuid.uuid4().hex}{self.suffix}")
+            with open(self._path, "wb") as fh:
+                fh.write(self._buffer.getbuffer())
+        self._buffer = None
+        return HashedUpload(
+            self.file_name,
+            self.content_type,
+            file_size,
+            self.charset,
+            sha256=digest,
+            duplicate=duplicate,
+            path=self._path,
+        )
+
+    def upload_interrupted(self):
+        if self._disk is not None:
+            self._disk.close()
+        if self._path and os.path.exists(self._path):
+            os.remove(self._path)
@@ -7,4 +7,9 @@ urlpatterns = [
     path("upload-fuel-file/", views.upload_fuel_file_view, name="upload_fuel_file"),
     path("run-periodic-checks/", views.run_periodic_checks_view, name="run_periodic_checks"),
     path("seed-taxonomy/", views.seed_taxonomy_view, name="seed_taxonomy"),
+    path("jobs/<int:pk>/", views.job_detail_view, name="job_detail"),
+    path("jobs/<int:pk>/status/", views.job_status_view, name="job_status"),
+    path("metrics/requests/", views.request_metrics_view, name="request_metrics"),
+    path("profiles/", views.profile_list_view, name="profile_list"),
+    path("profiles/<str:name>/", views.profile_download_view, name="profile_download"),
 ]
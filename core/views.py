@@ -1,28 +1,60 @@
 """Vistas utilitarias administrativas del núcleo (core)."""
 
 import logging
-import os
-import tempfile
+from datetime import datetime, timezone as dt_timezone
 from io import StringIO
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import user_passes_test
-from django.shortcuts import render, redirect
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, render, redirect
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.views.decorators.http import require_http_methods
 from django.core.management import call_command
 
 from .forms import FileUploadForm
+from .fuel_import import is_known_upload
+from .jobs import active_jobs, enqueue
+from .middleware import request_metrics
+from .profiling import TOKEN_MAX_AGE, list_profiles, profile_path, profile_token
+from .models import BackgroundJob
+from .uploads import HashingFileUploadHandler
 
 logger = logging.getLogger(__name__)
 
 
+def _known_fuel_upload(sha256):
+    """El archivo ya se importó o está en cola/en ejecución (worker vivo)."""
+    return is_known_upload(sha256) or active_jobs().filter(
+        kind=BackgroundJob.Kind.IMPORT_ODOMETER,
+        payload__sha256=sha256,
+    ).exists()
+
+
 @user_passes_test(lambda u: u.is_superuser)
 @require_http_methods(["GET", "POST"])
+@csrf_exempt
 def upload_fuel_file_view(request):
-    """Sube y procesa un Excel de tanqueos para actualizar odómetros y registrar la carga."""
+    """Sube un Excel de tanqueos y encola su procesamiento (``import_odometer``).
+
+    El archivo se recibe con :class:`~core.uploads.HashingFileUploadHandler`:
+    el SHA-256 se calcula al vuelo y un archivo repetido se rechaza sin
+    guardarlo ni abrirlo. El CSRF se valida en ``_upload_fuel_file`` porque el
+    manejador debe instalarse antes de que se lea el cuerpo de la petición.
+    """
+    request.upload_handlers = [HashingFileUploadHandler(request, is_known=_known_fuel_upload)]
+    return _upload_fuel_file(request)
+
+
+@csrf_protect
+def _upload_fuel_file(request):
     if request.method == "POST":
         form = FileUploadForm(request.POST, request.FILES)
         if not form.is_valid():
+            for _, uploads in request.FILES.lists():
+                for upload in uploads:
+                    upload.discard()
             messages.error(request, "Formulario inválido. Verifique el archivo seleccionado.")
             return redirect("admin:index")
 
@@ -35,43 +67,32 @@ def upload_fuel_file_view(request):
             messages.error(request, "Solo se permiten archivos con extensión .xlsx")
             return redirect("admin:index")
 
-        tmp_path = None
-        try:
-            with tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False) as tmp:
-                tmp_path = tmp.name
-                for chunk in uploaded_file.chunks():
-                    tmp.write(chunk)
-                tmp.flush()
-
-            output = StringIO()
-            # Comando robusto (idempotente por hash)
-            call_command(
-                "import_odometer",
-                file_path=tmp_path,
-                sheet_name="TANQUEOS",
-                user_id=request.user.id,
-                stdout=output,
-            )
-
-            msg = output.getvalue()
-            preview = (msg[:600] + "…") if len(msg) > 600 else msg
-            messages.success(
+        if uploaded_file.duplicate:
+            uploaded_file.discard()
+            messages.warning(
                 request,
-                f"Archivo '{uploaded_file.name}' procesado. Resumen:\n{preview}",
+                f"El archivo '{uploaded_file.name}' ya fue procesado o está en cola; no se importará de nuevo.",
             )
+            return redirect("admin:index")
 
-        except Exception as e:
-            logger.exception("Error al procesar el archivo de tanqueos")
-            messages.error(request, f"Ocurrió un error al procesar el archivo: {e}")
-
-        finally:
-            if tmp_path and os.path.exists(tmp_path):
-                try:
-                    os.remove(tmp_path)
-                except Exception:
-                    logger.warning("No se pudo eliminar el temporal: %s", tmp_path)
-
-        return redirect("admin:index")
+        job = enqueue(
+            BackgroundJob.Kind.IMPORT_ODOMETER,
+            payload={
+                "sheet_name": "TANQUEOS",
+                "user_id": request.user.id,
+                "original_filename": uploaded_file.name,
+                "sha256": uploaded_file.sha256,
+                "size_bytes": uploaded_file.size,
+            },
+            user=request.user,
+            file_path=uploaded_file.path,
+            original_filename=uploaded_file.name,
+        )
+        messages.success(
+            request,
+            f"Archivo '{uploaded_file.name}' recibido. Se procesará en segundo plano (trabajo #{job.pk}).",
+        )
+        return redirect("job_detail", pk=job.pk)
 
     # GET
     form = FileUploadForm()
@@ -90,23 +111,13 @@ def upload_fuel_file_view(request):
 @user_passes_test(lambda u: u.is_superuser)
 @require_http_methods(["POST", "GET"])
 def run_periodic_checks_view(request):
-    """Ejecuta revisiones periódicas (comando)."""
-    try:
-        output = StringIO()
-        call_command("run_periodic_checks", stdout=output)
-
-        msg = output.getvalue()
-        preview = (msg[:600] + "…") if len(msg) > 600 else msg
-
-        messages.success(
-            request,
-            f"Revisiones Periódicas ejecutadas con éxito. Resumen:\n{preview}",
-        )
-    except Exception as e:
-        logger.exception("Error al ejecutar las revisiones periódicas")
-        messages.error(request, f"Ocurrió un error al ejecutar las revisiones: {e}")
-
-    return redirect("admin:index")
+    """Encola las revisiones periódicas (comando) para el worker."""
+    job = enqueue(BackgroundJob.Kind.PERIODIC_CHECKS, user=request.user)
+    messages.success(
+        request,
+        f"Revisiones Periódicas encoladas (trabajo #{job.pk}).",
+    )
+    return redirect("job_detail", pk=job.pk)
 
 
 @user_passes_test(lambda u: u.is_superuser)
@@ -123,3 +134,99 @@ def seed_taxonomy_view(request):
         messages.error(request, f"Ocurrió un error al cargar la taxonomía: {e}")
 
     return redirect("admin:index")
+
+
+@user_passes_test(lambda u: u.is_superuser)
+@require_http_methods(["GET"])
+def job_detail_view(request, pk):
+    """Página que muestra el estado de un trabajo y lo consulta periódicamente."""
+    job = get_object_or_404(BackgroundJob, pk=pk)
+    return render(
+        request,
+        "admin/job_status.html",
+        {
+            "job": job,
+            "title": f"Trabajo #{job.pk}: {job.get_kind_display()}",
+            "site_header": "Administración de SIGMA",
+            "has_permission": True,
+        },
+    )
+
+
+@user_passes_test(lambda u: u.is_superuser)
+@require_http_methods(["GET"])
+def job_status_view(request, pk):
+    """Estado de un trabajo en JSON (para sondeo desde el admin)."""
+    job = get_object_or_404(BackgroundJob, pk=pk)
+    return JsonResponse(
+        {
+            "id": job.pk,
+            "kind": job.kind,
+            "status": job.status,
+            "status_display": job.get_status_display(),
+            "progress": job.progress,
+            "progress_message": job.progress_message,
+            "output": job.output,
+            "error": job.error,
+            "finished": job.is_finished,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+        }
+    )
+
+
+@user_passes_test(lambda u: u.is_superuser)
+@require_http_methods(["GET", "POST"])
+def request_metrics_view(request):
+    """Agregados por ruta de ``RequestMetricsMiddleware`` en JSON.
+
+    Son de este proceso y desde su arranque (o el último reinicio con
+    ``POST``). Cada ruta trae p50/p95/p99 y consultas por petición.
+    """
+    if request.method == "POST":
+        request_metrics.reset()
+    return JsonResponse(
+        {
+            "enabled": settings.REQUEST_METRICS_ENABLED,
+            "since": datetime.fromtimestamp(request_metrics.started_at, tz=dt_timezone.utc),
+            "routes": request_metrics.snapshot(),
+        }
+    )
+
+
+@user_passes_test(lambda u: u.is_superuser)
+@require_http_methods(["GET"])
+def profile_list_view(request):
+    """Perfiles guardados (``core.profiling``) y token para perfilar peticiones de la API."""
+    profiles = list_profiles()
+    for profile in profiles:
+        profile["created_at"] = datetime.fromtimestamp(profile["created_at"], tz=dt_timezone.utc)
+    return render(
+        request,
+        "admin/profiles.html",
+        {
+            "profiles": profiles,
+            "token": profile_token(request.user),
+            "token_minutes": TOKEN_MAX_AGE // 60,
+            "title": "Perfiles de rendimiento",
+            "site_header": "Administración de SIGMA",
+            "has_permission": True,
+        },
+    )
+
+
+@user_passes_test(lambda u: u.is_superuser)
+@require_http_methods(["GET"])
+def profile_download_view(request, name):
+    """Descarga un perfil; ``?format=text`` muestra el resumen de pstats de un ``.prof``."""
+    path = profile_path(name)
+    if path is None:
+        raise Http404("Perfil no encontrado.")
+    if request.GET.get("format") == "text" and path.suffix == ".prof":
+        import pstats
+
+        out = StringIO()
+        pstats.Stats(str(path), stream=out).sort_stats("cumulative").print_stats(60)
+        return HttpResponse(out.getvalue(), content_type="text/plain; charset=utf-8")
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=path.name)
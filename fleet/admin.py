@@ -1,21 +1,13 @@
 """Admin de Vehículos con inline de repuestos por vehículo."""
 from django import forms
 from django.contrib import admin
-from django.db.models import Q
 from django.urls import path
 from django.http import JsonResponse, HttpRequest
 
+from core import autocomplete
 from .models import Vehicle
-from workorders.models import WorkOrder
 from inventory.models import SpareCategory, SpareItem, VehicleSpare
 
-IN_WORKSHOP_STATUSES = [
-    WorkOrder.OrderStatus.IN_PROGRESS,
-    WorkOrder.OrderStatus.WAITING_PART,
-    WorkOrder.OrderStatus.IN_ROAD_TEST,
-]
-
-
 class EnTallerFilter(admin.SimpleListFilter):
     title = "¿Vehículo en taller?"
     parameter_name = "in_workshop"
@@ -24,18 +16,11 @@ class EnTallerFilter(admin.SimpleListFilter):
         return (("yes", "Sí"), ("no", "No"))
 
     def queryset(self, request, qs):
+        # Campo mantenido por workorders.workshop: sin join con las OTs
         if self.value() == "yes":
-            return qs.filter(
-                workorder__check_in_at__isnull=False,
-                workorder__status__in=IN_WORKSHOP_STATUSES,
-            ).distinct()
+            return qs.filter(in_workshop_since__isnull=False)
         if self.value() == "no":
-            return qs.exclude(
-                Q(
-                    workorder__check_in_at__isnull=False,
-                    workorder__status__in=IN_WORKSHOP_STATUSES,
-                )
-            ).distinct()
+            return qs.filter(in_workshop_since__isnull=True)
         return qs
 
 
@@ -120,11 +105,17 @@ class VehicleAdmin(admin.ModelAdmin):
         return custom + urls
 
     def spare_items_view(self, request: HttpRequest):
-        cat_id = request.GET.get("category")
-        qs = SpareItem.objects.all()
-        if cat_id:
-            qs = qs.filter(Q(category_id=cat_id))
-        data = [{"id": it.pk, "text": it.name} for it in qs.order_by("name")[:500]]
+        try:
+            data = autocomplete.search(
+                "spare-items",
+                term=request.GET.get("q", ""),
+                filters={"category": request.GET.get("category")},
+                limit=autocomplete.MAX_LIMIT,
+                # Un ítem recién creado debe aparecer de inmediato
+                use_cache=False,
+            )
+        except ValueError:
+            data = []
         return JsonResponse(data, safe=False)
 
     # helpers
@@ -139,10 +130,7 @@ class VehicleAdmin(admin.ModelAdmin):
     usuario_gestor_asignado.short_description = "Usuario / Gestor"
 
     def en_taller(self, obj: Vehicle) -> bool:
-        return WorkOrder.objects.filter(
-            vehicle=obj,
-            check_in_at__isnull=False,
-            status__in=IN_WORKSHOP_STATUSES,
-        ).exists()
+        return obj.in_workshop_since is not None
     en_taller.boolean = True
     en_taller.short_description = "En taller"
+    en_taller.admin_order_field = "in_workshop_since"
@@ -0,0 +1,54 @@
+import re
+
+from django.db import migrations, models
+
+_NOT_ALNUM = re.compile(r"[^0-9A-Z]")
+
+
+def backfill_plate_normalized(apps, schema_editor):
+    Vehicle = apps.get_model("fleet", "Vehicle")
+    by_key = {}
+    vehicles = list(Vehicle.objects.only("id", "plate"))
+    for vehicle in vehicles:
+        key = _NOT_ALNUM.sub("", (vehicle.plate or "").upper())
+        by_key.setdefault(key, []).append(vehicle)
+        vehicle.plate_normalized = key
+    conflicts = {
+        key: group for key, group in by_key.items() if not key or len(group) > 1
+    }
+    if conflicts:
+        # Un marcador dejaría vehículos que no se pueden volver a guardar: el
+        # operador debe corregir las placas antes de migrar
+        lines = [
+            "%s: %s" % (
+                key or "(sin letras ni dígitos)",
+                ", ".join(f"{v.plate!r} (id {v.pk})" for v in group),
+            )
+            for key, group in sorted(conflicts.items())
+        ]
+        raise RuntimeError(
+            "Placas que comparten la misma clave normalizada; corríjalas y "
+            "vuelva a ejecutar la migración:\n  " + "\n  ".join(lines)
+        )
+    Vehicle.objects.bulk_update(vehicles, ["plate_normalized"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0008_alter_vehicle_vehicle_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehicle',
+            name='plate_normalized',
+            field=models.CharField(editable=False, max_length=10, null=True, verbose_name='Placa normalizada'),
+        ),
+        migrations.RunPython(backfill_plate_normalized, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='vehicle',
+            name='plate_normalized',
+            field=models.CharField(editable=False, help_text='Solo letras y dígitos; clave de búsqueda de los importadores.', max_length=10, unique=True, verbose_name='Placa normalizada'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 12:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0009_vehicle_plate_normalized'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehicle',
+            name='odometer_read_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='Fecha de la lectura que fijó el kilometraje actual (ver fleet.odometer).', null=True, verbose_name='Fecha de la Lectura del Odómetro'),
+        ),
+    ]
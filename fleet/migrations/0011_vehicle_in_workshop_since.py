@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-17 13:20
+
+from django.db import migrations, models
+from django.db.models import Min, OuterRef, Subquery
+
+IN_WORKSHOP_STATUSES = ("IN_PROGRESS", "WAITING_PART", "IN_ROAD_TEST")
+
+
+def backfill(apps, schema_editor):
+    """Ingreso más antiguo de las OTs abiertas en taller (ver workorders.workshop)."""
+    Vehicle = apps.get_model("fleet", "Vehicle")
+    WorkOrder = apps.get_model("workorders", "WorkOrder")
+    since = (
+        WorkOrder.objects.filter(
+            vehicle_id=OuterRef("pk"),
+            status__in=IN_WORKSHOP_STATUSES,
+            check_in_at__isnull=False,
+        )
+        .order_by()
+        .values("vehicle_id")
+        .annotate(since=Min("check_in_at"))
+        .values("since")
+    )
+    Vehicle.objects.update(in_workshop_since=Subquery(since))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0010_vehicle_odometer_read_at'),
+        ('workorders', '0014_workorder_open_schedule_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehicle',
+            name='in_workshop_since',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, help_text='Ingreso de la OT abierta más antigua en taller; vacío si no está en taller (ver workorders.workshop).', null=True, verbose_name='En Taller Desde'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
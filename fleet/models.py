@@ -1,7 +1,46 @@
 """Models for managing fleet vehicles and their zone history."""
 
+from django.core.exceptions import ValidationError
 from django.db import models
 from core.models import Zone
+from .plates import normalize_plate, plate_key
+
+
+class VehicleQuerySet(models.QuerySet):
+    # ``bulk_create``, ``bulk_update`` y ``update`` no llaman a ``save``: la
+    # placa se normaliza aquí para que ``plate_normalized`` no quede desfasada
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.plate = normalize_plate(obj.plate)
+            obj.plate_normalized = plate_key(obj.plate)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        fields = list(fields)
+        if "plate" in fields:
+            objs = list(objs)
+            for obj in objs:
+                obj.plate = normalize_plate(obj.plate)
+                obj.plate_normalized = plate_key(obj.plate)
+            if "plate_normalized" not in fields:
+                fields.append("plate_normalized")
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        # ``bulk_update`` llega aquí con ambas columnas ya calculadas
+        if "plate" in kwargs and "plate_normalized" not in kwargs:
+            plate = kwargs["plate"]
+            if hasattr(plate, "resolve_expression"):
+                raise ValueError(
+                    "Vehicle.plate no se puede actualizar con una expresión sin "
+                    "plate_normalized: la clave se calcula en Python."
+                )
+            kwargs["plate"] = normalize_plate(plate)
+            kwargs["plate_normalized"] = plate_key(kwargs["plate"])
+        return super().update(**kwargs)
+
 
 class Vehicle(models.Model):
     """Represents a fleet vehicle.
@@ -30,6 +69,13 @@ class Vehicle(models.Model):
 
     
     plate = models.CharField("Placa", max_length=10, unique=True)
+    plate_normalized = models.CharField(
+        "Placa normalizada",
+        max_length=10,
+        unique=True,
+        editable=False,
+        help_text="Solo letras y dígitos; clave de búsqueda de los importadores.",
+    )
     vin = models.CharField("VIN", max_length=17, unique=True, blank=True, null=True)
     brand = models.CharField("Marca", max_length=50)
     linea = models.CharField("Línea", max_length=50)
@@ -46,11 +92,57 @@ class Vehicle(models.Model):
     current_zone = models.ForeignKey(Zone, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="Zona Operativa Actual")
 
     current_odometer_km = models.PositiveIntegerField("Kilometraje Actual (km)", default=0, help_text="Última lectura válida del odómetro.")
+    odometer_read_at = models.DateTimeField(
+        "Fecha de la Lectura del Odómetro",
+        blank=True,
+        null=True,
+        editable=False,
+        help_text="Fecha de la lectura que fijó el kilometraje actual (ver fleet.odometer).",
+    )
+    in_workshop_since = models.DateTimeField(
+        "En Taller Desde",
+        blank=True,
+        null=True,
+        editable=False,
+        db_index=True,
+        help_text="Ingreso de la OT abierta más antigua en taller; vacío si no está en taller (ver workorders.workshop).",
+    )
     odometer_status = models.CharField("Estado del Odómetro", max_length=20, choices=OdometerStatus.choices, default=OdometerStatus.VALID)
     soat_due_date = models.DateField("Vencimiento SOAT", blank=True, null=True)
     rtm_due_date = models.DateField("Vencimiento RTM", blank=True, null=True)
     notes = models.TextField("Notas Adicionales", blank=True)
 
+    objects = VehicleQuerySet.as_manager()
+
+    @classmethod
+    def check_plate_available(cls, plate, exclude_pk=None) -> None:
+        """Rechaza placas cuya clave canónica (``plate_key``) ya tiene otro vehículo.
+
+        La usan ``validate_unique`` (formularios del admin) y
+        ``VehicleSerializer``; sin ella el choque solo aparece como
+        ``IntegrityError`` en ``plate_normalized`` al guardar.
+
+        Raises:
+            ValidationError: Si la placa choca con la de otro vehículo.
+        """
+        others = cls.objects.filter(plate_normalized=plate_key(plate))
+        if exclude_pk is not None:
+            others = others.exclude(pk=exclude_pk)
+        if others.exists():
+            raise ValidationError(
+                "Ya existe un vehículo con la placa '%(plate)s'.",
+                code="unique",
+                params={"plate": plate},
+            )
+
+    def validate_unique(self, exclude=None):
+        super().validate_unique(exclude=exclude)
+        if exclude is None or "plate" not in exclude:
+            try:
+                self.check_plate_available(self.plate, self.pk)
+            except ValidationError as e:
+                raise ValidationError({"plate": e.error_list})
+
     # --- NUEVA LÓGICA DE AUTOLIMPIEZA ---
     def save(self, *args, **kwargs):
         """Normalize the plate before saving.
@@ -60,7 +152,11 @@ class Vehicle(models.Model):
             **kwargs: Keyword arguments for ``Model.save``.
         """
         # Antes de guardar, limpiamos la placa
-        self.plate = self.plate.upper().strip().replace('-', '')
+        self.plate = normalize_plate(self.plate)
+        self.plate_normalized = plate_key(self.plate)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "plate" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "plate_normalized"}
         super().save(*args, **kwargs)  # Llamamos al método de guardado original
 
     def __str__(self):
@@ -0,0 +1,94 @@
+"""Avance monotónico del odómetro de los vehículos.
+
+:func:`advance_odometers` aplica un lote de lecturas ``(vehículo, km, fecha)``
+en una sola sentencia ``UPDATE``: cada vehículo toma el mayor entre su valor
+actual y la lectura, y la condición se evalúa dentro del propio ``UPDATE``.
+Dos importaciones concurrentes no pueden así retroceder ni pisar el
+odómetro (no hay lectura previa en Python), y solo se escriben las filas
+que realmente avanzan.
+
+- PostgreSQL: ``UPDATE ... FROM (VALUES ...) WHERE d.km > v.km RETURNING id``.
+- Otros motores (SQLite): ``CASE id WHEN ... END`` con ``RETURNING``.
+"""
+
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from django.db import connection, transaction
+
+from .models import Vehicle
+
+# Filas por sentencia (3 parámetros por fila)
+ADVANCE_BATCH_SIZE = 500
+
+
+def _collapse(readings) -> Dict[int, Tuple[int, Optional[object]]]:
+    """Lectura mayor por vehículo: ``{id: (km, fecha)}``."""
+    best: Dict[int, Tuple[int, Optional[object]]] = {}
+    for vehicle_id, km, read_at in readings:
+        if vehicle_id is None or km is None:
+            continue
+        km = int(km)
+        current = best.get(vehicle_id)
+        if current is None or km > current[0]:
+            best[vehicle_id] = (km, read_at)
+    return best
+
+
+def _postgresql_sql(table, n):
+    values = ", ".join(["(%s::bigint, %s::integer, %s::timestamptz)"] * n)
+    return (
+        f'UPDATE "{table}" AS v '
+        f"SET current_odometer_km = d.km, "
+        f"odometer_read_at = COALESCE(d.read_at, v.odometer_read_at) "
+        f"FROM (VALUES {values}) AS d(id, km, read_at) "
+        f"WHERE v.id = d.id AND d.km > v.current_odometer_km "
+        f"RETURNING v.id"
+    )
+
+
+def _generic_sql(table, n):
+    km_case = "CASE id " + " ".join(["WHEN %s THEN %s"] * n) + " END"
+    read_at_case = "CASE id " + " ".join(["WHEN %s THEN %s"] * n) + " END"
+    placeholders = ", ".join(["%s"] * n)
+    return (
+        f'UPDATE "{table}" '
+        f"SET current_odometer_km = {km_case}, "
+        f"odometer_read_at = COALESCE({read_at_case}, odometer_read_at) "
+        f"WHERE id IN ({placeholders}) AND current_odometer_km < {km_case} "
+        f"RETURNING id"
+    )
+
+
+def advance_odometers(readings: Iterable[Tuple[int, int, Optional[object]]]) -> Set[int]:
+    """Avanza ``current_odometer_km`` con un lote de lecturas.
+
+    Args:
+        readings: Tuplas ``(vehicle_id, km, fecha_lectura)``; la fecha puede
+            ser ``None``. Varias lecturas del mismo vehículo se reducen a la
+            mayor.
+
+    Returns:
+        set[int]: IDs de los vehículos cuyo odómetro avanzó.
+    """
+    best = _collapse(readings)
+    if not best:
+        return set()
+
+    table = Vehicle._meta.db_table
+    adapt = connection.ops.adapt_datetimefield_value
+    items = list(best.items())
+    advanced: Set[int] = set()
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(items), ADVANCE_BATCH_SIZE):
+            chunk = items[start:start + ADVANCE_BATCH_SIZE]
+            if connection.vendor == "postgresql":
+                sql = _postgresql_sql(table, len(chunk))
+                params = [p for vid, (km, at) in chunk for p in (vid, km, adapt(at))]
+            else:
+                sql = _generic_sql(table, len(chunk))
+                km_params = [p for vid, (km, _) in chunk for p in (vid, km)]
+                at_params = [p for vid, (_, at) in chunk for p in (vid, adapt(at))]
+                params = km_params + at_params + [vid for vid, _ in chunk] + km_params
+            cursor.execute(sql, params)
+            advanced.update(row[0] for row in cursor.fetchall())
+    return advanced
@@ -0,0 +1,64 @@
+"""Utilidades para placas de vehículos."""
+
+import re
+from typing import Dict, Iterable, Tuple
+
+# Lote de placas por consulta ``IN`` (muy por debajo del límite de
+# parámetros de SQLite y de lo razonable para PostgreSQL)
+RESOLVE_CHUNK_SIZE = 2000
+
+_NOT_ALNUM = re.compile(r"[^0-9A-Z]")
+
+
+def normalize_plate(value) -> str:
+    """Normaliza una placa tal como la guarda ``Vehicle.save``.
+
+    Convierte a mayúsculas, elimina espacios en los extremos y guiones.
+    """
+    return str(value).upper().strip().replace("-", "")
+
+
+def plate_key(value) -> str:
+    """Forma canónica de una placa para búsquedas (``Vehicle.plate_normalized``).
+
+    Solo letras y dígitos en mayúsculas: ``"abc-123"``, ``" ABC 123"`` y
+    ``"ABC.123"`` comparten la clave ``"ABC123"``.
+    """
+    if value is None:
+        return ""
+    return _NOT_ALNUM.sub("", str(value).upper())
+
+
+def vehicle_rows_by_plate(plates: Iterable, *fields: str) -> Dict[object, Tuple]:
+    """Resuelve placas crudas a filas de vehículo con una consulta ``IN`` por lote.
+
+    Args:
+        plates: Placas tal como vienen del archivo o la petición.
+        *fields: Columnas adicionales de ``Vehicle`` a traer.
+
+    Returns:
+        dict: ``{placa_cruda: (id, *fields)}``; las placas sin vehículo se omiten.
+    """
+    from .models import Vehicle
+
+    by_key: Dict[str, list] = {}
+    for raw in plates:
+        key = plate_key(raw)
+        if key:
+            by_key.setdefault(key, []).append(raw)
+    keys = list(by_key)
+
+    resolved = {}
+    for start in range(0, len(keys), RESOLVE_CHUNK_SIZE):
+        rows = Vehicle.objects.filter(
+            plate_normalized__in=keys[start:start + RESOLVE_CHUNK_SIZE]
+        ).values_list("plate_normalized", "id", *fields)
+        for key, *values in rows:
+            for raw in by_key[key]:
+                resolved[raw] = tuple(values)
+    return resolved
+
+
+def resolve_plates(plates: Iterable) -> Dict[object, int]:
+    """``{placa_cruda: vehicle_id}`` para las placas que existen."""
+    return {raw: row[0] for raw, row in vehicle_rows_by_plate(plates).items()}
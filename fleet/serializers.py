@@ -8,6 +8,11 @@ class VehicleSerializer(serializers.ModelSerializer):
     """Serializer for :class:`~fleet.models.Vehicle`."""
     vehicle_type = serializers.ChoiceField(choices=Vehicle.VehicleType.choices)
 
+    def validate_plate(self, value: str) -> str:
+        """Reject plates that collide with another vehicle's canonical key."""
+        Vehicle.check_plate_available(value, getattr(self.instance, "pk", None))
+        return value
+
     def validate_vehicle_type(self, value: str) -> str:
         """Ensure ``vehicle_type`` matches the allowed choices.
 
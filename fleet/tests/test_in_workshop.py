@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from fleet.models import Vehicle
+from workorders.models import WorkOrder
+from workorders.workshop import refresh_in_workshop
+
+
+def make_vehicle(plate):
+    return Vehicle.objects.create(
+        plate=plate,
+        brand="Brand",
+        linea="Line",
+        modelo=2020,
+        vehicle_type=Vehicle.VehicleType.AUTOMOVIL,
+    )
+
+
+class InWorkshopSinceTests(TestCase):
+    def setUp(self):
+        self.vehicle = make_vehicle("TAL001")
+        self.other = make_vehicle("TAL002")
+        self.now = timezone.now().replace(microsecond=0)
+
+    def since(self, vehicle):
+        vehicle.refresh_from_db()
+        return vehicle.in_workshop_since
+
+    def test_status_transitions_maintain_the_field(self):
+        first = WorkOrder.objects.create(vehicle=self.vehicle, description="OT 1")
+        self.assertIsNone(self.since(self.vehicle))
+
+        first.status = WorkOrder.OrderStatus.IN_PROGRESS
+        first.check_in_at = self.now
+        first.save()
+        self.assertEqual(self.since(self.vehicle), self.now)
+
+        earlier = self.now - timedelta(days=2)
+        second = WorkOrder.objects.create(
+            vehicle=self.vehicle,
+            description="OT 2",
+            status=WorkOrder.OrderStatus.WAITING_PART,
+            check_in_at=earlier,
+        )
+        self.assertEqual(self.since(self.vehicle), earlier)
+
+        second.status = WorkOrder.OrderStatus.COMPLETED
+        second.save(update_fields=["status"])
+        self.assertEqual(self.since(self.vehicle), self.now)
+
+        # Cambio de vehículo: se recalculan ambos
+        first.vehicle = self.other
+        first.save()
+        self.assertIsNone(self.since(self.vehicle))
+        self.assertEqual(self.since(self.other), self.now)
+
+        first.delete()
+        self.assertIsNone(self.since(self.other))
+
+    def test_refresh_after_bulk_writes(self):
+        WorkOrder.objects.bulk_create(
+            [
+                WorkOrder(
+                    vehicle=self.vehicle,
+                    description="OT",
+                    status=WorkOrder.OrderStatus.IN_ROAD_TEST,
+                    check_in_at=self.now,
+                )
+            ]
+        )
+        self.assertIsNone(self.since(self.vehicle))
+        with self.assertNumQueries(1):
+            refresh_in_workshop([self.vehicle.pk, self.other.pk])
+        self.assertEqual(self.since(self.vehicle), self.now)
+        self.assertIsNone(self.since(self.other))
+
+
+class VehicleChangelistTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.admin = User.objects.create_superuser("root", "root@example.com", "pass")
+        self.client.force_login(self.admin)
+        self.url = reverse("admin:fleet_vehicle_changelist")
+
+    def changelist_queries(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_rows_and_filter_uses_field(self):
+        shop = make_vehicle("TAL100")
+        WorkOrder.objects.create(
+            vehicle=shop,
+            description="OT",
+            status=WorkOrder.OrderStatus.IN_PROGRESS,
+            check_in_at=timezone.now(),
+        )
+        _, few = self.changelist_queries()
+        for i in range(10):
+            make_vehicle(f"TAL2{i:02d}")
+        _, many = self.changelist_queries()
+        self.assertEqual(few, many)
+
+        response, _ = self.changelist_queries(in_workshop="yes")
+        self.assertEqual([v.plate for v in response.context["cl"].result_list], ["TAL100"])
+        response, _ = self.changelist_queries(in_workshop="no")
+        self.assertEqual(response.context["cl"].result_count, 10)
+
+        index = self.client.get(reverse("admin:index"))
+        self.assertEqual(index.context["in_workshop_count"], 1)
@@ -0,0 +1,53 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.test import TestCase
+
+from fleet.models import Vehicle
+from fleet.odometer import advance_odometers
+
+
+class AdvanceOdometersTests(TestCase):
+    def setUp(self):
+        self.vehicles = [
+            Vehicle.objects.create(
+                plate=f"ODO{i}",
+                brand="Brand",
+                linea="Line",
+                modelo=2020,
+                vehicle_type=Vehicle.VehicleType.AUTOMOVIL,
+                current_odometer_km=1000,
+            )
+            for i in range(3)
+        ]
+        self.read_at = datetime(2025, 5, 1, 8, 0, tzinfo=dt_timezone.utc)
+
+    def km(self, vehicle):
+        vehicle.refresh_from_db()
+        return vehicle.current_odometer_km
+
+    def test_only_forward_readings_are_applied(self):
+        a, b, c = self.vehicles
+        advanced = advance_odometers(
+            [
+                (a.pk, 1500, self.read_at),
+                (a.pk, 1200, None),  # menor que otra lectura del lote
+                (b.pk, 900, self.read_at),  # retrocede: se ignora
+                (c.pk, 1000, self.read_at),  # igual: no avanza
+            ]
+        )
+        self.assertEqual(advanced, {a.pk})
+        self.assertEqual([self.km(v) for v in self.vehicles], [1500, 1000, 1000])
+        self.assertEqual(a.odometer_read_at, self.read_at)
+        self.assertIsNone(b.odometer_read_at)
+
+    def test_single_statement_and_keeps_read_at_without_timestamp(self):
+        a = self.vehicles[0]
+        advance_odometers([(a.pk, 1100, self.read_at)])
+        with self.assertNumQueries(3):  # SAVEPOINT + UPDATE ... RETURNING + RELEASE
+            self.assertEqual(advance_odometers([(a.pk, 1200, None)]), {a.pk})
+        a.refresh_from_db()
+        self.assertEqual((a.current_odometer_km, a.odometer_read_at), (1200, self.read_at))
+
+    def test_empty_batch(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(advance_odometers([]), set())
@@ -0,0 +1,141 @@
+from django.db.models import F
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from fleet.models import Vehicle
+from fleet.plates import plate_key, resolve_plates, vehicle_rows_by_plate
+
+
+def make_vehicle(plate, **extra):
+    return Vehicle.objects.create(
+        plate=plate,
+        brand="Brand",
+        linea="Line",
+        modelo=2020,
+        vehicle_type=Vehicle.VehicleType.AUTOMOVIL,
+        **extra,
+    )
+
+
+class PlateKeyTests(TestCase):
+    def test_only_letters_and_digits(self):
+        for raw in ("abc-123", " ABC 123 ", "ABC.123", "ABC123"):
+            self.assertEqual(plate_key(raw), "ABC123")
+        self.assertEqual(plate_key(None), "")
+
+    def test_save_and_bulk_create_fill_the_key(self):
+        self.assertEqual(make_vehicle("abc-123").plate_normalized, "ABC123")
+        Vehicle.objects.bulk_create(
+            [Vehicle(plate="xyz 9", brand="B", linea="L", modelo=2020,
+                     vehicle_type=Vehicle.VehicleType.BUS)]
+        )
+        self.assertTrue(Vehicle.objects.filter(plate_normalized="XYZ9").exists())
+
+    def test_update_and_bulk_update_keep_the_key_in_sync(self):
+        vehicle = make_vehicle("AAA111")
+        Vehicle.objects.filter(pk=vehicle.pk).update(plate="bbb-222")
+        vehicle.refresh_from_db()
+        self.assertEqual((vehicle.plate, vehicle.plate_normalized), ("BBB222", "BBB222"))
+        self.assertEqual(vehicle_rows_by_plate(["BBB 222"]), {"BBB 222": (vehicle.pk,)})
+
+        vehicle.plate = "ccc 333"
+        Vehicle.objects.bulk_update([vehicle], ["plate"])
+        vehicle.refresh_from_db()
+        self.assertEqual(vehicle.plate_normalized, "CCC333")
+        self.assertIn("CCC-333", vehicle_rows_by_plate(["CCC-333"]))
+
+        with self.assertRaises(ValueError):
+            Vehicle.objects.filter(pk=vehicle.pk).update(plate=F("vin"))
+
+
+class ResolvePlatesTests(TestCase):
+    def setUp(self):
+        self.a = make_vehicle("AAA111", current_odometer_km=500)
+        self.b = make_vehicle("BBB222")
+
+    def test_resolves_every_spelling_in_one_query(self):
+        with self.assertNumQueries(1):
+            resolved = resolve_plates(["aaa-111", "AAA111", "bbb 222", "ZZZ000", "", None])
+        self.assertEqual(
+            resolved, {"aaa-111": self.a.pk, "AAA111": self.a.pk, "bbb 222": self.b.pk}
+        )
+
+    def test_extra_fields(self):
+        rows = vehicle_rows_by_plate(["aaa111"], "current_odometer_km")
+        self.assertEqual(rows, {"aaa111": (self.a.pk, 500)})
+
+    def test_api_exact_lookup_and_collision(self):
+        client = APIClient()
+        data = client.get(reverse("vehicle-list"), {"plate": "aaa-111"}).json()
+        self.assertEqual([v["id"] for v in data["results"]], [self.a.pk])
+
+        response = client.post(
+            reverse("vehicle-list"),
+            {"plate": "AAA 111", "brand": "B", "linea": "L", "modelo": 2020,
+             "vehicle_type": Vehicle.VehicleType.BUS},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("plate", response.data)
+
+
+class PlateCollisionValidationTests(TestCase):
+    def setUp(self):
+        from django.contrib.auth import get_user_model
+
+        self.existing = make_vehicle("ZZ999")
+        admin_user = get_user_model().objects.create_superuser("admin", "a@example.com", "pass")
+        self.client.force_login(admin_user)
+
+    def test_full_clean_rejects_canonical_collision(self):
+        from django.core.exceptions import ValidationError
+
+        vehicle = Vehicle(plate="ZZ 999", brand="B", linea="L", modelo=2020,
+                          vehicle_type=Vehicle.VehicleType.BUS)
+        with self.assertRaises(ValidationError) as ctx:
+            vehicle.full_clean()
+        self.assertIn("plate", ctx.exception.message_dict)
+        # Editar el propio vehículo no choca consigo mismo
+        self.existing.full_clean()
+
+    def test_admin_add_shows_form_error_instead_of_500(self):
+        url = reverse("admin:fleet_vehicle_add")
+        page = self.client.get(url)
+        data = {
+            "plate": "ZZ 999", "brand": "B", "linea": "L", "modelo": 2020,
+            "vehicle_type": Vehicle.VehicleType.BUS,
+            "fuel_type": Vehicle.FuelType.DIESEL,
+            "status": Vehicle.VehicleStatus.ACTIVE,
+            "current_odometer_km": 0,
+            "odometer_status": Vehicle.OdometerStatus.VALID,
+        }
+        for formset in page.context["inline_admin_formsets"]:
+            management = formset.formset.management_form
+            for name, field in management.fields.items():
+                data[management.add_prefix(name)] = management.initial.get(name, field.initial)
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context["adminform"].form.errors), ["plate"])
+        self.assertEqual(Vehicle.objects.count(), 1)
+
+
+class PlateBackfillMigrationTests(TestCase):
+    def test_backfill_lists_conflicting_plates(self):
+        import importlib
+        from types import SimpleNamespace
+        from unittest import mock
+
+        migration = importlib.import_module("fleet.migrations.0009_vehicle_plate_normalized")
+        legacy = [
+            SimpleNamespace(pk=1, plate="ABC-123"),
+            SimpleNamespace(pk=2, plate="ABC123"),
+            SimpleNamespace(pk=3, plate="XYZ9"),
+        ]
+        model = mock.Mock()
+        model.objects.only.return_value = legacy
+        apps = mock.Mock(get_model=mock.Mock(return_value=model))
+
+        with self.assertRaisesRegex(RuntimeError, r"ABC123: 'ABC-123' \(id 1\), 'ABC123' \(id 2\)"):
+            migration.backfill_plate_normalized(apps, None)
+        model.objects.bulk_update.assert_not_called()
@@ -3,17 +3,31 @@
 from rest_framework import viewsets, status, filters
 from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError
+
+from core.pagination import KeysetPagination
+from core.query_plan import QueryPlanMixin
 from .models import Vehicle
+from .plates import plate_key
 from .serializers import VehicleSerializer
 
 
-class VehicleViewSet(viewsets.ModelViewSet):
+class VehicleViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     """API endpoint for viewing and editing vehicles."""
 
     queryset = Vehicle.objects.all()
     serializer_class = VehicleSerializer
     filter_backends = [filters.SearchFilter]
     search_fields = ["plate", "vin", "brand", "linea"]
+    pagination_class = KeysetPagination
+    keyset_orderings = ("plate", "-plate", "-id", "id")
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        plate = self.request.query_params.get("plate")
+        if plate is not None:
+            # ``?plate=abc-123`` -> búsqueda exacta por la clave canónica indexada
+            queryset = queryset.filter(plate_normalized=plate_key(plate))
+        return queryset
 
     def _handle_request(self, request, partial=False, instance=None):
         serializer = self.get_serializer(
@@ -47,7 +61,10 @@ from django.contrib.admin.views.decorators import staff_member_required
 
 @staff_member_required
 def vehicles_in_repair_view(request):
-    """Lista de vehículos con estado 'IN_REPAIR'."""
+    """Vehículos en taller (``in_workshop_since``) o marcados 'IN_REPAIR'."""
+    from django.db.models import F, Q
     from .models import Vehicle
-    vehicles = Vehicle.objects.filter(status="IN_REPAIR").order_by("plate")
+    vehicles = Vehicle.objects.filter(
+        Q(in_workshop_since__isnull=False) | Q(status=Vehicle.VehicleStatus.IN_REPAIR)
+    ).order_by(F("in_workshop_since").asc(nulls_last=True), "plate")
     return render(request, "fleet/vehicles_in_repair.html", {"vehicles": vehicles, "title": "Vehículos en Taller"})
@@ -1,18 +1,23 @@
 """Viewsets for the inventory application."""
 
 from rest_framework import viewsets
+
+from core.pagination import KeysetPagination
+from core.query_plan import QueryPlanMixin
 from .models import Part, Supplier
 from .serializers import PartSerializer, SupplierSerializer
 
 
-class PartViewSet(viewsets.ModelViewSet):
+class PartViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     """API endpoint for parts."""
 
     queryset = Part.objects.all()
     serializer_class = PartSerializer
+    pagination_class = KeysetPagination
+    keyset_orderings = ("sku", "-sku", "-id", "id")
 
 
-class SupplierViewSet(viewsets.ModelViewSet):
+class SupplierViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     """API endpoint for suppliers."""
 
     queryset = Supplier.objects.all()
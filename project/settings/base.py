@@ -21,6 +21,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -28,6 +29,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -91,3 +93,22 @@ LOGGING = {
 }
 
 WORKORDER_INTERNAL_RATE = 50000
+
+# Archivos subidos que esperan al worker de trabajos en segundo plano
+JOB_UPLOAD_DIR = os.environ.get('JOB_UPLOAD_DIR', os.path.join(BASE_DIR, 'var', 'uploads'))
+# Un trabajo RUNNING sin terminar tras este tiempo se da por perdido (core.jobs)
+JOB_STALE_SECONDS = int(os.environ.get('JOB_STALE_SECONDS', 3600))
+
+# Métricas por petición (core.middleware.RequestMetricsMiddleware), apagadas
+# salvo REQUEST_METRICS=true; sobre estos umbrales la petición se registra en
+# el logger core.slow_requests
+REQUEST_METRICS_ENABLED = os.environ.get('REQUEST_METRICS', 'false').lower() == 'true'
+SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', 1000))
+SLOW_REQUEST_QUERIES = int(os.environ.get('SLOW_REQUEST_QUERIES', 50))
+SLOW_REQUEST_DUPLICATES = int(os.environ.get('SLOW_REQUEST_DUPLICATES', 10))
+
+# Perfiles bajo demanda (core.profiling): se conservan los últimos PROFILE_KEEP.
+# PROFILER = 'cprofile' fuerza cProfile aunque pyinstrument esté instalado
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(BASE_DIR, 'var', 'profiles'))
+PROFILE_KEEP = int(os.environ.get('PROFILE_KEEP', 50))
+PROFILER = os.environ.get('PROFILER', 'auto')
@@ -8,42 +8,15 @@ from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 original_index = admin.site.index
 
 def custom_index(request, extra_context=None):
-    from django.utils import timezone
-    from workorders.models import WorkOrder
-
-    today = timezone.now()
-    in_shop_statuses = [
-        WorkOrder.OrderStatus.IN_PROGRESS,
-        WorkOrder.OrderStatus.WAITING_PART,
-        WorkOrder.OrderStatus.IN_ROAD_TEST,
-    ]
-
-    # Contamos los vehículos que ya ingresaron al taller
-    in_workshop_count = (
-        WorkOrder.objects.filter(
-            check_in_at__isnull=False,
-            check_in_at__lte=today,
-            status__in=in_shop_statuses,
-        )
-        .values("vehicle")
-        .distinct()
-        .count()
-    )
-
-    # Contamos los vehículos que tienen una programación a futuro
-    scheduled_count = WorkOrder.objects.filter(
-        status=WorkOrder.OrderStatus.SCHEDULED,
-        scheduled_start__isnull=False,
-        scheduled_start__gt=today
-    ).values('vehicle').distinct().count()
+    # Indicadores en caché, invalidados por señales (ver core.dashboard)
+    from core.dashboard import get_metrics
 
     if extra_context is None:
         extra_context = {}
-    
+
     # Pasamos los contadores a la plantilla
-    extra_context['in_workshop_count'] = in_workshop_count
-    extra_context['scheduled_count'] = scheduled_count
-    
+    extra_context.update(get_metrics())
+
     return original_index(request, extra_context)
 
 admin.site.index = custom_index
@@ -65,6 +38,7 @@ urlpatterns = [
     path('api/workorders/', include('workorders.urls')),
     path('api/inventory/', include('inventory.urls')),
     path('api/users/', include('users.urls')),
+    path('api/autocomplete/', include('core.autocomplete')),
     path('api/auth/login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 ]
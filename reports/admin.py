@@ -1,7 +1,7 @@
 """Admin configuration for reports."""
 
 from django.contrib import admin
-from .models import FuelUploadLog
+from .models import FuelImportWatermark, FuelUploadLog
 
 
 @admin.register(FuelUploadLog)
@@ -11,8 +11,17 @@ class FuelUploadLogAdmin(admin.ModelAdmin):
         "processed_at",
         "vehicles_updated",
         "rows_processed",
+        "rows_skipped",
+        "rows_late",
         "size_bytes",
     )
     search_fields = ("original_filename", "sha256")
     readonly_fields = ("processed_at",)
-    ordering = ("-processed_at",)
\ No newline at end of file
+    ordering = ("-processed_at",)
+
+
+@admin.register(FuelImportWatermark)
+class FuelImportWatermarkAdmin(admin.ModelAdmin):
+    list_display = ("source", "sheet_name", "last_row_at", "rows_imported", "updated_at")
+    search_fields = ("source",)
+    readonly_fields = ("last_row_at", "recent_rows", "day_counts", "rows_settled", "rows_imported", "updated_at")
@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fueluploadlog',
+            name='rows_skipped',
+            field=models.PositiveIntegerField(default=0, help_text='Filas omitidas por haberse importado en una carga anterior.'),
+        ),
+        migrations.CreateModel(
+            name='FuelImportWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(help_text='Nombre normalizado del archivo de origen.', max_length=255)),
+                ('sheet_name', models.CharField(default='TANQUEOS', max_length=100)),
+                ('last_row_at', models.DateTimeField(blank=True, help_text='FECHA más reciente importada desde esta fuente.', null=True)),
+                ('recent_rows', models.JSONField(blank=True, default=dict, help_text='Huella -> FECHA (ISO) de las filas dentro de la ventana de revisión.')),
+                ('rows_imported', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('source', 'sheet_name'), name='reports_watermark_source_sheet')],
+            },
+        ),
+    ]
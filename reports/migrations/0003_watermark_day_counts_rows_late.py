@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_fuelimportwatermark'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fueluploadlog',
+            name='rows_late',
+            field=models.PositiveIntegerField(default=0, help_text='Filas omitidas por tener FECHA anterior a la ventana de revisión.'),
+        ),
+        migrations.AddField(
+            model_name='fuelimportwatermark',
+            name='day_counts',
+            field=models.JSONField(blank=True, default=dict, help_text='Día (ISO) -> filas importadas con esa FECHA; detecta filas tardías fuera de la ventana.'),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_watermark_day_counts_rows_late'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fuelimportwatermark',
+            name='rows_settled',
+            field=models.PositiveIntegerField(default=0, help_text='Filas importadas con FECHA anterior a los días de day_counts.'),
+        ),
+    ]
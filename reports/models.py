@@ -31,6 +31,14 @@ class FuelUploadLog(models.Model):
         default=0,
         help_text="Cantidad de vehículos actualizados.",
     )
+    rows_skipped = models.PositiveIntegerField(
+        default=0,
+        help_text="Filas omitidas por haberse importado en una carga anterior.",
+    )
+    rows_late = models.PositiveIntegerField(
+        default=0,
+        help_text="Filas omitidas por tener FECHA anterior a la ventana de revisión.",
+    )
     processed_at = models.DateTimeField(
         auto_now_add=True,
         help_text="Fecha y hora de procesamiento.",
@@ -53,3 +61,48 @@ class FuelUploadLog(models.Model):
             f"{self.original_filename} (filas={self.rows_processed}, "
             f"act={self.vehicles_updated}) @ {self.processed_at:%Y-%m-%d %H:%M}"
         )
+
+
+class FuelImportWatermark(models.Model):
+    """Marca de agua por fuente (archivo + hoja) para importar solo filas nuevas.
+
+    Guarda la ``FECHA`` más reciente importada y las huellas de las filas de
+    los últimos días (ver ``core.incremental``): al re-subir el mismo libro
+    con filas agregadas solo se procesan las que no se habían visto.
+    """
+    source = models.CharField(
+        max_length=255,
+        help_text="Nombre normalizado del archivo de origen.",
+    )
+    sheet_name = models.CharField(max_length=100, default="TANQUEOS")
+    last_row_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="FECHA más reciente importada desde esta fuente.",
+    )
+    recent_rows = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Huella -> FECHA (ISO) de las filas dentro de la ventana de revisión.",
+    )
+    day_counts = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Día (ISO) -> filas importadas con esa FECHA; detecta filas tardías fuera de la ventana.",
+    )
+    rows_settled = models.PositiveIntegerField(
+        default=0,
+        help_text="Filas importadas con FECHA anterior a los días de day_counts.",
+    )
+    rows_imported = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source", "sheet_name"], name="reports_watermark_source_sheet"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.source} [{self.sheet_name}] hasta {self.last_row_at}"
@@ -0,0 +1,75 @@
+"""Respuestas de reportes en streaming.
+
+Los reportes se escriben fila por fila desde un generador: el primer byte
+sale en cuanto se produce el encabezado y la memoria no crece con el número
+de filas. La variante XLSX usa el modo ``write_only`` de openpyxl sobre un
+archivo temporal, que también mantiene la memoria acotada.
+"""
+
+import csv
+import tempfile
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+
+
+class Echo:
+    """Pseudo-buffer: ``csv.writer`` escribe y se retorna la línea tal cual."""
+
+    def write(self, value):
+        return value
+
+
+def dated_filename(prefix, extension):
+    """``<prefix>_<AAAA-MM-DD>.<extension>`` con la fecha local de hoy."""
+    return f"{prefix}_{timezone.localdate().strftime('%Y-%m-%d')}.{extension}"
+
+
+def csv_streaming_response(filename, header, rows):
+    """Respuesta CSV (UTF-8 con BOM, para Excel) generada a partir de ``rows``.
+
+    Args:
+        filename: Nombre del archivo adjunto.
+        header: Fila de encabezados.
+        rows: Iterable (idealmente perezoso) de filas.
+    """
+    writer = csv.writer(Echo())
+
+    def generate():
+        yield "\ufeff"
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(row)
+
+    return StreamingHttpResponse(
+        generate(),
+        content_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# Por encima de este tamaño el archivo temporal pasa de memoria a disco
+XLSX_SPOOL_BYTES = 8 * 1024 * 1024
+
+
+def xlsx_response(filename, header, rows, sheet_title="Reporte"):
+    """Respuesta XLSX escrita con openpyxl en modo ``write_only``.
+
+    Las filas se vuelcan a medida que se generan; el libro se entrega con
+    ``FileResponse`` desde un archivo temporal.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_title)
+    ws.append(header)
+    for row in rows:
+        ws.append(row)
+
+    buffer = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_BYTES)
+    wb.save(buffer)
+    buffer.seek(0)
+    return FileResponse(
+        buffer, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE
+    )
@@ -1,5 +1,144 @@
 """Tests for the reports application."""
 
+import csv
+from datetime import datetime, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from core.models import Zone
+from fleet.models import Vehicle
+from workorders import scheduling
+from workorders.models import MaintenanceManual, MaintenancePlan, ManualTask, WorkOrder
+
+
+def read_csv(response):
+    """Consume a streaming CSV response and return its rows (without the BOM)."""
+    body = b"".join(response.streaming_content).decode("utf-8").lstrip("\ufeff")
+    return list(csv.reader(StringIO(body)))
+
+
+class ReportTestMixin:
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser("admin", "a@a.com", "x")
+        self.client.force_login(self.user)
+
+    def _vehicle(self, plate, **kwargs):
+        return Vehicle.objects.create(
+            plate=plate,
+            brand="Brand",
+            linea="Line",
+            modelo=2020,
+            vehicle_type=Vehicle.VehicleType.AUTOMOVIL,
+            **kwargs,
+        )
+
+
+class VehicleCostsReportTests(ReportTestMixin, TestCase):
+    def _order(self, vehicle, internal, days_ago=0, status=WorkOrder.OrderStatus.COMPLETED):
+        return WorkOrder.objects.create(
+            vehicle=vehicle,
+            description="Trabajo",
+            status=status,
+            check_out_at=timezone.now() - timedelta(days=days_ago),
+            labor_cost_internal=internal,
+            parts_cost=10,
+        )
+
+    def test_totals_filters_and_constant_queries(self):
+        zone = Zone.objects.create(name="Norte")
+        a = self._vehicle("AAA111", current_zone=zone)
+        self._vehicle("BBB222")
+        self._order(a, 100)
+        self._order(a, 50, days_ago=70)
+        self._order(a, 999, status=WorkOrder.OrderStatus.IN_PROGRESS)
+        url = reverse("report_vehicle_costs")
+
+        with CaptureQueriesContext(connection) as ctx:
+            rows = read_csv(self.client.get(url))
+        self.assertEqual(rows[1][0], "AAA111")
+        self.assertEqual(Decimal(rows[1][-1]), Decimal("170"))
+        self.assertEqual(rows[2][0], "BBB222")
+        self.assertEqual(Decimal(rows[2][-1]), 0)
+
+        for i in range(10):
+            self._order(self._vehicle(f"CCC{i:03d}"), 5)
+        with CaptureQueriesContext(connection) as ctx_big:
+            self.assertEqual(len(read_csv(self.client.get(url))), 13)
+        self.assertEqual(len(ctx.captured_queries), len(ctx_big.captured_queries))
+
+        start = timezone.localdate().replace(day=1).isoformat()
+        rows = read_csv(self.client.get(url, {"zone": zone.pk, "start": start}))
+        self.assertEqual([r[0] for r in rows[1:]], ["AAA111"])
+        self.assertEqual(Decimal(rows[1][-1]), Decimal("110"))
+
+    def test_partial_months_count_only_days_in_range(self):
+        vehicle = self._vehicle("AAA111")
+        for day, internal in ((1, 1), (14, 2), (15, 4), (20, 8), (31, 16)):
+            order = self._order(vehicle, internal)
+            order.check_out_at = timezone.make_aware(datetime(2026, 7, day, 12))
+            order.save()
+        url = reverse("report_vehicle_costs")
+
+        def total(**params):
+            return Decimal(read_csv(self.client.get(url, params))[1][4])
+
+        self.assertEqual(total(start="2026-07-15"), 28)
+        self.assertEqual(total(end="2026-07-14"), 3)
+        self.assertEqual(total(start="2026-07-14", end="2026-07-20"), 14)
+        self.assertEqual(total(start="2026-07-01", end="2026-07-31"), 31)
+        self.assertEqual(total(start="2026-06-15", end="2026-08-15"), 31)
+
+    def test_invalid_date_is_rejected(self):
+        response = self.client.get(reverse("report_vehicle_costs"), {"start": "ayer"})
+        self.assertEqual(response.status_code, 400)
+
+
+class PreventiveComplianceReportTests(ReportTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.manual = MaintenanceManual.objects.create(name="Manual Diesel", fuel_type="DIESEL")
+        for km, desc in ((5000, "Aceite"), (10000, "Filtros"), (20000, "General")):
+            ManualTask.objects.create(manual=self.manual, km_interval=km, description=desc)
+        self.zone = Zone.objects.create(name="Sur")
+
+    def _plan(self, plate, current_km, last_service_km):
+        vehicle = self._vehicle(plate, current_zone=self.zone, current_odometer_km=current_km)
+        MaintenancePlan.objects.update_or_create(
+            vehicle=vehicle,
+            defaults={"manual": self.manual, "last_service_km": last_service_km, "is_active": True},
+        )
+        return vehicle
+
+    def test_next_milestone_and_constant_queries(self):
+        self._plan("AAA111", 15800, 6000)
+        url = reverse("report_preventive_compliance")
+        scheduling.invalidate()
+        with CaptureQueriesContext(connection) as ctx:
+            rows = read_csv(self.client.get(url))
+        self.assertEqual(
+            rows[1],
+            ["AAA111", "Sur", "15800", "Válido", "Manual Diesel", "6000", "16000", "Filtros", "200", "Próximo a Vencer"],
+        )
+
+        for i in range(10):
+            self._plan(f"BBB{i:03d}", 1000 * i, 0)
+        scheduling.invalidate()
+        with CaptureQueriesContext(connection) as ctx_big:
+            self.assertEqual(len(read_csv(self.client.get(url))), 12)
+        self.assertEqual(len(ctx.captured_queries), len(ctx_big.captured_queries))
 
-# Create your tests here.
+    def test_xlsx_variant(self):
+        self._plan("AAA111", 15800, 6000)
+        response = self.client.get(reverse("report_preventive_compliance_xlsx"))
+        wb = load_workbook(BytesIO(b"".join(response.streaming_content)), read_only=True)
+        rows = list(wb.active.iter_rows(values_only=True))
+        self.assertEqual(rows[0][0], "Placa")
+        self.assertEqual(rows[1][:3], ("AAA111", "Sur", 15800))
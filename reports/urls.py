@@ -11,4 +11,9 @@ urlpatterns = [
         views.preventive_compliance_report,
         name="report_preventive_compliance",
     ),
+    path(
+        "preventive-compliance/xlsx/",
+        views.preventive_compliance_report_xlsx,
+        name="report_preventive_compliance_xlsx",
+    ),
 ]
@@ -1,112 +1,245 @@
 """Views for generating reports."""
 
-import csv
-from django.http import HttpResponse
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.http import HttpResponseBadRequest
 from django.contrib.auth.decorators import user_passes_test
 from django.utils import timezone
-from django.db.models import Sum, F
+from django.utils.dateparse import parse_date
+from django.db.models import DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
 
 from fleet.models import Vehicle
-from workorders.models import WorkOrder, MaintenancePlan
+from workorders.models import MaintenancePlan, WorkOrder
+from workorders.scheduling import next_due
 
+from .streaming import csv_streaming_response, dated_filename, xlsx_response
 
-@user_passes_test(lambda u: u.is_superuser)
-def vehicle_costs_report(request):
-    """Generate a CSV with total costs per vehicle.
 
-    Args:
-        request (HttpRequest): The incoming request.
+REPORT_CHUNK_SIZE = 2000
+
+
+def _parse_date_param(request, name):
+    """Fecha ``AAAA-MM-DD`` del querystring; ``None`` si no viene.
+
+    Raises:
+        ValueError: Si el valor no es una fecha válida.
+    """
+    raw = request.GET.get(name, "").strip()
+    if not raw:
+        return None
+    value = parse_date(raw)
+    if value is None:
+        raise ValueError(f"Fecha inválida en '{name}': {raw}")
+    return value
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _month_after(day):
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def cost_periods(start, end):
+    """Divide el rango ``[start, end]`` (fechas inclusivas, opcionales).
 
     Returns:
-        HttpResponse: CSV file with cost information.
+        tuple: ``(meses, bordes)``. ``meses`` es ``(desde, hasta)`` con los
+        primeros días de los meses completos ``[desde, hasta)`` (``None`` en
+        un extremo abierto), o ``None`` si no hay meses completos. ``bordes``
+        lista los tramos de días sueltos ``[desde, hasta)``.
     """
+    first = None if start is None else (start if start.day == 1 else _month_after(start))
+    if end is None:
+        last = None
+    elif _month_after(end) - timedelta(days=1) == end:
+        last = _month_after(end)
+    else:
+        last = end.replace(day=1)
+    if first is not None and last is not None and first >= last:
+        return None, [(start, end + timedelta(days=1))]
+    edges = []
+    if start is not None and first > start:
+        edges.append((start, first))
+    if end is not None and last <= end:
+        edges.append((last, end + timedelta(days=1)))
+    return (first, last), edges
 
-    response = HttpResponse(
-        content_type="text/csv",
-        headers={
-            "Content-Disposition": f"attachment; filename=\"reporte_costos_vehiculos_{timezone.now().strftime('%Y-%m-%d')}.csv\""
-        },
-    )
-    response.write("\ufeff".encode("utf8"))
-    writer = csv.writer(response)
-    writer.writerow([
-        "Placa",
-        "Marca",
-        "Línea",
-        "Modelo",
-        "Costo Total MO Interna",
-        "Costo Total MO Terceros",
-        "Costo Total Repuestos",
-        "Costo Total General",
-    ])
-    vehicles = Vehicle.objects.all()
-    for vehicle in vehicles:
-        costs = WorkOrder.objects.filter(
-            vehicle=vehicle, status=WorkOrder.OrderStatus.COMPLETED
-        ).aggregate(
-            total_internal=Sum("labor_cost_internal"),
-            total_external=Sum("labor_cost_external"),
-            total_parts=Sum("parts_cost"),
-        )
-        cost_internal = costs["total_internal"] or 0
-        cost_external = costs["total_external"] or 0
-        cost_parts = costs["total_parts"] or 0
-        total_general = cost_internal + cost_external + cost_parts
-        writer.writerow(
-            [
-                vehicle.plate,
-                vehicle.brand,
-                vehicle.linea,
-                vehicle.modelo,
-                cost_internal,
-                cost_external,
-                cost_parts,
-                total_general,
-            ]
+
+def _edge_costs(vehicles, edges):
+    """Costos por vehículo de las OTs cerradas en los tramos de días sueltos."""
+    if not edges:
+        return {}
+    closed = Q()
+    for since, until in edges:
+        closed |= Q(closed_at__gte=_day_start(since), closed_at__lt=_day_start(until))
+    rows = (
+        WorkOrder.objects.filter(status=WorkOrder.OrderStatus.COMPLETED, vehicle__in=vehicles)
+        # La misma fecha de cierre que el libro (ver workorders.ledger)
+        .annotate(closed_at=Coalesce("check_out_at", "created_at"))
+        .filter(closed)
+        .order_by()
+        .values("vehicle_id")
+        .annotate(
+            internal=Sum("labor_cost_internal"),
+            external=Sum("labor_cost_external"),
+            parts=Sum("parts_cost"),
         )
-    return response
+        .values_list("vehicle_id", "internal", "external", "parts")
+    )
+    return {
+        vehicle_id: tuple(amount or Decimal("0") for amount in amounts)
+        for vehicle_id, *amounts in rows
+    }
 
 
-# --- NUEVO REPORTE ---
 @user_passes_test(lambda u: u.is_superuser)
-def preventive_compliance_report(request):
-    """Generate a CSV report of preventive maintenance compliance.
+def vehicle_costs_report(request):
+    """Generate a CSV with total costs per vehicle.
+
+    Los costos se leen del libro precalculado ``VehicleCostLedger`` (un
+    registro por vehículo, mes y tipo de OT), agrupados por vehículo en una
+    sola consulta, y el CSV se emite en streaming.
+
+    Filtros opcionales (querystring):
+        - ``start`` / ``end``: rango de fechas (``AAAA-MM-DD``, inclusivo)
+          sobre el cierre de la OT (``check_out_at`` o, si falta,
+          ``created_at``). Los meses completos del rango salen del libro; los
+          días sueltos de los meses de borde, de una consulta agrupada sobre
+          las OTs (:func:`cost_periods`).
+        - ``zone``: id de la zona operativa actual del vehículo.
 
     Args:
         request (HttpRequest): The incoming request.
 
     Returns:
-        HttpResponse: CSV file with compliance information.
+        StreamingHttpResponse: CSV file with cost information.
     """
+    try:
+        start = _parse_date_param(request, "start")
+        end = _parse_date_param(request, "end")
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    if start and end and end < start:
+        return HttpResponseBadRequest("Rango inválido: 'end' es anterior a 'start'.")
+    months, edges = cost_periods(start, end)
+
+    vehicles = Vehicle.objects.all()
+    zone = request.GET.get("zone", "").strip()
+    if zone:
+        if not zone.isdigit():
+            return HttpResponseBadRequest(f"Zona inválida: {zone}")
+        vehicles = vehicles.filter(current_zone_id=int(zone))
 
-    response = HttpResponse(
-        content_type="text/csv",
-        headers={
-            "Content-Disposition": f"attachment; filename=\"reporte_cumplimiento_preventivos_{timezone.now().strftime('%Y-%m-%d')}.csv\""
-        },
+    ledger_filter = Q()
+    if months is not None:
+        first, last = months
+        if first is not None:
+            ledger_filter &= Q(cost_ledger__month__gte=first)
+        if last is not None:
+            ledger_filter &= Q(cost_ledger__month__lt=last)
+
+    def total(field):
+        if months is None:
+            # Sin meses completos: todo sale de los bordes
+            return Value(Decimal("0"), output_field=DecimalField(max_digits=14, decimal_places=2))
+        return Coalesce(
+            Sum(f"cost_ledger__{field}", filter=ledger_filter),
+            Value(Decimal("0")),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        )
+
+    rows = (
+        vehicles.order_by("plate")
+        .values_list("id", "plate", "brand", "linea", "modelo")
+        .annotate(
+            total_internal=total("labor_cost_internal"),
+            total_external=total("labor_cost_external"),
+            total_parts=total("parts_cost"),
+        )
     )
-    response.write("\ufeff".encode("utf8"))
-    writer = csv.writer(response)
-    writer.writerow(
+    no_edge = (Decimal("0"),) * 3
+
+    def generate():
+        edge_costs = _edge_costs(vehicles, edges)
+        for vehicle_id, plate, brand, linea, modelo, internal, external, parts in rows.iterator(
+            chunk_size=REPORT_CHUNK_SIZE
+        ):
+            edge_internal, edge_external, edge_parts = edge_costs.get(vehicle_id, no_edge)
+            internal += edge_internal
+            external += edge_external
+            parts += edge_parts
+            yield [plate, brand, linea, modelo, internal, external, parts, internal + external + parts]
+
+    return csv_streaming_response(
+        dated_filename("reporte_costos_vehiculos", "csv"),
         [
             "Placa",
-            "Zona Actual",
-            "KM Actual",
-            "Estado Odómetro",
-            "Manual Asignado",
-            "KM Último Preventivo",
-            "Próximo Hito (KM)",
-            "Descripción Próxima Tarea",
-            "KM para Próximo Servicio",
-            "Estado de Cumplimiento",
-        ]
+            "Marca",
+            "Línea",
+            "Modelo",
+            "Costo Total MO Interna",
+            "Costo Total MO Terceros",
+            "Costo Total Repuestos",
+            "Costo Total General",
+        ],
+        generate(),
     )
 
-    active_plans = MaintenancePlan.objects.filter(is_active=True).select_related(
-        "vehicle", "manual"
+
+PREVENTIVE_COMPLIANCE_HEADER = [
+    "Placa",
+    "Zona Actual",
+    "KM Actual",
+    "Estado Odómetro",
+    "Manual Asignado",
+    "KM Último Preventivo",
+    "Próximo Hito (KM)",
+    "Descripción Próxima Tarea",
+    "KM para Próximo Servicio",
+    "Estado de Cumplimiento",
+]
+
+
+def _preventive_compliance_rows():
+    """Filas del reporte de cumplimiento (generador).
+
+    Los planes se leen con el vehículo, su zona y el manual en la misma
+    consulta y el próximo hito se calcula por bloques con
+    ``workorders.scheduling.next_due``.
+    """
+    active_plans = (
+        MaintenancePlan.objects.filter(is_active=True)
+        .select_related("vehicle__current_zone", "manual")
+        .only(
+            "last_service_km",
+            "manual__name",
+            "vehicle__plate",
+            "vehicle__current_odometer_km",
+            "vehicle__odometer_status",
+            "vehicle__current_zone__name",
+        )
+        .order_by("vehicle__plate")
     )
+    chunk = []
+    for plan in active_plans.iterator(chunk_size=REPORT_CHUNK_SIZE):
+        chunk.append(plan)
+        if len(chunk) >= REPORT_CHUNK_SIZE:
+            yield from _preventive_compliance_chunk(chunk)
+            chunk = []
+    if chunk:
+        yield from _preventive_compliance_chunk(chunk)
 
-    for plan in active_plans:
+
+def _preventive_compliance_chunk(plans):
+    schedule = next_due(
+        [(p.manual_id, p.last_service_km, p.vehicle.current_odometer_km) for p in plans]
+    )
+    for i, plan in enumerate(plans):
         vehicle = plan.vehicle
         status = "A Tiempo"
         next_due_km = "N/A"
@@ -114,18 +247,9 @@ def preventive_compliance_report(request):
         km_remaining = "N/A"
 
         if plan.manual and vehicle.odometer_status == "VALID":
-            km_since_last_service = (
-                vehicle.current_odometer_km - plan.last_service_km
-            )
-            next_task = (
-                plan.manual.tasks.filter(km_interval__gt=km_since_last_service)
-                .order_by("km_interval")
-                .first()
-            )
-            if next_task:
-                next_due_km = plan.last_service_km + next_task.km_interval
-                next_task_desc = next_task.description
-                km_remaining = next_due_km - vehicle.current_odometer_km
+            due_km, desc, remaining = schedule.row(i)
+            if due_km is not None:
+                next_due_km, next_task_desc, km_remaining = due_km, desc, remaining
                 if vehicle.current_odometer_km >= next_due_km:
                     status = "VENCIDO"
                 elif km_remaining <= 500:
@@ -135,20 +259,50 @@ def preventive_compliance_report(request):
         elif vehicle.odometer_status == "INVALID":
             status = "Odómetro Inválido"
 
-        writer.writerow(
-            [
-                vehicle.plate,
-                vehicle.current_zone.name if vehicle.current_zone else "Sin Zona",
-                vehicle.current_odometer_km,
-                vehicle.get_odometer_status_display(),
-                plan.manual.name if plan.manual else "Sin Manual",
-                plan.last_service_km,
-                next_due_km,
-                next_task_desc,
-                km_remaining,
-                status,
-            ]
-        )
+        yield [
+            vehicle.plate,
+            vehicle.current_zone.name if vehicle.current_zone else "Sin Zona",
+            vehicle.current_odometer_km,
+            vehicle.get_odometer_status_display(),
+            plan.manual.name if plan.manual else "Sin Manual",
+            plan.last_service_km,
+            next_due_km,
+            next_task_desc,
+            km_remaining,
+            status,
+        ]
 
-    return response
 
+@user_passes_test(lambda u: u.is_superuser)
+def preventive_compliance_report(request):
+    """Generate a CSV report of preventive maintenance compliance.
+
+    Args:
+        request (HttpRequest): The incoming request.
+
+    Returns:
+        StreamingHttpResponse: CSV file with compliance information.
+    """
+    return csv_streaming_response(
+        dated_filename("reporte_cumplimiento_preventivos", "csv"),
+        PREVENTIVE_COMPLIANCE_HEADER,
+        _preventive_compliance_rows(),
+    )
+
+
+@user_passes_test(lambda u: u.is_superuser)
+def preventive_compliance_report_xlsx(request):
+    """Same report as :func:`preventive_compliance_report`, as an Excel file.
+
+    Args:
+        request (HttpRequest): The incoming request.
+
+    Returns:
+        FileResponse: XLSX file with compliance information.
+    """
+    return xlsx_response(
+        dated_filename("reporte_cumplimiento_preventivos", "xlsx"),
+        PREVENTIVE_COMPLIANCE_HEADER,
+        _preventive_compliance_rows(),
+        sheet_title="Cumplimiento",
+    )
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 12:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_driver'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='driver',
+            name='full_name',
+            field=models.CharField(db_index=True, max_length=150, verbose_name='Nombre completo'),
+        ),
+    ]
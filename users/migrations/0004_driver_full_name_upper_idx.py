@@ -0,0 +1,32 @@
+from django.db import migrations
+
+INDEX = "users_driver_full_name_upper"
+
+
+def create_index(apps, schema_editor):
+    """Índice UPPER(full_name) text_pattern_ops para ``full_name__istartswith`` (solo PostgreSQL)."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    quote = schema_editor.quote_name
+    table = apps.get_model("users", "Driver")._meta.db_table
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {quote(INDEX)} ON {quote(table)} "
+        f"(UPPER({quote('full_name')}) text_pattern_ops)"
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {schema_editor.quote_name(INDEX)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_driver_full_name_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
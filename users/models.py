@@ -20,7 +20,7 @@ class UserProfile(models.Model):
 class Driver(models.Model):
     """Conductor usado para asignarlo en órdenes de trabajo."""
 
-    full_name = models.CharField("Nombre completo", max_length=150)
+    full_name = models.CharField("Nombre completo", max_length=150, db_index=True)
     document_number = models.CharField("Número de documento", max_length=50, unique=True)
     zone = models.CharField("Zona", max_length=100, blank=True, null=True)
     is_active = models.BooleanField("Activo", default=True)
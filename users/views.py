@@ -2,20 +2,26 @@
 
 from rest_framework import viewsets, filters
 
+from core.pagination import KeysetPagination
+from core.query_plan import QueryPlanMixin
+
 from .models import Driver, UserProfile
 from .serializers import DriverSerializer, UserProfileSerializer
 
 
-class DriverViewSet(viewsets.ModelViewSet):
+class DriverViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     """API endpoint for viewing and editing drivers."""
 
     queryset = Driver.objects.all()
     serializer_class = DriverSerializer
     filter_backends = [filters.SearchFilter]
     search_fields = ["full_name", "document_number"]
+    pagination_class = KeysetPagination
+    # Solo claves únicas: el cursor se posiciona por el primer campo
+    keyset_orderings = ("document_number", "-document_number", "-id", "id")
 
 
-class UserProfileViewSet(viewsets.ModelViewSet):
+class UserProfileViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     """API endpoint for viewing and editing user profiles."""
 
     queryset = UserProfile.objects.select_related("user")
@@ -5,11 +5,14 @@ from django.http import JsonResponse, HttpRequest
 from django.db.models import Q
 from typing import List
 
+from core import autocomplete
+
 from .models import (
     WorkOrder,
     WorkOrderNote,
     MaintenanceManual,
     ManualTask,
+    VehicleCostLedger,
     WorkOrderTask,
 )
 
@@ -134,15 +137,17 @@ class WorkOrderAdmin(admin.ModelAdmin):
     def subcategories_view(self, request: HttpRequest):
         if not MaintenanceSubcategory:
             return JsonResponse([], safe=False)
-        cat_id = request.GET.get("category")
-        qs = MaintenanceSubcategory.objects.all()
-        if cat_id:
-            try:
-                qs = qs.filter(Q(category_id=cat_id) | Q(categoria_id=cat_id))
-            except Exception:
-                qs = qs.filter(category_id=cat_id)
-        qs = qs.order_by("name" if hasattr(MaintenanceSubcategory, "name") else "id")
-        data = [{"id": obj.pk, "text": getattr(obj, "name", str(obj))} for obj in qs[:500]]
+        try:
+            data = autocomplete.search(
+                "subcategories",
+                term=request.GET.get("q", ""),
+                filters={"category": request.GET.get("category")},
+                limit=autocomplete.MAX_LIMIT,
+                # Un ítem recién creado debe aparecer de inmediato
+                use_cache=False,
+            )
+        except ValueError:
+            data = []
         return JsonResponse(data, safe=False)
 
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
@@ -187,3 +192,22 @@ class ManualTaskAdmin(admin.ModelAdmin):
     list_display = ("id", "manual", "km_interval", "description")
     list_filter = ("manual",)
     search_fields = ("description",)
+
+
+@admin.register(VehicleCostLedger)
+class VehicleCostLedgerAdmin(admin.ModelAdmin):
+    """Solo lectura: la tabla se mantiene sola (ver ``rebuild_cost_ledger``)."""
+
+    list_display = (
+        "vehicle", "month", "order_type", "order_count",
+        "labor_cost_internal", "labor_cost_external", "parts_cost",
+    )
+    list_filter = ("order_type", "month")
+    search_fields = ("vehicle__plate",)
+    list_select_related = ("vehicle",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
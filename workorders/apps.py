@@ -9,3 +9,6 @@ class WorkordersConfig(AppConfig):
         # Importa señales definidas en models (costos, activación plan) y las extra
         import workorders.models  # noqa
         import workorders.signals_extra  # noqa
+        import workorders.scheduling  # noqa  (invalidación de hitos en caché)
+        import workorders.ledger  # noqa  (libro de costos por vehículo)
+        import workorders.workshop  # noqa  (Vehicle.in_workshop_since)
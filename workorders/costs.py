@@ -0,0 +1,135 @@
+"""Recalculo diferido y agrupado de costos de órdenes de trabajo.
+
+Guardar o eliminar un ``WorkOrderTask``/``WorkOrderPart`` solo marca la OT
+como pendiente; los costos se recalculan una vez por OT en
+``transaction.on_commit`` con dos consultas agregadas agrupadas por OT y un
+``bulk_update``. Un formset de 30 filas, una importación o un lote del API
+disparan así una sola pasada por OT afectada.
+
+El ajuste del libro de costos por vehículo (``workorders.ledger``) se hace
+en la misma pasada.
+
+Para operaciones masivas, :func:`suspend_cost_recalculation` acumula las OTs
+afectadas y las recalcula al salir del bloque.
+"""
+
+import threading
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Q, Sum
+
+_state = threading.local()
+
+
+def _pending():
+    if not hasattr(_state, "pending"):
+        _state.pending = set()
+        _state.suspended = 0
+        _state.held = set()
+    return _state.pending
+
+
+def schedule_cost_recalculation(work_order_id) -> None:
+    """Marca una OT para recalcular costos al confirmar la transacción.
+
+    Fuera de un bloque atómico el recalculo es inmediato (igual que
+    ``transaction.on_commit``).
+    """
+    if work_order_id is None:
+        return
+    pending = _pending()
+    if _state.suspended:
+        _state.held.add(work_order_id)
+        return
+    pending.add(work_order_id)
+    # Se registra en cada llamada: si una transacción previa se revirtió, su
+    # callback se descartó; los callbacks sobrantes no hacen nada.
+    transaction.on_commit(flush_cost_recalculations)
+
+
+def flush_cost_recalculations() -> None:
+    """Recalcula ahora los costos de todas las OTs pendientes."""
+    pending = _pending()
+    if not pending:
+        return
+    ids = list(pending)
+    pending.clear()
+    recalculate_costs_bulk(ids)
+
+
+@contextmanager
+def suspend_cost_recalculation():
+    """Suspende el recalculo durante operaciones masivas.
+
+    Las OTs afectadas dentro del bloque se recalculan (una vez cada una) al
+    salir, en el ``on_commit`` de la transacción que envuelva el bloque.
+    """
+    _pending()
+    _state.suspended += 1
+    try:
+        yield
+    finally:
+        _state.suspended -= 1
+        if not _state.suspended:
+            held, _state.held = _state.held, set()
+            for work_order_id in held:
+                schedule_cost_recalculation(work_order_id)
+
+
+def recalculate_costs_bulk(work_order_ids) -> int:
+    """Recalcula los costos de varias OTs con dos agregados agrupados.
+
+    Returns:
+        int: Número de OTs actualizadas (las eliminadas se ignoran).
+    """
+    from .ledger import LEDGER_FIELDS, apply_changes, contribution
+    from .models import WorkOrder, WorkOrderPart, WorkOrderTask
+
+    ids = list(work_order_ids)
+    if not ids:
+        return 0
+    internal_rate = settings.WORKORDER_INTERNAL_RATE
+
+    labor = {
+        row["work_order_id"]: row
+        for row in WorkOrderTask.objects.filter(work_order_id__in=ids)
+        .values("work_order_id")
+        .annotate(
+            internal=Sum("hours_spent", filter=Q(is_external=False)),
+            external=Sum("labor_rate", filter=Q(is_external=True)),
+        )
+        .order_by()
+    }
+    parts = dict(
+        WorkOrderPart.objects.filter(work_order_id__in=ids)
+        .values("work_order_id")
+        .annotate(
+            total=Sum(
+                ExpressionWrapper(
+                    F("quantity") * F("cost_at_moment"), output_field=DecimalField()
+                )
+            )
+        )
+        .order_by()
+        .values_list("work_order_id", "total")
+    )
+
+    orders = list(WorkOrder.objects.filter(pk__in=ids).only(*LEDGER_FIELDS))
+    ledger_changes = []
+    for order in orders:
+        before = contribution(order)
+        row = labor.get(order.pk, {})
+        order.labor_cost_internal = (row.get("internal") or 0) * internal_rate
+        order.labor_cost_external = row.get("external") or Decimal("0")
+        order.parts_cost = parts.get(order.pk) or Decimal("0")
+        ledger_changes.append((before, contribution(order)))
+    with transaction.atomic():
+        WorkOrder.objects.bulk_update(
+            orders, ["labor_cost_internal", "labor_cost_external", "parts_cost"]
+        )
+        # bulk_update no emite señales: el libro de costos se ajusta aquí
+        apply_changes(ledger_changes)
+    return len(orders)
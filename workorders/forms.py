@@ -51,7 +51,7 @@ class WorkOrderUnifiedForm(forms.ModelForm):
             widget=forms.Select(
                 attrs={
                     "class": "select2-ajax",
-                    "data-url": reverse_lazy("driver-list"),
+                    "data-url": reverse_lazy("autocomplete", kwargs={"source": "drivers"}),
                 }
             ),
         )
@@ -100,7 +100,7 @@ class WorkOrderUnifiedForm(forms.ModelForm):
         ]
         widgets = {
             'vehicle': forms.Select(
-                attrs={'class': 'select2-ajax', 'data-url': reverse_lazy('vehicle-list')}
+                attrs={'class': 'select2-ajax', 'data-url': reverse_lazy('autocomplete', kwargs={'source': 'vehicles'})}
             ),
             'scheduled_start': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
             'scheduled_end': forms.DateTimeInput(attrs={'type': 'datetime-local'}),
@@ -245,7 +245,7 @@ TaskFormSet = inlineformset_factory(
             'class': 'select2-ajax', 'data-url': reverse_lazy('category-list')
         }),
         'subcategory': forms.Select(attrs={
-            'class': 'select2-ajax', 'data-url': reverse_lazy('subcategory-list')
+            'class': 'select2-ajax', 'data-url': reverse_lazy('autocomplete', kwargs={'source': 'subcategories'})
         }),
     },
     extra=1, can_delete=True
@@ -0,0 +1,159 @@
+"""Mantenimiento incremental de :class:`~workorders.models.VehicleCostLedger`.
+
+Cada OT completada aporta sus costos al cubo ``(vehículo, mes de cierre,
+tipo de OT)``. El mes de cierre es el de ``check_out_at`` (o ``created_at``
+si la OT no registra salida), en la zona horaria del proyecto.
+
+Cuando una OT cambia (estado, costos, vehículo, tipo o fechas) se resta su
+aporte anterior y se suma el nuevo; solo se tocan los cubos afectados. Las
+escrituras con ``QuerySet.update`` no pasan por aquí: ``rebuild_cost_ledger``
+reconstruye o verifica la tabla.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DateField, F, Sum
+from django.db.models.functions import Coalesce, TruncMonth
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import VehicleCostLedger, WorkOrder
+from .snapshot import previous, track, tracks
+
+# Campos de la OT que determinan su aporte al libro
+LEDGER_FIELDS = (
+    "vehicle_id",
+    "order_type",
+    "status",
+    "check_out_at",
+    "created_at",
+    "labor_cost_internal",
+    "labor_cost_external",
+    "parts_cost",
+)
+_FIELD_NAMES = {name[:-3] if name.endswith("_id") else name for name in LEDGER_FIELDS}
+track(LEDGER_FIELDS)
+
+
+def ledger_month(closed_at):
+    """Primer día del mes (local) de una fecha/hora de cierre."""
+    if timezone.is_aware(closed_at):
+        closed_at = timezone.localtime(closed_at)
+    return closed_at.date().replace(day=1)
+
+
+def contribution(values):
+    """Aporte de una OT: ``(clave, (interna, terceros, repuestos))`` o ``None``.
+
+    Args:
+        values: Objeto o dict con los campos de ``LEDGER_FIELDS``.
+    """
+    get = values.get if isinstance(values, dict) else lambda f: getattr(values, f)
+    if get("status") != WorkOrder.OrderStatus.COMPLETED:
+        return None
+    closed_at = get("check_out_at") or get("created_at") or timezone.now()
+    key = (get("vehicle_id"), ledger_month(closed_at), get("order_type"))
+    amounts = tuple(
+        Decimal(get(f) or 0)
+        for f in ("labor_cost_internal", "labor_cost_external", "parts_cost")
+    )
+    return key, amounts
+
+
+def apply_changes(changes) -> int:
+    """Aplica pares ``(aporte_anterior, aporte_nuevo)`` al libro.
+
+    Returns:
+        int: Número de cubos modificados.
+    """
+    deltas = defaultdict(lambda: [Decimal("0"), Decimal("0"), Decimal("0"), 0])
+    for before, after in changes:
+        if before == after:
+            continue
+        for contrib, sign in ((before, -1), (after, 1)):
+            if contrib is None:
+                continue
+            key, amounts = contrib
+            delta = deltas[key]
+            for i, amount in enumerate(amounts):
+                delta[i] += sign * amount
+            delta[3] += sign
+
+    touched = 0
+    with transaction.atomic():
+        for (vehicle_id, month, order_type), (internal, external, parts, count) in deltas.items():
+            if not (internal or external or parts or count):
+                continue
+            touched += 1
+            bucket = VehicleCostLedger.objects.filter(
+                vehicle_id=vehicle_id, month=month, order_type=order_type
+            )
+            update = dict(
+                labor_cost_internal=F("labor_cost_internal") + internal,
+                labor_cost_external=F("labor_cost_external") + external,
+                parts_cost=F("parts_cost") + parts,
+                order_count=F("order_count") + count,
+                updated_at=timezone.now(),
+            )
+            if bucket.update(**update):
+                continue
+            try:
+                with transaction.atomic():
+                    VehicleCostLedger.objects.create(
+                        vehicle_id=vehicle_id,
+                        month=month,
+                        order_type=order_type,
+                        labor_cost_internal=internal,
+                        labor_cost_external=external,
+                        parts_cost=parts,
+                        order_count=count,
+                    )
+            except IntegrityError:
+                bucket.update(**update)  # otro proceso creó el cubo
+    return touched
+
+
+def expected_ledger():
+    """Una consulta agrupada: ``{clave: (interna, terceros, repuestos, n)}`` desde las OTs."""
+    rows = (
+        WorkOrder.objects.filter(status=WorkOrder.OrderStatus.COMPLETED)
+        .annotate(
+            month=TruncMonth(Coalesce("check_out_at", "created_at"), output_field=DateField())
+        )
+        .values("vehicle_id", "month", "order_type")
+        .annotate(
+            internal=Sum("labor_cost_internal"),
+            external=Sum("labor_cost_external"),
+            parts=Sum("parts_cost"),
+            count=Count("id"),
+        )
+        .order_by()
+    )
+    return {
+        (r["vehicle_id"], r["month"], r["order_type"]): (
+            Decimal(r["internal"] or 0),
+            Decimal(r["external"] or 0),
+            Decimal(r["parts"] or 0),
+            r["count"],
+        )
+        for r in rows
+    }
+
+
+# -----------------------------
+# Señales de WorkOrder
+# -----------------------------
+@receiver(post_save, sender=WorkOrder)
+def _update_ledger(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or not tracks(update_fields, _FIELD_NAMES):
+        return
+    before = None if created else previous(instance)
+    apply_changes([(contribution(before) if before else None, contribution(instance))])
+
+
+@receiver(post_delete, sender=WorkOrder)
+def _remove_from_ledger(sender, instance, **kwargs):
+    apply_changes([(contribution(instance), None)])
@@ -0,0 +1,83 @@
+# workorders/management/commands/rebuild_cost_ledger.py
+"""
+Reconstruye (o verifica) el libro de costos por vehículo desde las OTs completadas.
+
+- Sin opciones: reemplaza todo el contenido de VehicleCostLedger en una transacción.
+- --verify: compara el libro con las OTs y reporta diferencias sin escribir.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from workorders.ledger import expected_ledger
+from workorders.models import VehicleCostLedger
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Reconstruye o verifica el libro de costos por vehículo (VehicleCostLedger)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Solo compara el libro con las OTs; falla si hay diferencias.",
+        )
+
+    def handle(self, *args, **opts):
+        expected = expected_ledger()
+        if opts["verify"]:
+            self.verify(expected)
+            return
+
+        with transaction.atomic():
+            deleted, _ = VehicleCostLedger.objects.all().delete()
+            VehicleCostLedger.objects.bulk_create(
+                [
+                    VehicleCostLedger(
+                        vehicle_id=vehicle_id,
+                        month=month,
+                        order_type=order_type,
+                        labor_cost_internal=internal,
+                        labor_cost_external=external,
+                        parts_cost=parts,
+                        order_count=count,
+                    )
+                    for (vehicle_id, month, order_type), (internal, external, parts, count) in expected.items()
+                ],
+                batch_size=BATCH_SIZE,
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Libro de costos reconstruido: {len(expected)} registros (antes {deleted})."
+            )
+        )
+
+    def verify(self, expected):
+        stored = {
+            (vehicle_id, month, order_type): (internal, external, parts, count)
+            for vehicle_id, month, order_type, internal, external, parts, count in (
+                VehicleCostLedger.objects.exclude(
+                    order_count=0, labor_cost_internal=0, labor_cost_external=0, parts_cost=0
+                )
+                .values_list(
+                    "vehicle_id", "month", "order_type",
+                    "labor_cost_internal", "labor_cost_external", "parts_cost", "order_count",
+                )
+                .iterator(chunk_size=BATCH_SIZE)
+            )
+        }
+        mismatches = [
+            (key, stored.get(key), expected.get(key))
+            for key in stored.keys() | expected.keys()
+            if stored.get(key) != expected.get(key)
+        ]
+        for key, got, want in sorted(mismatches, key=lambda m: (m[0][0], m[0][1], m[0][2]))[:20]:
+            self.stdout.write(f"  {key}: libro={got} esperado={want}")
+        if mismatches:
+            raise CommandError(
+                f"El libro de costos tiene {len(mismatches)} diferencias. "
+                "Ejecute 'rebuild_cost_ledger' para corregirlo."
+            )
+        self.stdout.write(self.style.SUCCESS(f"Libro de costos correcto ({len(expected)} registros)."))
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.5 on 2026-10-17 12:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, DateField, Sum
+from django.db.models.functions import Coalesce, TruncMonth
+
+
+def backfill_ledger(apps, schema_editor):
+    """Carga inicial del libro desde las OTs completadas (igual que rebuild_cost_ledger)."""
+    WorkOrder = apps.get_model("workorders", "WorkOrder")
+    VehicleCostLedger = apps.get_model("workorders", "VehicleCostLedger")
+    rows = (
+        WorkOrder.objects.filter(status="COMPLETED")
+        .annotate(month=TruncMonth(Coalesce("check_out_at", "created_at"), output_field=DateField()))
+        .values("vehicle_id", "month", "order_type")
+        .annotate(
+            internal=Sum("labor_cost_internal"),
+            external=Sum("labor_cost_external"),
+            parts=Sum("parts_cost"),
+            count=Count("id"),
+        )
+        .order_by()
+    )
+    VehicleCostLedger.objects.bulk_create(
+        [
+            VehicleCostLedger(
+                vehicle_id=r["vehicle_id"],
+                month=r["month"],
+                order_type=r["order_type"],
+                labor_cost_internal=r["internal"] or 0,
+                labor_cost_external=r["external"] or 0,
+                parts_cost=r["parts"] or 0,
+                order_count=r["count"],
+            )
+            for r in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fleet', '0008_alter_vehicle_vehicle_type'),
+        ('workorders', '0012_alter_workorder_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VehicleCostLedger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='Primer día del mes de cierre de las OTs', verbose_name='Mes')),
+                ('order_type', models.CharField(choices=[('PREVENTIVE', 'Preventivo'), ('CORRECTIVE', 'Correctivo')], max_length=20, verbose_name='Tipo de OT')),
+                ('labor_cost_internal', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Costo MO Interna')),
+                ('labor_cost_external', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Costo MO Terceros')),
+                ('parts_cost', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Costo Repuestos')),
+                ('order_count', models.IntegerField(default=0, verbose_name='OTs completadas')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('vehicle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cost_ledger', to='fleet.vehicle', verbose_name='Vehículo')),
+            ],
+            options={
+                'verbose_name': 'Costo Acumulado por Vehículo',
+                'verbose_name_plural': 'Costos Acumulados por Vehículo',
+                'ordering': ['vehicle', '-month'],
+                'constraints': [models.UniqueConstraint(fields=('vehicle', 'month', 'order_type'), name='uniq_cost_ledger_bucket')],
+            },
+        ),
+        migrations.RunPython(backfill_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-17 13:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workorders', '0013_vehiclecostledger'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='workorder',
+            index=models.Index(condition=models.Q(('status', 'COMPLETED'), _negated=True), fields=['scheduled_start'], name='workorder_open_schedule_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+INDEX = "workorders_subcategory_name_upper"
+
+
+def create_index(apps, schema_editor):
+    """Índice UPPER(name) text_pattern_ops para ``name__istartswith`` (solo PostgreSQL)."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    quote = schema_editor.quote_name
+    table = apps.get_model("workorders", "MaintenanceSubcategory")._meta.db_table
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS {quote(INDEX)} ON {quote(table)} "
+        f"(UPPER({quote('name')}) text_pattern_ops)"
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP INDEX IF EXISTS {schema_editor.quote_name(INDEX)}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workorders', '0014_workorder_open_schedule_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
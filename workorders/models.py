@@ -9,6 +9,8 @@ from django.conf import settings
 from fleet.models import Vehicle
 from inventory.models import Part
 
+from .costs import schedule_cost_recalculation
+
 
 # -----------------------------
 # Manual / Plan Preventivo
@@ -273,6 +275,14 @@ class WorkOrder(models.Model):
         verbose_name = "Orden de Trabajo"
         verbose_name_plural = "Órdenes de Trabajo"
         ordering = ["-created_at"]
+        indexes = [
+            # Programación: solo OTs abiertas, por rango de fechas (ver schedule_view)
+            models.Index(
+                fields=["scheduled_start"],
+                name="workorder_open_schedule_idx",
+                condition=~Q(status="COMPLETED"),
+            ),
+        ]
 
 
 class WorkOrderTask(models.Model):
@@ -366,16 +376,52 @@ class WorkOrderNote(models.Model):
         ordering = ["-created_at"]
 
 
+class VehicleCostLedger(models.Model):
+    """Costos acumulados de OTs completadas por vehículo, mes y tipo de OT.
+
+    Tabla resumen mantenida de forma incremental (ver ``workorders.ledger``);
+    ``rebuild_cost_ledger`` la reconstruye o verifica contra las OTs.
+    """
+
+    vehicle = models.ForeignKey(
+        Vehicle, on_delete=models.CASCADE, related_name="cost_ledger", verbose_name="Vehículo"
+    )
+    month = models.DateField("Mes", help_text="Primer día del mes de cierre de las OTs")
+    order_type = models.CharField("Tipo de OT", max_length=20, choices=WorkOrder.OrderType.choices)
+    labor_cost_internal = models.DecimalField("Costo MO Interna", max_digits=14, decimal_places=2, default=0)
+    labor_cost_external = models.DecimalField("Costo MO Terceros", max_digits=14, decimal_places=2, default=0)
+    parts_cost = models.DecimalField("Costo Repuestos", max_digits=14, decimal_places=2, default=0)
+    order_count = models.IntegerField("OTs completadas", default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def total_cost(self):
+        return self.labor_cost_internal + self.labor_cost_external + self.parts_cost
+
+    def __str__(self) -> str:
+        return f"{self.vehicle} {self.month:%Y-%m} {self.order_type}"
+
+    class Meta:
+        verbose_name = "Costo Acumulado por Vehículo"
+        verbose_name_plural = "Costos Acumulados por Vehículo"
+        ordering = ["vehicle", "-month"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["vehicle", "month", "order_type"], name="uniq_cost_ledger_bucket"
+            ),
+        ]
+
+
 # -----------------------------
-# Señales: costos al vuelo
+# Señales: costos (diferidos al commit, ver workorders.costs)
 # -----------------------------
 @receiver([post_save, post_delete], sender=WorkOrderTask)
 def on_task_change(sender, instance, **kwargs):
-    instance.work_order.recalculate_costs()
+    schedule_cost_recalculation(instance.work_order_id)
 
 
 @receiver([post_save, post_delete], sender=WorkOrderPart)
 def on_part_change(sender, instance, **kwargs):
-    instance.work_order.recalculate_costs()
+    schedule_cost_recalculation(instance.work_order_id)
 
 
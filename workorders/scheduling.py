@@ -0,0 +1,191 @@
+"""Motor de programación de mantenimiento preventivo.
+
+Cada :class:`~workorders.models.MaintenanceManual` se compila en una tabla
+inmutable de hitos (``km_interval`` ordenados + descripciones) que se guarda
+en memoria del proceso y se invalida al guardar/eliminar tareas o manuales.
+
+Regla del próximo hito (la misma en señales, revisiones periódicas y
+reportes): con ``delta = km_actual - km_último_servicio`` se toma la primera
+tarea con ``km_interval >= delta``; si ninguna alcanza, se salta al próximo
+múltiplo del menor intervalo del manual (ciclo).
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import MaintenanceManual, ManualTask
+
+# Período usado si el menor intervalo del manual es 0
+DEFAULT_PERIOD_KM = 10000
+# Red de seguridad para otros procesos (la invalidación por señal es local)
+CACHE_TTL_SECONDS = 300
+
+# Separación entre manuales en el arreglo combinado de búsqueda
+_MANUAL_STRIDE = 1 << 40
+
+
+@dataclass(frozen=True)
+class MilestoneTable:
+    """Hitos compilados de un manual."""
+
+    manual_id: int
+    kms: Any  # np.ndarray int64, ordenado, solo lectura
+    descriptions: Tuple[str, ...]
+
+    @property
+    def period(self) -> int:
+        return int(self.kms[0]) or DEFAULT_PERIOD_KM
+
+
+@dataclass
+class NextDue:
+    """Resultado vectorizado de :func:`next_due` (un elemento por fila)."""
+
+    has_schedule: Any  # np.ndarray bool: el plan tiene manual con tareas
+    due_km: Any  # np.ndarray int64
+    remaining_km: Any  # np.ndarray int64
+    descriptions: List[Optional[str]]
+
+    def __len__(self):
+        return len(self.descriptions)
+
+    def row(self, i) -> Tuple[Optional[int], Optional[str], Optional[int]]:
+        """``(km objetivo, descripción, km restantes)`` o ``(None, None, None)``."""
+        if not self.has_schedule[i]:
+            return None, None, None
+        return int(self.due_km[i]), self.descriptions[i], int(self.remaining_km[i])
+
+
+_lock = threading.Lock()
+_tables: Dict[int, Tuple[float, Optional[MilestoneTable]]] = {}
+
+
+def _compile(manual_id: int, rows: Sequence[Tuple[int, str]]) -> Optional[MilestoneTable]:
+    import numpy as np  # diferido: no cargar NumPy al iniciar el proceso web
+
+    if not rows:
+        return None
+    kms = np.fromiter((km for km, _ in rows), dtype=np.int64, count=len(rows))
+    kms.setflags(write=False)
+    return MilestoneTable(manual_id, kms, tuple(desc for _, desc in rows))
+
+
+def milestone_tables(manual_ids: Iterable[int]) -> Dict[int, Optional[MilestoneTable]]:
+    """Tablas de los manuales pedidos; las que faltan se cargan en una consulta.
+
+    Los manuales sin tareas quedan como ``None``.
+    """
+    wanted = {m for m in manual_ids if m is not None}
+    now = time.monotonic()
+    with _lock:
+        result = {
+            m: entry[1]
+            for m, entry in _tables.items()
+            if m in wanted and now - entry[0] < CACHE_TTL_SECONDS
+        }
+    missing = wanted - result.keys()
+    if missing:
+        rows: Dict[int, List[Tuple[int, str]]] = {m: [] for m in missing}
+        tasks = (
+            ManualTask.objects.filter(manual_id__in=missing)
+            .order_by("manual_id", "km_interval", "id")
+            .values_list("manual_id", "km_interval", "description")
+        )
+        for manual_id, km_interval, description in tasks:
+            rows[manual_id].append((km_interval, description))
+        compiled = {m: _compile(m, r) for m, r in rows.items()}
+        with _lock:
+            for m, table in compiled.items():
+                _tables[m] = (now, table)
+        result.update(compiled)
+    return result
+
+
+def milestone_table(manual_id: int) -> Optional[MilestoneTable]:
+    return milestone_tables([manual_id]).get(manual_id)
+
+
+def invalidate(manual_id: Optional[int] = None) -> None:
+    """Descarta la tabla de un manual (o todas si ``manual_id`` es ``None``)."""
+    with _lock:
+        if manual_id is None:
+            _tables.clear()
+        else:
+            _tables.pop(manual_id, None)
+
+
+@receiver([post_save, post_delete], sender=ManualTask)
+def _on_task_change(sender, instance, **kwargs):
+    invalidate(instance.manual_id)
+
+
+@receiver(post_delete, sender=MaintenanceManual)
+def _on_manual_delete(sender, instance, **kwargs):
+    invalidate(instance.pk)
+
+
+def next_due(plan_rows: Sequence[Tuple[Optional[int], Optional[int], Optional[int]]]) -> NextDue:
+    """Calcula el próximo hito de muchos planes en una sola pasada de NumPy.
+
+    Args:
+        plan_rows: Secuencia de ``(manual_id, last_service_km, current_km)``.
+            Los km ``None`` cuentan como 0.
+
+    Returns:
+        NextDue: km objetivo, km restantes y descripción por fila. Las filas
+        sin manual o con un manual sin tareas tienen ``has_schedule=False``.
+    """
+    import numpy as np
+
+    n = len(plan_rows)
+    manual_ids = [row[0] for row in plan_rows]
+    base = np.fromiter((row[1] or 0 for row in plan_rows), dtype=np.int64, count=n)
+    current = np.fromiter((row[2] or 0 for row in plan_rows), dtype=np.int64, count=n)
+    delta = np.maximum(current - base, 0)
+
+    tables = [t for t in milestone_tables(manual_ids).values() if t is not None]
+    if not tables:
+        return NextDue(
+            np.zeros(n, dtype=bool), np.zeros(n, dtype=np.int64),
+            np.zeros(n, dtype=np.int64), [None] * n,
+        )
+
+    # Todas las tablas en un solo arreglo ordenado: rango * STRIDE + km
+    rank_of = {t.manual_id: rank for rank, t in enumerate(tables)}
+    combined = np.concatenate([rank * _MANUAL_STRIDE + t.kms for rank, t in enumerate(tables)])
+    ends = np.cumsum([len(t.kms) for t in tables])
+    periods = np.array([t.period for t in tables], dtype=np.int64)
+    all_descriptions = [d for t in tables for d in t.descriptions]
+
+    rank = np.fromiter((rank_of.get(m, -1) for m in manual_ids), dtype=np.int64, count=n)
+    has_schedule = rank >= 0
+    safe_rank = np.where(has_schedule, rank, 0)
+    offset = safe_rank * _MANUAL_STRIDE
+
+    # Primer hito >= delta dentro del bloque del manual
+    idx = np.searchsorted(combined, offset + delta, side="left")
+    in_manual = has_schedule & (idx < ends[safe_rank])
+    milestone_km = combined[np.minimum(idx, len(combined) - 1)] - offset
+
+    period = periods[safe_rank]
+    cycle_due = base + (delta // period + 1) * period
+    due_km = np.where(in_manual, base + milestone_km, cycle_due)
+    remaining_km = due_km - current
+
+    descriptions: List[Optional[str]] = [
+        (all_descriptions[i] if ok else f"Ciclo cada {p} km") if has else None
+        for has, ok, i, p in zip(
+            has_schedule.tolist(), in_manual.tolist(), idx.tolist(), period.tolist()
+        )
+    ]
+    return NextDue(has_schedule, due_km, remaining_km, descriptions)
+
+
+def next_due_for(manual_id, last_service_km, current_km):
+    """Atajo de :func:`next_due` para un solo plan: ``(km objetivo, descripción, restantes)``."""
+    return next_due([(manual_id, last_service_km, current_km)]).row(0)
@@ -0,0 +1,51 @@
+"""Valores previos de una OT, leídos una sola vez por guardado.
+
+Los receptores de ``post_save`` que mantienen datos derivados de las OTs
+(``ledger``, ``workshop``) comparan el estado nuevo con el que la OT tenía en
+la base de datos. En lugar de un ``pre_save`` con su propia consulta cada uno,
+registran sus campos con :func:`track` y un único ``pre_save`` lee la unión
+en una consulta; cada receptor la obtiene con :func:`previous`.
+"""
+
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+from .models import WorkOrder
+
+_ATTR = "_snapshot_before"
+_TRACKED = set()
+_FIELD_NAMES = set()
+
+
+def track(fields) -> None:
+    """Agrega campos (``attname``) a la lectura previa de cada guardado."""
+    for name in fields:
+        _TRACKED.add(name)
+        _FIELD_NAMES.add(name)
+        if name.endswith("_id"):
+            _FIELD_NAMES.add(name[:-3])
+
+
+def tracks(update_fields, field_names) -> bool:
+    """``True`` si un ``save(update_fields=...)`` toca alguno de ``field_names``."""
+    return update_fields is None or bool(set(field_names).intersection(update_fields))
+
+
+def previous(instance):
+    """Dict con los valores guardados antes del ``save()`` en curso, o ``None``.
+
+    ``None`` si la OT es nueva, si la fila no existe o si ``update_fields`` no
+    incluye ningún campo registrado.
+    """
+    return instance.__dict__.get(_ATTR)
+
+
+@receiver(pre_save, sender=WorkOrder)
+def _remember_previous(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Se reemplaza en cada guardado: nunca queda el valor de uno anterior
+    instance.__dict__[_ATTR] = None
+    if raw or instance._state.adding or not instance.pk or not tracks(update_fields, _FIELD_NAMES):
+        return
+    instance.__dict__[_ATTR] = (
+        WorkOrder.objects.filter(pk=instance.pk).values(*sorted(_TRACKED)).first()
+    )
@@ -13,12 +13,12 @@
         url: url,
         dataType: 'json',
         delay: 250,
-        data: function(params) { return { search: params.term }; },
+        data: function(params) { return { q: params.term, search: params.term }; },
         processResults: function(data) {
           var results = data.results || data;
           return {
             results: results.map(function(obj) {
-              var text = obj.plate || obj.full_name || obj.name;
+              var text = obj.text || obj.plate || obj.full_name || obj.name;
               return { id: obj.id, text: text };
             })
           };
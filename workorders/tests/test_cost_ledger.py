@@ -0,0 +1,90 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from fleet.models import Vehicle
+from workorders.models import VehicleCostLedger, WorkOrder, WorkOrderTask
+
+
+@override_settings(WORKORDER_INTERNAL_RATE=1000)
+class VehicleCostLedgerTests(TestCase):
+    def setUp(self):
+        self.vehicle = Vehicle.objects.create(
+            plate="LED123",
+            brand="Brand",
+            linea="Line",
+            modelo=2020,
+            vehicle_type=Vehicle.VehicleType.AUTOMOVIL,
+        )
+        self.order = WorkOrder.objects.create(vehicle=self.vehicle, description="Trabajo")
+
+    def _ledger(self):
+        return list(
+            VehicleCostLedger.objects.exclude(order_count=0).values_list(
+                "order_type", "order_count", "labor_cost_internal", "labor_cost_external"
+            )
+        )
+
+    def _complete(self):
+        self.order.refresh_from_db()
+        self.order.status = WorkOrder.OrderStatus.COMPLETED
+        self.order.save()
+
+    def test_incremental_updates_follow_order_lifecycle(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkOrderTask.objects.create(work_order=self.order, hours_spent=2)
+        self.assertEqual(self._ledger(), [])
+
+        self._complete()
+        self.assertEqual(self._ledger(), [("CORRECTIVE", 1, Decimal("2000"), Decimal("0"))])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkOrderTask.objects.create(work_order=self.order, labor_rate=300, is_external=True)
+        self.assertEqual(self._ledger(), [("CORRECTIVE", 1, Decimal("2000"), Decimal("300"))])
+
+        self.order.refresh_from_db()
+        self.order.status = WorkOrder.OrderStatus.IN_PROGRESS
+        self.order.save()
+        self.assertEqual(self._ledger(), [])
+
+        self._complete()
+        self.order.delete()
+        self.assertEqual(self._ledger(), [])
+
+    def test_ledger_and_workshop_share_one_previous_read(self):
+        self.order.refresh_from_db()
+        self.order.status = WorkOrder.OrderStatus.IN_PROGRESS
+        self.order.check_in_at = timezone.now()
+        with CaptureQueriesContext(connection) as ctx:
+            self.order.save()
+        selects = [
+            q["sql"] for q in ctx.captured_queries
+            if q["sql"].startswith("SELECT") and 'FROM "workorders_workorder"' in q["sql"]
+            and '"workorders_workorder"."id" = ' in q["sql"]
+        ]
+        self.assertEqual(len(selects), 1, selects)
+        self.vehicle.refresh_from_db()
+        self.assertEqual(self.vehicle.in_workshop_since, self.order.check_in_at)
+
+        self._complete()
+        self.assertEqual(self._ledger(), [("CORRECTIVE", 1, Decimal("0"), Decimal("0"))])
+        self.vehicle.refresh_from_db()
+        self.assertIsNone(self.vehicle.in_workshop_since)
+
+    def test_rebuild_and_verify(self):
+        self._complete()
+        call_command("rebuild_cost_ledger", "--verify", stdout=StringIO())
+
+        WorkOrder.objects.filter(pk=self.order.pk).update(labor_cost_external=50)
+        with self.assertRaises(CommandError):
+            call_command("rebuild_cost_ledger", "--verify", stdout=StringIO())
+
+        call_command("rebuild_cost_ledger", stdout=StringIO())
+        call_command("rebuild_cost_ledger", "--verify", stdout=StringIO())
+        self.assertEqual(self._ledger(), [("CORRECTIVE", 1, Decimal("0"), Decimal("50"))])
@@ -0,0 +1,59 @@
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from fleet.models import Vehicle
+from workorders.costs import suspend_cost_recalculation
+from workorders.models import WorkOrder, WorkOrderTask
+
+
+@override_settings(WORKORDER_INTERNAL_RATE=1000)
+class DeferredCostRecalculationTests(TestCase):
+    def setUp(self):
+        vehicle = Vehicle.objects.create(
+            plate="XYZ123",
+            brand="Brand",
+            linea="Line",
+            modelo=2020,
+            vehicle_type=Vehicle.VehicleType.AUTOMOVIL,
+        )
+        self.order = WorkOrder.objects.create(vehicle=vehicle, description="Test order")
+
+    def _aggregate_queries(self, ctx):
+        return [q for q in ctx.captured_queries if "SUM(" in q["sql"].upper()]
+
+    def test_batch_of_task_saves_recalculates_once_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as ctx, transaction.atomic():
+                for _ in range(30):
+                    WorkOrderTask.objects.create(work_order=self.order, hours_spent=1)
+                self.assertEqual(self._aggregate_queries(ctx), [])
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.labor_cost_internal, Decimal("30000"))
+
+    def test_one_aggregate_pass_per_order(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                WorkOrderTask.objects.create(work_order=self.order, labor_rate=500, is_external=True)
+                WorkOrderTask.objects.create(work_order=self.order, hours_spent=1)
+        with CaptureQueriesContext(connection) as ctx:
+            for callback in callbacks:
+                callback()
+        # Los callbacks repetidos no hacen nada: ya no quedan OTs pendientes
+        self.assertEqual(self._aggregate_queries(ctx), [])
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.labor_cost_external, Decimal("500"))
+        self.assertEqual(self.order.labor_cost_internal, Decimal("1000"))
+
+    def test_suspend_defers_until_block_exit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with suspend_cost_recalculation():
+                WorkOrderTask.objects.create(work_order=self.order, hours_spent=2)
+                self.assertEqual(callbacks, [])
+        self.assertTrue(callbacks)
+        for callback in callbacks:
+            callback()
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.labor_cost_internal, Decimal("2000"))
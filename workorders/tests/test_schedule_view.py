@@ -0,0 +1,103 @@
+"""Tests for the windowed schedule page and the calendar endpoint."""
+
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from fleet.models import Vehicle
+from workorders.models import WorkOrder
+
+
+def at(day, hour=9):
+    return timezone.make_aware(datetime.combine(day, time(hour)))
+
+
+class ScheduleViewTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username="staff", password="pass", is_staff=True)
+        self.client.force_login(self.user)
+        self.vehicle = Vehicle.objects.create(
+            plate="ABC123",
+            brand="Brand",
+            linea="Line",
+            modelo=2020,
+            vehicle_type=Vehicle.VehicleType.AUTOMOVIL,
+        )
+        # Lunes de una semana fija
+        self.monday = date(2030, 3, 4)
+
+    def order(self, start, status=WorkOrder.OrderStatus.SCHEDULED):
+        return WorkOrder.objects.create(
+            vehicle=self.vehicle, description="OT", status=status, scheduled_start=start
+        )
+
+    def test_week_window_shows_only_open_orders_in_range(self):
+        inside = self.order(at(self.monday + timedelta(days=2)))
+        late = self.order(at(self.monday + timedelta(days=6), 23))
+        self.order(at(self.monday + timedelta(days=2)), WorkOrder.OrderStatus.COMPLETED)
+        self.order(at(self.monday + timedelta(days=7)))
+        self.order(at(self.monday - timedelta(days=1), 23))
+        unscheduled = self.order(None)
+
+        response = self.client.get(
+            reverse("workorders_schedule"), {"view": "week", "date": str(self.monday + timedelta(days=3))}
+        )
+        self.assertEqual(response.status_code, 200)
+        shown = [ot.pk for _, orders in response.context["days"] for ot in orders]
+        self.assertEqual(shown, [inside.pk, late.pk])
+        self.assertEqual([ot.pk for ot in response.context["unscheduled"]], [unscheduled.pk])
+        self.assertEqual(response.context["start"], self.monday)
+
+    def test_day_window_and_bad_date(self):
+        today = self.order(at(self.monday))
+        self.order(at(self.monday + timedelta(days=1)))
+        response = self.client.get(reverse("workorders_schedule"), {"view": "day", "date": str(self.monday)})
+        shown = [ot.pk for _, orders in response.context["days"] for ot in orders]
+        self.assertEqual(shown, [today.pk])
+        response = self.client.get(reverse("workorders_schedule"), {"date": "2030-13-01"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_calendar_buckets_by_local_day(self):
+        self.order(at(self.monday, 8))
+        self.order(at(self.monday, 23), WorkOrder.OrderStatus.IN_PROGRESS)
+        self.order(at(self.monday + timedelta(days=2)))
+        self.order(at(self.monday), WorkOrder.OrderStatus.COMPLETED)
+        self.order(None)
+
+        url = reverse("workorders_schedule_calendar")
+        with self.assertNumQueries(4):  # sesión, usuario, agrupado, sin fecha
+            data = self.client.get(
+                url, {"start": str(self.monday), "end": str(self.monday + timedelta(days=6))}
+            ).json()
+        self.assertEqual(
+            data["days"],
+            [
+                {
+                    "date": str(self.monday),
+                    "total": 2,
+                    "by_status": {"IN_PROGRESS": 1, "SCHEDULED": 1},
+                },
+                {"date": str(self.monday + timedelta(days=2)), "total": 1, "by_status": {"SCHEDULED": 1}},
+            ],
+        )
+        self.assertEqual(data["unscheduled"], 1)
+        bad = self.client.get(url, {"start": "2030-01-10", "end": "2030-01-01"})
+        self.assertEqual(bad.status_code, 400)
+
+    def test_dates_at_the_ends_of_the_range_return_400(self):
+        url = reverse("workorders_schedule")
+        for params in ({"view": "month", "date": "9999-12-31"}, {"view": "day", "date": "0001-01-01"}):
+            with self.subTest(**params):
+                self.assertEqual(self.client.get(url, params).status_code, 400)
+        response = self.client.get(
+            reverse("workorders_schedule_calendar"), {"start": "9999-12-31", "end": "9999-12-31"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_calendar_requires_staff(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse("workorders_schedule_calendar")).status_code, 403)
@@ -0,0 +1,41 @@
+from django.test import TestCase
+
+from workorders import scheduling
+from workorders.models import MaintenanceManual, ManualTask
+
+
+class NextDueTests(TestCase):
+    def setUp(self):
+        scheduling.invalidate()
+        self.manual = MaintenanceManual.objects.create(name="Manual A")
+        for km, desc in ((10000, "Aceite"), (20000, "Filtros"), (40000, "General")):
+            ManualTask.objects.create(manual=self.manual, km_interval=km, description=desc)
+        self.other = MaintenanceManual.objects.create(name="Manual B")
+        ManualTask.objects.create(manual=self.other, km_interval=5000, description="Revisión")
+        self.empty = MaintenanceManual.objects.create(name="Manual vacío")
+
+    def test_vectorized_next_due(self):
+        result = scheduling.next_due([
+            (self.manual.pk, 0, 9500),       # próximo hito
+            (self.manual.pk, 1000, 21000),   # exactamente en el hito (>=)
+            (self.manual.pk, 0, 45000),      # sin hitos: ciclo del menor intervalo
+            (self.other.pk, 2000, 3000),     # otro manual en la misma pasada
+            (self.empty.pk, 0, 100),         # manual sin tareas
+            (None, 0, 100),                  # sin manual
+        ])
+        self.assertEqual(result.row(0), (10000, "Aceite", 500))
+        self.assertEqual(result.row(1), (21000, "Filtros", 0))
+        self.assertEqual(result.row(2), (50000, "Ciclo cada 10000 km", 5000))
+        self.assertEqual(result.row(3), (7000, "Revisión", 4000))
+        self.assertEqual(result.row(4), (None, None, None))
+        self.assertEqual(result.row(5), (None, None, None))
+
+    def test_tables_are_cached_and_invalidated(self):
+        scheduling.next_due_for(self.manual.pk, 0, 0)
+        with self.assertNumQueries(0):
+            scheduling.next_due_for(self.manual.pk, 0, 0)
+
+        ManualTask.objects.create(manual=self.manual, km_interval=5000, description="Inspección")
+        self.assertEqual(
+            scheduling.next_due_for(self.manual.pk, 0, 1000), (5000, "Inspección", 4000)
+        )
@@ -13,6 +13,7 @@ from .views import (
     quick_create,
     new_preventive, new_corrective, edit_tasks,
     schedule_view,
+    schedule_calendar_view,
 )
 
 # --------- HTML UNIFICADO (no admin; compatibilidad) ---------
@@ -26,6 +27,7 @@ urlpatterns = [
     path("<int:pk>/tasks/", edit_tasks, name="workorders_edit_tasks"),
 
     path("schedule/", schedule_view, name="workorders_schedule"),
+    path("schedule/calendar/", schedule_calendar_view, name="workorders_schedule_calendar"),
 ]
 
 # ---------- API (DRF) ----------
@@ -1,15 +1,26 @@
 # workorders/views.py
 """Vistas API y HTML (unificadas) para órdenes de trabajo."""
 import logging
+from datetime import date, datetime, time as dt_time, timedelta
+from itertools import groupby
+from urllib.parse import urlencode
+
+from django.core.paginator import Paginator
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.http import HttpResponseBadRequest, JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
 from django.contrib import messages
 from django.contrib.admin.views.decorators import staff_member_required
 from django.views.decorators.http import require_http_methods
 from django.db import transaction
+from django.utils import timezone
 
 from rest_framework import viewsets, filters
 
+from core.query_plan import QueryPlanMixin
+
 from .models import (
     WorkOrder,
     MaintenancePlan,
@@ -31,36 +42,37 @@ from .forms import (
     QuickCreateVehicleForm, QuickCreateDriverForm,
     QuickCreateCategoryForm, QuickCreateSubcategoryForm
 )
+from .costs import schedule_cost_recalculation
 
 logger = logging.getLogger(__name__)
 
 # ========= API (intacto) =========
-class WorkOrderViewSet(viewsets.ModelViewSet):
-    queryset = WorkOrder.objects.all().prefetch_related("tasks", "parts_used", "notes")
+class WorkOrderViewSet(QueryPlanMixin, viewsets.ModelViewSet):
+    queryset = WorkOrder.objects.all()
     serializer_class = WorkOrderSerializer
 
-class WorkOrderTaskViewSet(viewsets.ModelViewSet):
+class WorkOrderTaskViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     queryset = WorkOrderTask.objects.all()
     serializer_class = WorkOrderTaskSerializer
 
-class WorkOrderPartViewSet(viewsets.ModelViewSet):
+class WorkOrderPartViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     queryset = WorkOrderPart.objects.all()
     serializer_class = WorkOrderPartSerializer
 
-class MaintenancePlanViewSet(viewsets.ModelViewSet):
+class MaintenancePlanViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     queryset = MaintenancePlan.objects.all()
     serializer_class = MaintenancePlanSerializer
 
 
-class MaintenanceCategoryViewSet(viewsets.ModelViewSet):
+class MaintenanceCategoryViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     queryset = MaintenanceCategory.objects.all()
     serializer_class = MaintenanceCategorySerializer
     filter_backends = [filters.SearchFilter]
     search_fields = ["name"]
 
 
-class MaintenanceSubcategoryViewSet(viewsets.ModelViewSet):
-    queryset = MaintenanceSubcategory.objects.select_related("category")
+class MaintenanceSubcategoryViewSet(QueryPlanMixin, viewsets.ModelViewSet):
+    queryset = MaintenanceSubcategory.objects.all()
     serializer_class = MaintenanceSubcategorySerializer
     filter_backends = [filters.SearchFilter]
     search_fields = ["name", "category__name"]
@@ -105,11 +117,8 @@ def workorder_unified(request, pk=None):
                         ot = ot_saved  # re-render
                         raise ValueError("task formset invalid")
 
-                if hasattr(ot_saved, "recalculate_costs"):
-                    try:
-                        ot_saved.recalculate_costs()
-                    except Exception as e:
-                        logger.warning("recalculate_costs falló: %s", e)
+                    # Se agrupa con las señales de las tareas: una pasada al commit
+                    schedule_cost_recalculation(ot_saved.pk)
 
                 # Redirección por nombre según el prefijo de la ruta
                 dest = "workorders_admin_edit" if request.path.startswith("/admin/") else "workorders_unified_edit"
@@ -231,22 +240,173 @@ def edit_tasks(request, pk: int):
     return redirect("workorders_unified_edit", pk=pk)
 
 
-# ========= Programación (se conserva) =========
-from django.utils import timezone
-from collections import defaultdict
+# ========= Programación =========
+# Ventanas de la página de programación
+SCHEDULE_VIEWS = {"day": "Día", "week": "Semana", "month": "Mes"}
+SCHEDULE_PAGE_SIZE = 200
+UNSCHEDULED_LIMIT = 50
+CALENDAR_MAX_DAYS = 400
+# Fechas aceptadas: las ventanas, los enlaces anterior/siguiente y la
+# conversión a UTC no deben salirse del rango de ``date``/``datetime``
+SCHEDULE_MIN_DATE = date.min + timedelta(days=31)
+SCHEDULE_MAX_DATE = date.max - timedelta(days=31)
+SCHEDULE_FIELDS = (
+    "id", "status", "priority", "order_type", "scheduled_start", "scheduled_end",
+    "vehicle__plate", "vehicle__brand", "vehicle__linea",
+)
+
+
+def open_orders():
+    """OTs no completadas (el filtro coincide con ``workorder_open_schedule_idx``)."""
+    return WorkOrder.objects.exclude(status=WorkOrder.OrderStatus.COMPLETED)
+
+
+def schedule_window(view, anchor):
+    """Fechas locales ``[inicio, fin)`` de la ventana que contiene ``anchor``."""
+    if view == "day":
+        start = anchor
+        return start, start + timedelta(days=1)
+    if view == "month":
+        start = anchor.replace(day=1)
+        return start, (start + timedelta(days=32)).replace(day=1)
+    start = anchor - timedelta(days=anchor.weekday())
+    return start, start + timedelta(days=7)
+
+
+def _day_start(day):
+    """Medianoche local de ``day`` (para filtrar ``scheduled_start`` por rango)."""
+    return timezone.make_aware(datetime.combine(day, dt_time.min))
+
+
+def _parse_day(value, default):
+    if not value:
+        return default
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Fecha inválida: {value} (use AAAA-MM-DD)")
+    if not SCHEDULE_MIN_DATE <= day <= SCHEDULE_MAX_DATE:
+        raise ValueError(
+            f"Fecha fuera de rango: {value} (entre {SCHEDULE_MIN_DATE} y {SCHEDULE_MAX_DATE})"
+        )
+    return day
+
 
 @staff_member_required
 def schedule_view(request):
-    qs = (WorkOrder.objects
-          .select_related("vehicle")
-          .order_by("scheduled_start", "priority", "id"))
-    grouped = defaultdict(list)
-    for ot in qs:
-        day = (ot.scheduled_start.date() if ot.scheduled_start else timezone.now().date())
-        grouped[day].append(ot)
-    ordered_days = sorted(grouped.keys())
+    """Programación de OTs abiertas en una ventana de día, semana o mes.
+
+    Querystring: ``view`` (``day``/``week``/``month``, por defecto semana),
+    ``date`` (cualquier día de la ventana) y ``page``. Solo se consultan las
+    OTs de la ventana, paginadas; las OTs sin fecha se listan aparte.
+    """
+    view = request.GET.get("view")
+    if view not in SCHEDULE_VIEWS:
+        view = "week"
+    try:
+        anchor = _parse_day(request.GET.get("date"), timezone.localdate())
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    start, end = schedule_window(view, anchor)
+
+    orders = (
+        open_orders()
+        .filter(scheduled_start__gte=_day_start(start), scheduled_start__lt=_day_start(end))
+        .select_related("vehicle")
+        .only(*SCHEDULE_FIELDS)
+        .order_by("scheduled_start", "priority", "id")
+    )
+    page = Paginator(orders, SCHEDULE_PAGE_SIZE).get_page(request.GET.get("page"))
+    days = [
+        (day, list(day_orders))
+        for day, day_orders in groupby(
+            page.object_list, key=lambda ot: timezone.localtime(ot.scheduled_start).date()
+        )
+    ]
+
+    unscheduled = (
+        open_orders()
+        .filter(scheduled_start__isnull=True)
+        .select_related("vehicle")
+        .only(*SCHEDULE_FIELDS)
+        .order_by("priority", "id")
+    )
+    unscheduled_orders = list(unscheduled[:UNSCHEDULED_LIMIT])
+    unscheduled_count = (
+        len(unscheduled_orders)
+        if len(unscheduled_orders) < UNSCHEDULED_LIMIT
+        else unscheduled.count()
+    )
+
+    def link(**params):
+        query = {"view": view, "date": anchor.isoformat(), **params}
+        return f"{request.path}?{urlencode(query)}"
+
     return render(request, "workorders/schedule.html", {
-        "days": ordered_days,
-        "grouped": grouped,
         "title": "Programación de Vehículos por Fecha",
+        "view": view,
+        "views": [(key, label, link(view=key)) for key, label in SCHEDULE_VIEWS.items()],
+        "start": start,
+        "end": end - timedelta(days=1),
+        "days": days,
+        "page": page,
+        "page_links": {
+            "previous": link(page=page.previous_page_number()) if page.has_previous() else None,
+            "next": link(page=page.next_page_number()) if page.has_next() else None,
+        },
+        "previous_url": link(date=(start - timedelta(days=1)).isoformat()),
+        "next_url": link(date=end.isoformat()),
+        "today_url": link(date=timezone.localdate().isoformat()),
+        "unscheduled": unscheduled_orders,
+        "unscheduled_count": unscheduled_count,
+        "calendar_url": reverse("workorders_schedule_calendar"),
+    })
+
+
+@require_http_methods(["GET"])
+def schedule_calendar_view(request):
+    """Calendario JSON: OTs abiertas por día local y estado.
+
+    ``GET ?start=AAAA-MM-DD&end=AAAA-MM-DD`` (fechas inclusivas; por defecto
+    el mes actual). Los días se agrupan en la base de datos con ``TruncDate``
+    en la zona horaria del proyecto; los días sin OTs no aparecen.
+    """
+    if not (request.user.is_authenticated and request.user.is_staff):
+        return JsonResponse({"detail": "No autorizado."}, status=403)
+    month_start, month_end = schedule_window("month", timezone.localdate())
+    try:
+        start = _parse_day(request.GET.get("start"), month_start)
+        end = _parse_day(request.GET.get("end"), month_end - timedelta(days=1))
+    except ValueError as e:
+        return JsonResponse({"detail": str(e)}, status=400)
+    if end < start or (end - start).days >= CALENDAR_MAX_DAYS:
+        return JsonResponse(
+            {"detail": f"Rango inválido: máximo {CALENDAR_MAX_DAYS} días y fin >= inicio."},
+            status=400,
+        )
+
+    rows = (
+        open_orders()
+        .filter(
+            scheduled_start__gte=_day_start(start),
+            scheduled_start__lt=_day_start(end + timedelta(days=1)),
+        )
+        .annotate(day=TruncDate("scheduled_start", tzinfo=timezone.get_current_timezone()))
+        .values("day", "status")
+        .annotate(total=Count("id"))
+        .order_by("day", "status")
+    )
+    buckets = {}
+    for row in rows:
+        bucket = buckets.setdefault(
+            row["day"], {"date": row["day"].isoformat(), "total": 0, "by_status": {}}
+        )
+        bucket["total"] += row["total"]
+        bucket["by_status"][row["status"]] = row["total"]
+
+    return JsonResponse({
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "days": list(buckets.values()),
+        "unscheduled": open_orders().filter(scheduled_start__isnull=True).count(),
     })
@@ -0,0 +1,94 @@
+"""Mantenimiento de ``Vehicle.in_workshop_since`` desde las OTs.
+
+Un vehículo está en taller mientras tenga alguna OT con ingreso registrado
+(``check_in_at``) en un estado de taller (``IN_WORKSHOP_STATUSES``); el campo
+guarda el ingreso más antiguo de esas OTs, o ``NULL``. Lo leen el listado y
+el filtro del admin de vehículos, el tablero del admin y ``vehicles_in_repair_view``
+sin consultar las OTs.
+
+Las señales de ``WorkOrder`` recalculan el campo de los vehículos afectados
+cuando cambia el vehículo, el estado o el ingreso de una OT. Las escrituras
+masivas (``bulk_create``, ``QuerySet.update``) deben llamar a
+:func:`refresh_in_workshop` con los vehículos que tocaron.
+"""
+
+from django.db.models import Min, OuterRef, Subquery
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.dashboard import invalidate
+from fleet.models import Vehicle
+
+from .models import WorkOrder
+from .snapshot import previous, track, tracks
+
+IN_WORKSHOP_STATUSES = (
+    WorkOrder.OrderStatus.IN_PROGRESS,
+    WorkOrder.OrderStatus.WAITING_PART,
+    WorkOrder.OrderStatus.IN_ROAD_TEST,
+)
+# Campos de la OT que determinan si su vehículo está en taller
+WORKSHOP_FIELDS = ("vehicle_id", "status", "check_in_at")
+_FIELD_NAMES = {"vehicle", "vehicle_id", "status", "check_in_at"}
+track(WORKSHOP_FIELDS)
+
+
+def in_workshop_orders():
+    """OTs que ponen a su vehículo en taller."""
+    return WorkOrder.objects.filter(
+        status__in=IN_WORKSHOP_STATUSES, check_in_at__isnull=False
+    )
+
+
+def refresh_in_workshop(vehicle_ids=None) -> int:
+    """Recalcula ``in_workshop_since`` con un solo ``UPDATE``.
+
+    Args:
+        vehicle_ids: Vehículos a recalcular; ``None`` recorre toda la flota.
+
+    Returns:
+        int: Vehículos actualizados.
+    """
+    since = (
+        in_workshop_orders()
+        .filter(vehicle_id=OuterRef("pk"))
+        .order_by()
+        .values("vehicle_id")
+        .annotate(since=Min("check_in_at"))
+        .values("since")
+    )
+    vehicles = Vehicle.objects.all()
+    if vehicle_ids is not None:
+        ids = {pk for pk in vehicle_ids if pk is not None}
+        if not ids:
+            return 0
+        vehicles = vehicles.filter(pk__in=ids)
+    updated = vehicles.update(in_workshop_since=Subquery(since))
+    invalidate("workshop")
+    return updated
+
+
+def _state(values):
+    """``(vehículo, pone en taller)`` de una OT (objeto o dict)."""
+    get = values.get if isinstance(values, dict) else lambda f: getattr(values, f)
+    in_shop = get("status") in IN_WORKSHOP_STATUSES and get("check_in_at") is not None
+    return get("vehicle_id"), in_shop, get("check_in_at") if in_shop else None
+
+
+@receiver(post_save, sender=WorkOrder)
+def _update_in_workshop(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or not tracks(update_fields, _FIELD_NAMES):
+        return
+    previous_values = None if created else previous(instance)
+    before = _state(previous_values) if previous_values else None
+    after = _state(instance)
+    if before == after or (before is None and not after[1]):
+        return
+    refresh_in_workshop({after[0], before[0] if before else None})
+
+
+@receiver(post_delete, sender=WorkOrder)
+def _remove_from_workshop(sender, instance, **kwargs):
+    vehicle_id, in_shop, _ = _state(instance)
+    if in_shop:
+        refresh_in_workshop([vehicle_id])